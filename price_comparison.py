@@ -2,9 +2,14 @@
 # If you have any questions, feel free to ask me on my phone number 647 679 9802
 # If you wish to contribute to this file, please add your name and phone number in the comments below
 
+import argparse
 import asyncio
 import json
 import csv
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 
 from scrappers.amazon import AmazonScraper
 from scrappers.bestBuy import BestBuyScraper
@@ -18,6 +23,20 @@ from scrappers.staples import StaplesScraper
 from scrappers.samsung import SamsungScraper
 from scrappers.vision import VisionsScraper
 
+from utils.browser_pool import close_browser_pool
+from utils.change_feed import DEFAULT_CHANGES_PATH, append_change_feed, diff_runs, post_change_feed
+from utils.price_history import DEFAULT_HISTORY_PATH, PriceHistory
+from utils.model_numbers import parse_model_numbers
+from utils.result_cache import (DEFAULT_CACHE_PATH, DEFAULT_CACHE_TTL, RETAILER_CACHE_TTLS, ResultCache,
+                                is_fresh_entry, is_not_carried)
+from utils.catalog_crawl import CatalogIndex, crawl_catalog
+from utils.search_harvest import configure_search_harvest, get_search_harvest
+from utils.result_writer import ResultStreamWriter, journal_part_path, journal_parts, read_result_stream
+from utils.url_cache import configure_url_cache, close_url_cache
+from utils.tracing import (DEFAULT_TRACE_PATH, configure_tracing, format_summary, get_tracer, merge_trace_parts,
+                           span, summarize, tagged, trace_part_path, write_trace)
+from utils.selector_stats import DEFAULT_STATS_PATH, configure_selector_stats, close_selector_stats
+
 from testdata import test_data  # The test data is a list of dicts with only 'name'
 
 SCRAPERS = {
@@ -35,48 +54,116 @@ SCRAPERS = {
 }
 
 
-async def get_market_prices(products):
-    comparisons = {}
+# Upper bound on scrapes in flight across all retailers
+MAX_CONCURRENT_SCRAPES = 8
+
+JSON_OUTPUT_PATH = "price_comparison_output.json"
+CSV_OUTPUT_PATH = "price_comparison_output.csv"
+# Written record by record while the run is going
+JSONL_OUTPUT_PATH = "price_comparison_output.jsonl"
+STREAM_CSV_PATH = "price_comparison_stream.csv"
+
+# Per-retailer caps; retailers not listed get DEFAULT_RETAILER_CONCURRENCY
+DEFAULT_RETAILER_CONCURRENCY = 2
+RETAILER_CONCURRENCY = {
+    "Amazon": 2,
+    "Costco": 1,
+    "Staples": 1,
+}
+
+
+async def scrape_retailer(retailer, ScraperClass, name, model=None):
+    """Run one scraper for one product and shape its result for the comparison output.
+
+    `model` is the product's ModelNumber, parsed once for all retailers.
+    """
+    print(f"Checking {retailer} for '{name}'...")
+    try:
+        scraper = ScraperClass()
+        with tagged(retailer, name), span("scrape"):
+            result = await scraper.scrape_product(name, model=model)
+        if result.get("error") or result.get("price") is None:
+            print(f"{retailer}: {result.get('error')}")
+            return {"found": False, "result": {}, "error": result.get("error")}
+        print(f"{retailer}: ${result['price']}")
+        return {
+            "found": True,
+            "result": {
+                "name": result.get("product_name"),
+                "price": result.get("price"),
+                "url": result.get("url"),
+                "price_validity": result.get("sale_end_date", "")
+            }
+        }
+    except Exception as e:
+        print(f"{retailer} crashed: {e}")
+        return {
+            "found": False,
+            "result": {},
+            "error": str(e)
+        }
+
 
+def route(ScraperClass, name):
+    """Reason a retailer can't carry a product, decided before any browser work, or None"""
+    if not ScraperClass.carries_brand(name):
+        return f"Product is not {ScraperClass.brand} brand"
+    return None
+
+
+def entries_by_task(records):
+    """(product, retailer) -> result entry for result stream records, latest record winning"""
+    entries = {}
+    for record in records:
+        entry = {k: v for k, v in record.items() if k not in ("product", "retailer")}
+        entries[(record["product"], record["retailer"])] = entry
+    return entries
+
+
+def comparisons_from_stream(products, records):
+    """Build the nested comparisons layout from result stream records.
+
+    Products and retailers come out in input and SCRAPERS order whatever order the
+    records were written in; a later record for the same pair replaces an earlier one.
+    """
+    latest = entries_by_task(records)
+
+    comparisons = {}
     for product in products:
         name = product["name"]
-        comparisons[name] = {
-            "productInfo": {
-                "name": name,
-                "price": "",   # No original price provided
-                "url": ""      # No product URL provided
-            },
-            "results": {}
-        }
+        comparisons[name] = new_comparison(name)
+        for retailer in SCRAPERS:
+            if (name, retailer) in latest:
+                comparisons[name]["results"][retailer] = latest[(name, retailer)]
 
-        for retailer, ScraperClass in SCRAPERS.items():
-            print(f"Checking {retailer} for '{name}'...")
-            try:
-                scraper = ScraperClass()
-                result = await scraper.scrape_product(name)
-                if result.get("error") or result.get("price") is None:
-                    print(f"{retailer}: {result.get('error')}")
-                    comparisons[name]["results"][retailer] = {"found": False, "result": {}}
-                else:
-                    print(f"{retailer}: ${result['price']}")
-                    comparisons[name]["results"][retailer] = {
-                        "found": True,
-                        "result": {
-                            "name": result.get("product_name"),
-                            "price": result.get("price"),
-                            "url": result.get("url"),
-                            "price_validity": result.get("sale_end_date", "")
-                        }
-                    }
-            except Exception as e:
-                print(f"{retailer} crashed: {e}")
-                comparisons[name]["results"][retailer] = {
-                    "found": False,
-                    "result": {},
-                    "error": str(e)
-                }
-
-    # Compute best price
+    compute_best_prices(comparisons)
+
+    return comparisons
+
+
+def load_previous_output(path=JSON_OUTPUT_PATH):
+    """Comparisons written by an earlier run, or {} if there is no readable output"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def new_comparison(name):
+    """Empty comparison entry for a product"""
+    return {
+        "productInfo": {
+            "name": name,
+            "price": "",   # No original price provided
+            "url": ""      # No product URL provided
+        },
+        "results": {}
+    }
+
+
+def compute_best_prices(comparisons):
+    """Fill in best_price for every product from its found results"""
     for product, info in comparisons.items():
         lowest = None
         for retailer, result in info["results"].items():
@@ -90,18 +177,351 @@ async def get_market_prices(products):
                     }
         info["best_price"] = lowest if lowest else {"retailer": None, "price": None, "url": None}
 
+
+async def get_market_prices(products, max_concurrency=MAX_CONCURRENT_SCRAPES, retailer_limits=None,
+                            retailers=None, cache=None, previous=None, on_result=None, completed=None, catalog=None):
+    """Scrape every product at every retailer concurrently.
+
+    At most `max_concurrency` scrapes run at once, and each retailer is further capped
+    by `retailer_limits` (defaults to RETAILER_CONCURRENCY). Pass max_concurrency=1 for
+    the old one-at-a-time behaviour. Results are assembled in product and SCRAPERS
+    order, so the output is the same whichever mode is used. `retailers` restricts
+    the run to a subset of SCRAPERS keys.
+
+    Brand stores are skipped for other brands' products without scraping. With a
+    ResultCache, fresh cached prices are served without scraping and found prices are
+    stored for later runs; every result records whether it was `cached`. Pairs the
+    cache knows a retailer doesn't carry are skipped the same way until they expire.
+
+    `previous` is the comparisons dict of an earlier run: its entries that are still
+    fresh (see is_fresh_entry) are kept as they are and only stale ones are scraped.
+
+    Products that showed up as a card on a search page another product already loaded
+    at the same retailer (see SearchHarvest) take their price from that card instead
+    of being scraped; those results record `harvested`.
+
+    With a CatalogIndex (see crawl_catalog), a model the retailer's listings priced
+    within its cache TTL is answered from the index and records `listed`. Listed
+    models without a fresh price are still scraped, but detail-page scrapers go
+    straight to the indexed URL instead of searching.
+
+    `on_result(product_name, retailer, entry)` is called as each result lands, in
+    completion order, e.g. ResultStreamWriter.write.
+
+    `completed` maps (product, retailer) to results an interrupted run already
+    journaled; those tasks are not run again and not passed to on_result.
+    """
+    scrapers = {r: cls for r, cls in SCRAPERS.items() if retailers is None or r in retailers}
+    retailer_limits = RETAILER_CONCURRENCY if retailer_limits is None else retailer_limits
+    # One model number parse per product, shared by the cache keys and every scraper
+    models = parse_model_numbers(product["name"] for product in products)
+    harvest = get_search_harvest()
+    global_slots = asyncio.Semaphore(max_concurrency)
+    retailer_slots = {
+        retailer: asyncio.Semaphore(retailer_limits.get(retailer, DEFAULT_RETAILER_CONCURRENCY))
+        for retailer in scrapers
+    }
+
+    async def resolve(retailer, ScraperClass, name):
+        reason = route(ScraperClass, name)
+        if reason:
+            return {"found": False, "result": {}, "skipped": reason, "cached": False}
+
+        if previous:
+            earlier = previous.get(name, {}).get("results", {}).get(retailer)
+            if earlier is not None and is_fresh_entry(retailer, earlier):
+                print(f"{retailer}: still fresh from {earlier['scraped_at']}")
+                return earlier
+
+        key = (retailer, models[name].canonical)
+        if cache is not None:
+            hit = cache.get(*key)
+            if hit is not None:
+                entry, stored_at = hit
+                print(f"{retailer}: ${entry['result']['price']} (cached)")
+                return dict(entry, cached=True,
+                            cached_at=datetime.fromtimestamp(stored_at).isoformat(timespec="seconds"))
+            miss = cache.get_not_carried(*key)
+            if miss is not None:
+                reason, stored_at = miss
+                print(f"{retailer}: {reason} (cached)")
+                return {"found": False, "result": {}, "error": reason, "cached": True,
+                        "cached_at": datetime.fromtimestamp(stored_at).isoformat(timespec="seconds")}
+
+        listed = None
+        if catalog is not None and models[name].model:
+            # Never fresher than a scraped price would be
+            ttl = cache.ttl_for(retailer) if cache is not None else RETAILER_CACHE_TTLS.get(retailer, DEFAULT_CACHE_TTL)
+            listed = catalog.get(*key, max_age=ttl)
+        if listed is not None and listed["price"] is not None:
+            print(f"{retailer}: ${listed['price']} (catalog)")
+            entry = {"found": True, "listed": True,
+                     "result": {"name": name, "price": listed["price"], "url": listed["url"], "price_validity": ""}}
+        else:
+            async with retailer_slots[retailer]:
+                # Checked only once it's this task's turn, so search pages loaded by the
+                # tasks ahead of it in the queue count
+                card = harvest.get(*key) if harvest is not None and models[name].model else None
+                if card is not None:
+                    print(f"{retailer}: ${card['price']} (from the search page for another product)")
+                    entry = {"found": True, "harvested": True,
+                             "result": {"name": name, "price": card["price"], "url": card["url"],
+                                        "price_validity": ""}}
+                else:
+                    async with global_slots:
+                        entry = await scrape_retailer(retailer, ScraperClass, name, models[name])
+
+        entry["scraped_at"] = datetime.now().isoformat(timespec="seconds")
+        if cache is not None:
+            if entry["found"]:
+                cache.put(*key, entry, entry["result"].get("price_validity"))
+            elif is_not_carried(entry.get("error")):
+                cache.put_not_carried(*key, entry["error"])
+        entry["cached"] = False
+        return entry
+
+    async def run(retailer, ScraperClass, name):
+        if completed and (name, retailer) in completed:
+            return completed[(name, retailer)]
+        entry = await resolve(retailer, ScraperClass, name)
+        if on_result is not None:
+            on_result(name, retailer, entry)
+        return entry
+
+    comparisons = {}
+    tasks = {}
+
+    # scrape_retailer never raises, so one crashing scraper can't cancel its siblings
+    async with asyncio.TaskGroup() as group:
+        for product in products:
+            name = product["name"]
+            comparisons[name] = new_comparison(name)
+            for retailer, ScraperClass in scrapers.items():
+                tasks[(name, retailer)] = group.create_task(run(retailer, ScraperClass, name))
+
+    for (name, retailer), task in tasks.items():
+        comparisons[name]["results"][retailer] = task.result()
+
+    compute_best_prices(comparisons)
+
+    return comparisons
+
+
+def shard_work(products, workers, shard_by="product"):
+    """Split the run into (products, retailers) shards, one per worker process.
+
+    Sharding by retailer keeps every request to a retailer in one process, so its
+    rate limit and concurrency cap still hold across the whole run.
+    """
+    if shard_by == "retailer":
+        retailers = list(SCRAPERS)
+        return [(products, retailers[i::workers]) for i in range(workers) if retailers[i::workers]]
+    return [(products[i::workers], None) for i in range(workers) if products[i::workers]]
+
+
+def run_shard(products, retailers, cache_path=None, previous=None, completed=None, journal_path=None,
+              selector_stats_path=None, harvest=True, trace_path=None):
+    """Worker process entry point: scrape one shard with this process's own browser pool.
+
+    With `journal_path` every result is journaled as it lands, so a worker that dies
+    mid-shard doesn't lose the work it finished. With `trace_path` the worker's
+    timing spans are written there for the parent to merge.
+    """
+    async def run():
+        cache = ResultCache(cache_path) if cache_path else None
+        catalog = CatalogIndex(cache_path) if cache_path else None
+        configure_url_cache(cache_path)
+        configure_selector_stats(selector_stats_path)
+        configure_search_harvest(harvest)
+        configure_tracing(trace_path is not None)
+        journal = ResultStreamWriter(journal_path, append=True, durable=True).start() if journal_path else None
+        try:
+            return await get_market_prices(products, retailers=retailers, cache=cache, previous=previous,
+                                           completed=completed, on_result=journal.write if journal else None,
+                                           catalog=catalog)
+        finally:
+            await close_browser_pool()
+            close_url_cache()
+            close_selector_stats()
+            if cache is not None:
+                cache.close()
+            if catalog is not None:
+                catalog.close()
+            if journal is not None:
+                journal.close()
+            if trace_path is not None:
+                write_trace(trace_path, get_tracer().trace_events())
+
+    return asyncio.run(run())
+
+
+def merge_shard_results(products, shard_results):
+    """Merge per-shard comparisons back into the layout a single process would produce"""
+    comparisons = {}
+    for product in products:
+        name = product["name"]
+        comparisons[name] = new_comparison(name)
+        for retailer in SCRAPERS:
+            for shard in shard_results:
+                if name in shard and retailer in shard[name]["results"]:
+                    comparisons[name]["results"][retailer] = shard[name]["results"][retailer]
+                    break
+
+    compute_best_prices(comparisons)
+
     return comparisons
 
 
-async def main():
-    results = await get_market_prices(test_data)
+async def get_market_prices_sharded(products, workers, shard_by="product", cache_path=None, previous=None,
+                                    on_result=None, completed=None, journal_path=None, selector_stats_path=None,
+                                    harvest=True, trace_path=None):
+    """Run get_market_prices across `workers` processes and merge the output.
+
+    Worker processes can't call `on_result`, so it gets each shard's results as soon
+    as that shard finishes. With `journal_path`, worker i also journals its results to
+    journal_part_path(journal_path, i) while it runs. With `trace_path`, worker i
+    writes its timing spans to trace_part_path(trace_path, i).
+    """
+    shards = shard_work(products, workers, shard_by)
+
+    def previous_for(shard_products):
+        # Only ship each worker the earlier entries for its own products
+        if not previous:
+            return None
+        return {p["name"]: previous[p["name"]] for p in shard_products if p["name"] in previous}
+
+    def completed_for(shard_products):
+        if not completed:
+            return None
+        names = {p["name"] for p in shard_products}
+        return {task: entry for task, entry in completed.items() if task[0] in names}
+
+    loop = asyncio.get_running_loop()
+    # spawn so each worker starts its own Playwright driver instead of inheriting ours
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [
+            loop.run_in_executor(executor, run_shard, shard_products, shard_retailers, cache_path,
+                                 previous_for(shard_products), completed_for(shard_products),
+                                 journal_part_path(journal_path, index) if journal_path else None,
+                                 selector_stats_path, harvest,
+                                 trace_part_path(trace_path, index) if trace_path else None)
+            for index, (shard_products, shard_retailers) in enumerate(shards)
+        ]
+        shard_results = []
+        for future in asyncio.as_completed(futures):
+            shard = await future
+            shard_results.append(shard)
+            if on_result is not None:
+                for product, data in shard.items():
+                    for retailer, entry in data["results"].items():
+                        if not completed or (product, retailer) not in completed:
+                            on_result(product, retailer, entry)
+    return merge_shard_results(products, shard_results)
+
+
+def is_settled(entry):
+    """Whether a journaled entry is final: a price, a "not carried" answer or a routing skip"""
+    return bool(entry.get("found") or entry.get("skipped") or is_not_carried(entry.get("error")))
+
+
+def load_checkpoint(journal_path=JSONL_OUTPUT_PATH):
+    """Results an interrupted run journaled, split by where they were found.
+
+    Returns (completed, recovered): every settled (product, retailer) -> entry, and
+    the subset only present in worker part journals, which still has to be copied
+    into the main journal. Timeouts and other transient failures are left out so
+    the resumed run tries them again.
+    """
+    completed = {task: entry for task, entry in entries_by_task(read_result_stream(journal_path)).items()
+                 if is_settled(entry)}
+    recovered = {}
+    for part in journal_parts(journal_path):
+        for task, entry in entries_by_task(read_result_stream(part)).items():
+            if task not in completed and is_settled(entry):
+                recovered[task] = entry
+    completed.update(recovered)
+    return completed, recovered
+
+
+async def main(workers=1, shard_by="product", cache_path=DEFAULT_CACHE_PATH, incremental=False, resume=False,
+               history_path=DEFAULT_HISTORY_PATH, changes_path=DEFAULT_CHANGES_PATH, webhook_url=None,
+               selector_stats_path=DEFAULT_STATS_PATH, harvest=True, crawl=False, catalog_base_url=None,
+               trace_path=None):
+    # Refresh the catalog index first so the run below can answer from it
+    if crawl and cache_path:
+        await crawl_catalog(path=cache_path, base_url=catalog_base_url)
+
+    # The last output is what the change feed diffs against; incremental runs also
+    # keep every still-fresh entry of it
+    last_output = load_previous_output()
+    previous = last_output if incremental else None
+
+    # The JSONL stream doubles as the checkpoint journal of finished tasks
+    if resume:
+        completed, recovered = load_checkpoint(JSONL_OUTPUT_PATH)
+        print(f"Resuming: {len(completed)} results already journaled")
+    else:
+        completed, recovered = {}, {}
+        for part in journal_parts(JSONL_OUTPUT_PATH):
+            os.remove(part)
+
+    # Every result goes to the JSONL stream as it lands; the nested JSON and CSV are
+    # built from that stream once the run is over
+    with ResultStreamWriter(JSONL_OUTPUT_PATH, STREAM_CSV_PATH, append=resume, durable=True) as stream:
+        for (product, retailer), entry in recovered.items():
+            stream.write(product, retailer, entry)
+        if workers > 1:
+            await get_market_prices_sharded(test_data, workers, shard_by, cache_path, previous,
+                                            on_result=stream.write, completed=completed,
+                                            journal_path=JSONL_OUTPUT_PATH, selector_stats_path=selector_stats_path,
+                                            harvest=harvest, trace_path=trace_path)
+        else:
+            cache = ResultCache(cache_path) if cache_path else None
+            catalog = CatalogIndex(cache_path) if cache_path else None
+            configure_url_cache(cache_path)
+            configure_selector_stats(selector_stats_path)
+            configure_search_harvest(harvest)
+            configure_tracing(trace_path is not None)
+            try:
+                await get_market_prices(test_data, cache=cache, previous=previous, on_result=stream.write,
+                                        completed=completed, catalog=catalog)
+            finally:
+                await close_browser_pool()
+                close_url_cache()
+                close_selector_stats()
+                if cache is not None:
+                    cache.close()
+                if catalog is not None:
+                    catalog.close()
+
+    # Everything the workers journaled is in the main journal now
+    for part in journal_parts(JSONL_OUTPUT_PATH):
+        os.remove(part)
+
+    if trace_path:
+        tracer = get_tracer()
+        events = merge_trace_parts(trace_path, tracer.trace_events() if tracer else ())
+        print("\n".join(format_summary(summarize(events))))
+        print(f"✅ Timing trace exported to: {trace_path} (open in chrome://tracing or Perfetto)")
+
+    results = comparisons_from_stream(test_data, read_result_stream(JSONL_OUTPUT_PATH))
+
+    if history_path:
+        history = PriceHistory(history_path)
+        try:
+            added = history.record_comparisons(results, parse_model_numbers(results))
+            history.compact_if_due()
+        finally:
+            history.close()
+        print(f"Recorded {added} prices in {history_path}")
 
     print("\n================ Final Summary ================\n")
     for product, data in results.items():
         print(f"{product}:")
         for retailer, r_data in data["results"].items():
             if r_data["found"]:
-                print(f"  - {retailer}: ${r_data['result']['price']} ({r_data['result']['url']})")
+                cached = " [cached]" if r_data.get("cached") else ""
+                print(f"  - {retailer}: ${r_data['result']['price']} ({r_data['result']['url']}){cached}")
             else:
                 print(f"  - {retailer}: Not Found")
         if data.get("best_price") and data["best_price"]["retailer"]:
@@ -110,17 +530,26 @@ async def main():
             print("No available price found")
         print()
 
+    # Only what changed since the last output, for consumers that don't want to reload it
+    changes = diff_runs(last_output, results)
+    if changes_path:
+        append_change_feed(changes, changes_path)
+        print(f"📣 {len(changes)} changes since the last run appended to: {changes_path}")
+    if webhook_url and changes:
+        if await post_change_feed(changes, webhook_url):
+            print(f"📣 Changes posted to {webhook_url}")
+
     # Save to JSON
-    json_output_path = "price_comparison_output.json"
+    json_output_path = JSON_OUTPUT_PATH
     with open(json_output_path, "w") as f:
         json.dump(results, f, indent=2)
     print(f"✅ JSON results exported to: {json_output_path}")
 
     # Save to CSV
-    csv_output_path = "price_comparison_output.csv"
+    csv_output_path = CSV_OUTPUT_PATH
     with open(csv_output_path, mode="w", newline="") as csvfile:
         writer = csv.writer(csvfile)
-        writer.writerow(["Product", "Retailer", "Price", "URL", "Best Price"])
+        writer.writerow(["Product", "Retailer", "Price", "URL", "Best Price", "Cached"])
         for product, info in results.items():
             best_retailer = info["best_price"]["retailer"] if info.get("best_price") else None
             for retailer, r_data in info["results"].items():
@@ -131,10 +560,48 @@ async def main():
                         retailer,
                         r_data["result"]["price"],
                         r_data["result"]["url"],
-                        is_best
+                        is_best,
+                        "✅" if r_data.get("cached") else ""
                     ])
     print(f"✅ CSV results exported to: {csv_output_path}")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Compare TV prices across Canadian retailers")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes to shard the run across")
+    parser.add_argument("--shard-by", choices=["product", "retailer"], default="product",
+                        help="split work between workers by product or by retailer")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH,
+                        help="SQLite file holding prices found by earlier runs")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="scrape everything live and don't store results")
+    parser.add_argument("--incremental", action="store_true",
+                        help="keep still-fresh results from the previous output and only re-scrape stale ones")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted run from its journal instead of starting over")
+    parser.add_argument("--history-path", default=DEFAULT_HISTORY_PATH,
+                        help="SQLite file every run appends its prices to")
+    parser.add_argument("--no-history", action="store_true",
+                        help="don't record this run's prices in the history")
+    parser.add_argument("--changes-path", default=DEFAULT_CHANGES_PATH,
+                        help="JSON Lines file each run appends its changes since the previous run to")
+    parser.add_argument("--webhook-url",
+                        help="also POST each run's changes to this URL")
+    parser.add_argument("--selector-stats-path", default=DEFAULT_STATS_PATH,
+                        help="SQLite file tracking which fallback selectors match, used to try them hottest first")
+    parser.add_argument("--no-selector-stats", action="store_true",
+                        help="always try fallback selectors in source order")
+    parser.add_argument("--no-harvest", action="store_true",
+                        help="scrape every product even if another product's search page already showed it")
+    parser.add_argument("--crawl", action="store_true",
+                        help="index the retailers' TV listings and sitemaps before the run (needs the cache)")
+    parser.add_argument("--catalog-base-url",
+                        help="crawl this host instead of the retailers, e.g. a stub server with saved pages")
+    parser.add_argument("--trace", nargs="?", const=DEFAULT_TRACE_PATH, metavar="PATH",
+                        help="time every scrape phase, write a Chrome trace to PATH and print p50/p95/max per retailer")
+    args = parser.parse_args()
+    asyncio.run(main(args.workers, args.shard_by, None if args.no_cache else args.cache_path, args.incremental,
+                     args.resume, None if args.no_history else args.history_path, args.changes_path,
+                     args.webhook_url, None if args.no_selector_stats else args.selector_stats_path,
+                     not args.no_harvest, args.crawl, args.catalog_base_url, args.trace))
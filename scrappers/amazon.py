@@ -7,14 +7,27 @@
 import asyncio
 import re
 import os
-from playwright.async_api import async_playwright, TimeoutError
-from utils.extract_model_number import extract_model_number
+from playwright.async_api import TimeoutError
+from utils.browser_pool import close_browser_pool
+from scrappers.base_scraper import BaseScraper
+from utils.tracing import traced
+from utils.price_parser import parse_price_value
+from utils.page_readiness import Readiness
+from utils.rate_limiter import throttle, throttled_goto
 
-class AmazonScraper:
+class AmazonScraper(BaseScraper):
+    
+    retailer_id = "Amazon"
+    detail_pages = True
+    readiness = {
+        "search": Readiness(['.s-result-item h2 a', 'div.s-no-outline span:has-text("No results for")'], timeout=2000),
+        "detail": Readiness(['.a-price .a-offscreen', '#productTitle'], timeout=2000),
+    }
     
     def __init__(self):
         self.base_url = "https://www.amazon.ca/s?k={}"
      
+    @traced("handle_dialogs")
     async def handle_dialogs(self, page):
         """Handle various dialogs that might appear"""
         # Handle cookie dialogs
@@ -37,7 +50,7 @@ class AmazonScraper:
         except Exception:
             pass
     
-    async def scrape_product(self, product_name: str) -> dict:
+    async def scrape_on_page(self, page, product_name: str, detail_url=None) -> dict:
         """Scrape Amazon price information based on product name"""
         result = {
             "retailer": "Amazon",
@@ -49,7 +62,7 @@ class AmazonScraper:
         }
         
         # Extract model number
-        model_number = extract_model_number(product_name)
+        model_number = self.extract_model_number(product_name)
         result["model_number"] = model_number
         print(f"Searching for model number: {model_number}")
         # Build search URL
@@ -57,24 +70,25 @@ class AmazonScraper:
         result["url"] = search_url
         
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context()
-                page = await context.new_page()
-                
-                await page.goto(search_url, wait_until="domcontentloaded", timeout=60000)
+            if detail_url:
+                # Product page verified by an earlier run; no search needed
+                response = await throttled_goto(page, self.retailer_id, detail_url, wait_until="domcontentloaded", timeout=60000)
+                if response is not None and response.status >= 400:
+                    result["error"] = f"Product page returned HTTP {response.status}"
+                    return result
+            else:
+                await throttled_goto(page, self.retailer_id, search_url, wait_until="domcontentloaded", timeout=60000)
                 
                 # Handle possible dialogs
                 await self.handle_dialogs(page)
                 
                 # Wait for products to load
-                await page.wait_for_timeout(2000)
+                await self.wait_ready(page, "search")
                 
                 # Check if there are search results
                 no_results = await page.query_selector('div.s-no-outline span:has-text("No results for")')
                 if no_results:
                     result["error"] = "No search results found"
-                    await browser.close()
                     return result
                 
                 # Get first search result link and click it to go to product details page
@@ -98,70 +112,70 @@ class AmazonScraper:
                     asin_match = re.search(r'data-asin="([A-Z0-9]+)"', await page.content())
                     if asin_match:
                         asin = asin_match.group(1)
-                        await page.goto(f"https://www.amazon.ca/dp/{asin}", wait_until="domcontentloaded")
+                        await throttled_goto(page, self.retailer_id, f"https://www.amazon.ca/dp/{asin}", wait_until="domcontentloaded")
                     else:
                         result["error"] = "No product link found"
-                        await browser.close()
                         return result
                 else:
                     # Navigate to product details page
+                    await throttle(self.retailer_id)
                     await product_link.click()
+            
+            await page.wait_for_load_state("domcontentloaded")
+            await self.wait_ready(page, "detail")
+            
+            # Handle dialogs on the product page
+            await self.handle_dialogs(page)
+            
+            # Update the URL to the actual product page
+            result["url"] = page.url
+            
+            # schema.org data first; the selector chains below are the fallback
+            structured = await self.structured_product(page, model_number)
+            if structured:
+                return self.apply_structured(result, structured, page.url)
+            
+            try:
+                # Check for model name in product details
+                model_name_element = await page.query_selector('#productDetails_techSpec_section_1 tr:has-text("Model Name") .prodDetAttrValue')
                 
-                await page.wait_for_load_state("domcontentloaded")
-                await page.wait_for_timeout(2000)
+                if not model_name_element:
+                    # Try alternative selector methods if the first one fails
+                    model_name_element = await page.query_selector('th:has-text("Model Name") + td')
                 
-                # Handle dialogs on the product page
-                await self.handle_dialogs(page)
+                page_model_number = None
+                if model_name_element:
+                    page_model_text = await model_name_element.inner_text()
+                    # Clean up the model text (removing non-breaking spaces and other characters)
+                    page_model_number = page_model_text.strip().replace('‎', '')
                 
-                # Update the URL to the actual product page
-                result["url"] = page.url
+                # Get price
+                price_element = await page.query_selector('.a-price .a-offscreen')
+                if price_element:
+                    price_text = await price_element.inner_text()
+                    price = parse_price_value(price_text)
+                    if price is None:
+                        raise ValueError("Could not parse price from text")
+                else:
+                    raise ValueError("Could not find price element")
                 
-                try:
-                    # Check for model name in product details
-                    model_name_element = await page.query_selector('#productDetails_techSpec_section_1 tr:has-text("Model Name") .prodDetAttrValue')
-                    
-                    if not model_name_element:
-                        # Try alternative selector methods if the first one fails
-                        model_name_element = await page.query_selector('th:has-text("Model Name") + td')
-                    
-                    page_model_number = None
-                    if model_name_element:
-                        page_model_text = await model_name_element.inner_text()
-                        # Clean up the model text (removing non-breaking spaces and other characters)
-                        page_model_number = page_model_text.strip().replace('‎', '')
-                    
-                    # Get price
-                    price_element = await page.query_selector('.a-price .a-offscreen')
-                    if price_element:
-                        price_text = await price_element.inner_text()
-                        # Extract price number
-                        price_match = re.search(r'[\d,.]+\d+', price_text.replace(',', ''))
-                        if price_match:
-                            price = float(price_match.group(0))
+                # Verify if the actual model number matches the expected one
+                if page_model_number and model_number.upper() in page_model_number.upper():
+                    result["price"] = price
+                else:
+                    # If model name not found in details, fall back to title check
+                    product_title_element = await page.query_selector('#productTitle')
+                    if product_title_element:
+                        product_title = await product_title_element.inner_text()
+                        if model_number.upper() in product_title.upper():
+                            result["price"] = price
                         else:
-                            raise ValueError("Could not parse price from text")
+                            result["error"] = f"Model not found in product details or title"
                     else:
-                        raise ValueError("Could not find price element")
-                    
-                    # Verify if the actual model number matches the expected one
-                    if page_model_number and model_number.upper() in page_model_number.upper():
-                        result["price"] = price
-                    else:
-                        # If model name not found in details, fall back to title check
-                        product_title_element = await page.query_selector('#productTitle')
-                        if product_title_element:
-                            product_title = await product_title_element.inner_text()
-                            if model_number.upper() in product_title.upper():
-                                result["price"] = price
-                            else:
-                                result["error"] = f"Model not found in product details or title"
-                        else:
-                            result["error"] = f"Model not found and couldn't check title"
-                
-                except Exception as e:
-                    result["error"] = f"Data extraction error: {str(e)}"
-                
-                await browser.close()
+                        result["error"] = f"Model not found and couldn't check title"
+            
+            except Exception as e:
+                result["error"] = f"Data extraction error: {str(e)}"
                 
         except TimeoutError as e:
             result["error"] = f"Timeout: {str(e)}"
@@ -188,6 +202,8 @@ async def main():
             print(f"Error: {result['error']}")
             print(f"Search URL: {result['url']}")
 
+    await close_browser_pool()
+
 if __name__ == "__main__":
     asyncio.run(main())
 
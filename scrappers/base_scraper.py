@@ -0,0 +1,250 @@
+import asyncio
+from contextlib import asynccontextmanager
+from urllib.parse import urljoin
+from utils.browser_pool import get_browser_pool
+from utils.dom_extract import extract
+from utils.model_numbers import parse_model_number
+from utils.page_readiness import wait_until_ready
+from utils.price_parser import parse_price_value
+from utils.resource_policy import get_resource_policy
+from utils.result_cache import cache_key
+from utils.search_harvest import get_search_harvest
+from utils.selector_stats import get_selector_stats
+from utils.structured_data import extract_structured_data, find_product
+from utils.tracing import span
+from utils.url_cache import get_url_cache
+
+
+class BaseScraper:
+    """Shared plumbing for the retailer scrapers.
+
+    Subclasses implement scrape_on_page(page, product_name) and describe the browser
+    they need with the class attributes below. Scrapers that read prices from a detail
+    page set detail_pages and accept a detail_url that skips the search page.
+    scrape_product() runs one product on a pooled page; scrape_products() runs many
+    products through one context so the browser, context and dismissed cookie banners
+    are set up once per batch.
+    """
+
+    retailer_id = None       # key shared with price_comparison.SCRAPERS
+    brand = None             # brand stores only: the one brand the retailer sells
+    engine = "chromium"      # chromium, firefox or webkit
+    launch_args = ()         # extra browser launch flags
+    init_script = None       # script injected into every page of the context
+    context_options = {}     # keyword arguments for browser.new_context()
+    readiness = {}           # page kind ("search", "detail", ...) -> Readiness
+    extraction = {}          # page kind -> ExtractionSpec of selector fallback chains
+    detail_pages = False     # scrape_on_page(page, name, detail_url=...) goes straight to the product
+    known_models = {}        # product name -> ModelNumber handed over by the orchestrator
+
+    @classmethod
+    def carries_brand(cls, product_name: str) -> bool:
+        """Whether the product's brand (its first word) can be sold here at all"""
+        if cls.brand is None:
+            return True
+        words = product_name.strip().split()
+        return bool(words) and words[0].lower() == cls.brand.lower()
+
+    def skip_reason(self, product_name: str):
+        """Return an error message if this retailer can't carry the product, else None"""
+        if not self.carries_brand(product_name):
+            return f"Product is not {self.brand} brand"
+        return None
+
+    def parse_model(self, product_name: str):
+        """The product's ModelNumber: the one the orchestrator parsed, else parsed here"""
+        return self.known_models.get(product_name) or parse_model_number(product_name)
+
+    def extract_model_number(self, product_name: str) -> str:
+        """Model number to search and match on, or the name itself if it has none"""
+        return self.parse_model(product_name).model or product_name
+
+    def error_result(self, product_name: str, error) -> dict:
+        """Result dict for a product that failed before the scraper produced one"""
+        return {
+            "retailer": self.retailer_id,
+            "product_name": product_name,
+            "model_number": None,
+            "price": None,
+            "url": None,
+            "error": str(error)
+        }
+
+    @asynccontextmanager
+    async def open_context(self):
+        """Lease a browser context configured for this retailer from the shared pool.
+
+        The retailer's resource policy is installed before any page is opened, so
+        images, fonts and trackers are blocked on every navigation.
+        """
+        pool = get_browser_pool()
+        async with pool.context(self.engine, self.launch_args, self.init_script, **self.context_options) as context:
+            await get_resource_policy(self.retailer_id).apply(context)
+            yield context
+
+    async def prepare_page(self, page):
+        """Hook for one-off page setup such as event handlers or default timeouts"""
+        pass
+
+    async def new_page(self, context):
+        page = await context.new_page()
+        await self.prepare_page(page)
+        return page
+
+    async def wait_ready(self, page, kind, response_waiter=None) -> bool:
+        """Wait until the page satisfies this retailer's readiness for `kind`"""
+        readiness = self.readiness.get(kind)
+        if readiness is None:
+            return False
+        with span(f"wait_ready:{kind}"):
+            return await wait_until_ready(page, readiness, response_waiter)
+
+    async def extract(self, page, kind, spec=None) -> list:
+        """Evaluate this retailer's selector chains for `kind` in one page.evaluate call.
+
+        `spec` overrides self.extraction[kind]. With selector stats on, each chain is
+        tried hottest selector first and the selectors that hit are recorded.
+        """
+        spec = spec or self.extraction[kind]
+        stats = get_selector_stats()
+        with span(f"extract:{kind}"):
+            if stats is None:
+                return await extract(page, spec)
+            spec = stats.order(self.retailer_id, kind, spec)
+            rows = await extract(page, spec)
+        stats.record(self.retailer_id, kind, spec, rows)
+        return rows
+
+    def harvest(self, cards, page_url, field="title") -> int:
+        """Keep every priced card of a search page for the run's later products.
+
+        `field` is the card field naming the model. Retailers that read prices from
+        detail pages also remember each card's URL, so later runs skip the search for
+        those models too. Returns how many cards were kept.
+        """
+        harvest = get_search_harvest()
+        if harvest is None:
+            return 0
+        urls = get_url_cache() if self.detail_pages else None
+        kept = 0
+        for card in cards:
+            url = urljoin(page_url, card["href"]) if card.get("href") else None
+            model = harvest.add(self.retailer_id, card.get(field), parse_price_value(card.get("price")), url,
+                                card.get("title"))
+            if model is None:
+                continue
+            kept += 1
+            if urls is not None and url and urls.get(self.retailer_id, model) is None:
+                urls.put(self.retailer_id, model, url)
+        return kept
+
+    async def structured_product(self, page, model_number):
+        """First pass: the schema.org Product on the current page carrying this model, or None.
+
+        One page.content() call covers every JSON-LD block and microdata item, so when a
+        retailer publishes structured data the DOM selector chains are never probed.
+        """
+        with span("structured_data"):
+            try:
+                html = await page.content()
+            except Exception:
+                return None
+            return find_product(extract_structured_data(html), model_number, parse_model_number(model_number).aliases)
+
+    def apply_structured(self, result, product, page_url) -> dict:
+        """Fill a scraper result from a structured_product() match"""
+        result["price"] = product["price"]
+        if product["url"]:
+            result["url"] = urljoin(page_url, product["url"])
+        elif page_url:
+            result["url"] = page_url
+        result["sale_end_date"] = product["price_valid_until"]
+        result["error"] = None
+        return result
+
+    async def scrape_on_page(self, page, product_name: str) -> dict:
+        raise NotImplementedError
+
+    async def scrape_resolved(self, page, product_name: str) -> dict:
+        """scrape_on_page, starting from the detail URL verified by an earlier run if any.
+
+        A cached page that is gone or fails the scraper's model check is forgotten and
+        the product is searched for again. A price read from a detail page is recorded
+        so the next run can skip the search.
+        """
+        urls = get_url_cache() if self.detail_pages else None
+        if urls is None:
+            return await self.scrape_on_page(page, product_name)
+
+        key = cache_key(self.retailer_id, product_name, self.parse_model(product_name))
+        detail_url = urls.get(*key)
+        if detail_url:
+            result = await self.scrape_on_page(page, product_name, detail_url=detail_url)
+            if result.get("price") is not None and not result.get("error"):
+                return result
+            print(f"{self.retailer_id}: cached page {detail_url} failed ({result.get('error')}), searching again")
+            urls.forget(*key)
+
+        result = await self.scrape_on_page(page, product_name)
+        if result.get("price") is not None and not result.get("error") and result.get("url"):
+            urls.put(*key, result["url"])
+        return result
+
+    async def scrape_product(self, product_name: str, model=None) -> dict:
+        """Scrape a single product on a fresh pooled page; `model` is its parsed ModelNumber"""
+        if model is not None:
+            self.known_models = {product_name: model}
+        reason = self.skip_reason(product_name)
+        if reason:
+            return self.error_result(product_name, reason)
+
+        try:
+            async with self.open_context() as context:
+                page = await self.new_page(context)
+                return await self.scrape_resolved(page, product_name)
+        except Exception as e:
+            return self.error_result(product_name, e)
+
+    async def scrape_products(self, product_names, pages=1, models=None):
+        """Scrape many products, yielding (product_name, result) as each one completes.
+
+        All products share one browser context, worked by `pages` pages in parallel.
+        A page that crashes or gets closed is replaced before the next product.
+        `models` maps product names to ModelNumbers already parsed by the caller.
+        """
+        if models:
+            self.known_models = dict(models)
+        pending = asyncio.Queue()
+        finished = asyncio.Queue()
+        total = 0
+        for product_name in product_names:
+            reason = self.skip_reason(product_name)
+            if reason:
+                yield product_name, self.error_result(product_name, reason)
+            else:
+                pending.put_nowait(product_name)
+                total += 1
+        if not total:
+            return
+
+        async with self.open_context() as context:
+            async def worker():
+                page = None
+                while not pending.empty():
+                    product_name = pending.get_nowait()
+                    try:
+                        if page is None or page.is_closed():
+                            page = await self.new_page(context)
+                        result = await self.scrape_resolved(page, product_name)
+                    except Exception as e:
+                        result = self.error_result(product_name, e)
+                    await finished.put((product_name, result))
+
+            workers = [asyncio.create_task(worker()) for _ in range(max(1, min(pages, total)))]
+            try:
+                for _ in range(total):
+                    yield await finished.get()
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
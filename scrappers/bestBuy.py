@@ -9,16 +9,97 @@ import re
 import json
 import os
 from urllib.parse import quote_plus
-from playwright.async_api import async_playwright, TimeoutError
-from utils.extract_model_number import extract_model_number
+from playwright.async_api import TimeoutError
+from utils.browser_pool import close_browser_pool
+from scrappers.base_scraper import BaseScraper
+from utils.tracing import traced
+from utils.price_parser import parse_price_value
+from utils.dom_extract import ExtractionSpec, Field
+from utils.page_readiness import Readiness
+from utils.rate_limiter import throttled_goto
 
-class BestBuyScraper:
+class BestBuyScraper(BaseScraper):
     """Specialized scraper for BestBuy Canada website price information"""
     
+    retailer_id = "Best_Buy"
+    detail_pages = True
+    
+    readiness = {
+        "search": Readiness([
+            'div[data-automation="productGridItem"]',
+            '.productItemContainer_3Y0r7',
+            '.x-productListItem',
+            'li.sku-item',
+            '.no-results-found'
+        ], timeout=5000),
+        "detail": Readiness(['div[data-automation="MODEL_NUMBER_ID"]'], timeout=3000),
+    }
+    
+    # Fallback chains for the search result cards, resolved in one round trip. The
+    # leading site-version variants of each element may be tried hottest first; the
+    # generic catch-alls and the regular-price selectors after them stay last.
+    extraction = {
+        "search": ExtractionSpec(
+            cards=[
+                'div[data-automation="productGridItem"]',
+                '.productItemContainer_3Y0r7',
+                '.x-productListItem',
+                'li.sku-item',
+                '.product-list li'
+            ],
+            reorderable_cards=4,
+            fields={
+                "title": Field([
+                    'div[data-automation="productItemName"]',
+                    '.productItemName_3IZ3c',
+                    'a[data-automation="productItemLink"]',
+                    '.x-productListItem_title',
+                    '.sku-title',
+                    '.product-title',
+                    'h4',
+                    ('a', 'title')  # If title selectors fail, try getting title from link element
+                ], reorderable=5),
+                "price": Field([
+                    'div[data-automation="product-price"]',
+                    '.currentPrice_2ioYO',
+                    '.price_FHDfG',
+                    '.product-price',
+                    '.price-regular',
+                    '.priceContainer_IgF7 span',
+                    'div[class*="price"]'
+                ], pattern=r'[\d,]+\.\d+', reorderable=3),
+                "href": Field([
+                    'a[data-automation="productItemLink"]',
+                    'a.link_3hcyN',
+                    'a.product-link',
+                    'a.sku-link',
+                    'a'
+                ], attr='href', reorderable=4),
+            },
+        ),
+    }
+    
+    # Use more browser configurations to avoid detection
+    context_options = {
+        "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36",
+        "viewport": {"width": 1280, "height": 800},
+        "locale": "en-CA",
+        "geolocation": {"latitude": 43.6532, "longitude": -79.3832},  # Toronto coordinates
+        "permissions": ["geolocation"],
+    }
+    
+    # Add browser disguise
+    init_script = """
+        Object.defineProperty(navigator, 'webdriver', {
+            get: () => false,
+        });
+    """
+    
     def __init__(self):
         self.base_url = "https://www.bestbuy.ca/en-ca/search?path=custom0productcondition%253ABrand%2BNew&search={}"
     
 
+    @traced("handle_dialogs")
     async def handle_dialogs(self, page):
         """Handle various dialogs that might appear"""
         # Try multiple selectors for location/cookie/newsletter dialogs
@@ -57,7 +138,35 @@ class BestBuyScraper:
         except Exception:
             pass
     
-    async def scrape_product(self, product_name: str) -> dict:
+    async def prepare_page(self, page):
+        """Listen and automatically close dialogs"""
+        page.on("dialog", lambda dialog: asyncio.create_task(dialog.dismiss()))
+
+    async def find_sale_end_date(self, page):
+        """Sale end date shown on a product page, or None"""
+        try:
+            sale_date_element = await page.query_selector('time[itemprop="priceValidUntil"]')
+            if sale_date_element:
+                return (await sale_date_element.inner_text()).strip()
+            # Also try alternative selectors
+            alt_selectors = [
+                'p.text-micro-lg span time',
+                'span.text-v2-value-red time',
+                'p:has(span:contains("Sale ends")) time'
+            ]
+
+            for alt_selector in alt_selectors:
+                try:
+                    alt_element = await page.query_selector(alt_selector)
+                    if alt_element:
+                        return (await alt_element.inner_text()).strip()
+                except Exception:
+                    continue
+        except Exception as e:
+            print(f"Error extracting sale end date: {str(e)}")
+        return None
+
+    async def scrape_on_page(self, page, product_name: str, detail_url=None) -> dict:
         """Scrape BestBuy price information based on product name"""
         result = {
             "retailer": "BestBuy",
@@ -71,7 +180,7 @@ class BestBuyScraper:
         }
         
         # Extract model number
-        model_number = extract_model_number(product_name)
+        model_number = self.extract_model_number(product_name)
         result["model_number"] = model_number
         
         # Build search URL
@@ -79,37 +188,19 @@ class BestBuyScraper:
         result["url"] = search_url
         
         try:
-            async with async_playwright() as p:
-                # Use more browser configurations to avoid detection
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36",
-                    viewport={"width": 1280, "height": 800},
-                    locale="en-CA",
-                    geolocation={"latitude": 43.6532, "longitude": -79.3832},  # Toronto coordinates
-                    permissions=["geolocation"],
-                )
-                
-                # Add browser disguise
-                await context.add_init_script("""
-                    Object.defineProperty(navigator, 'webdriver', {
-                        get: () => false,
-                    });
-                """)
-                
-                page = await context.new_page()
-                
-                # Listen and automatically close dialogs
-                page.on("dialog", lambda dialog: asyncio.create_task(dialog.dismiss()))
-                
+            if detail_url:
+                # Product page verified by an earlier run; no search needed
+                product_url = detail_url
+                result["url"] = detail_url
+            else:
                 # Navigate to search page
-                await page.goto(search_url, wait_until="domcontentloaded", timeout=30000)
+                await throttled_goto(page, self.retailer_id, search_url, wait_until="domcontentloaded", timeout=30000)
                 
                 # Handle possible dialogs
                 await self.handle_dialogs(page)
                 
                 # Wait for more content to load
-                await page.wait_for_timeout(5000)
+                await self.wait_ready(page, "search")
                 
                 # Handle possible delayed dialogs
                 await self.handle_dialogs(page)
@@ -119,176 +210,100 @@ class BestBuyScraper:
                     await page.wait_for_selector('div[data-automation="productGridItem"], .productItemContainer_3Y0r7, .x-productListItem, li.sku-item', timeout=10000)
                 except TimeoutError:
                     result["error"] = "Timeout waiting for product grid"
-                    await browser.close()
                     return result
                 
                 # Check if there are no search results
                 no_results = await page.query_selector('.no-results-found')
                 if no_results:
                     result["error"] = "No results found"
-                    await browser.close()
                     return result
                 
-                # Try multiple product list selectors
-                selectors = [
-                    'div[data-automation="productGridItem"]',
-                    '.productItemContainer_3Y0r7',
-                    '.x-productListItem',
-                    'li.sku-item',
-                    '.product-list li'
-                ]
-                
-                first_product = None
-                
-                for selector in selectors:
-                    elements = await page.query_selector_all(selector)
-                    if elements:
-                        first_product = elements[0]
-                        break
-                
-                if not first_product:
+                # Resolve every card's title, price and link chains in one call; the
+                # first card is the product, the rest answer later products of the run
+                products = await self.extract(page, "search")
+                if not products:
                     result["error"] = "No product items found with any known selector"
-                    await browser.close()
                     return result
+                self.harvest(products, page.url)
+                first_product = products[0]
                 
-                # Try different title selectors
-                title_selectors = [
-                    'div[data-automation="productItemName"]',
-                    '.productItemName_3IZ3c',
-                    'a[data-automation="productItemLink"]',
-                    '.x-productListItem_title',
-                    '.sku-title',
-                    '.product-title',
-                    'h4'
-                ]
-                
-                title = None
-                for selector in title_selectors:
-                    title_element = await first_product.query_selector(selector)
-                    if title_element:
-                        title = await title_element.inner_text()
-                        break
-                
-                # If title selectors fail, try getting title from link element
-                if not title:
-                    link_element = await first_product.query_selector('a')
-                    if link_element:
-                        title_attr = await link_element.get_attribute('title')
-                        if title_attr:
-                            title = title_attr
-                
-                if not title:
+                if not first_product["title"]:
                     result["error"] = "Could not find product title with any known selector"
-                    await browser.close()
                     return result
                 
-                # Try different price selectors
-                price_selectors = [
-                    'div[data-automation="product-price"]',
-                    '.currentPrice_2ioYO',
-                    '.price_FHDfG',
-                    '.product-price',
-                    '.price-regular',
-                    '.priceContainer_IgF7 span',
-                    'div[class*="price"]'
-                ]
-                
-                for selector in price_selectors:
-                    price_element = await first_product.query_selector(selector)
-                    if price_element:
-                        price_text = await price_element.inner_text()
-                        # Extract price number
-                        price_match = re.search(r'[\d,]+\.\d+', price_text)
-                        if price_match:
-                            price = float(price_match.group(0).replace(',', ''))
-                            result["price"] = price
-                            break
+                if first_product["price"]:
+                    result["price"] = parse_price_value(first_product["price"])
                 
                 if not result["price"]:
                     result["error"] = "Could not find or extract price"
                 
-                # Try different link selectors
-                link_selectors = [
-                    'a[data-automation="productItemLink"]',
-                    'a.link_3hcyN',
-                    'a.product-link',
-                    'a.sku-link',
-                    'a'
-                ]
-                
                 product_url = None
-                for selector in link_selectors:
-                    link_element = await first_product.query_selector(selector)
-                    if link_element:
-                        href = await link_element.get_attribute('href')
-                        if href:
-                            if href.startswith('/'):
-                                product_url = f"https://www.bestbuy.ca{href}"
-                            else:
-                                product_url = href
-                            result["url"] = product_url
-                            break
+                href = first_product["href"]
+                if href:
+                    if href.startswith('/'):
+                        product_url = f"https://www.bestbuy.ca{href}"
+                    else:
+                        product_url = href
+                    result["url"] = product_url
+            
+            # If we found a product URL, navigate to it and extract sale end date
+            if product_url:
+                # Navigate to product detail page
+                response = await throttled_goto(page, self.retailer_id, product_url, wait_until="domcontentloaded", timeout=30000)
+                if detail_url and response is not None and response.status >= 400:
+                    result["error"] = f"Product page returned HTTP {response.status}"
+                    return result
+                
+                # Handle possible dialogs again
+                await self.handle_dialogs(page)
+                
+                # Wait for content to load
+                await self.wait_ready(page, "detail")
                 
-                # If we found a product URL, navigate to it and extract sale end date
-                if product_url:
-                    # Navigate to product detail page
-                    await page.goto(product_url, wait_until="domcontentloaded", timeout=30000)
-                    
-                    # Handle possible dialogs again
-                    await self.handle_dialogs(page)
-                    
-                    # Wait for content to load
-                    await page.wait_for_timeout(3000)
-                    
-                    try:
-                        model_element = await page.query_selector('div[data-automation="MODEL_NUMBER_ID"]')
-                        if model_element:
-                            model_text = await model_element.inner_text()
+                # schema.org data first; the selector chains below are the fallback
+                structured = await self.structured_product(page, model_number)
+                if structured:
+                    result["exact_model"] = structured["mpn"]
+                    self.apply_structured(result, structured, page.url)
+                    # JSON-LD often leaves out priceValidUntil; the page still shows the date
+                    if not result.get("sale_end_date"):
+                        result["sale_end_date"] = await self.find_sale_end_date(page)
+                    return result
+                
+                try:
+                    model_element = await page.query_selector('div[data-automation="MODEL_NUMBER_ID"]')
+                    if model_element:
+                        model_text = await model_element.inner_text()
 
-                            model_match = re.search(r'Model:\s*(\S+)', model_text)
-                            if model_match:
-                                exact_model = model_match.group(1).strip()
-                                result["exact_model"] = exact_model
-                                
+                        model_match = re.search(r'Model:\s*(\S+)', model_text)
+                        if model_match:
+                            exact_model = model_match.group(1).strip()
+                            result["exact_model"] = exact_model
+                            
 
-                                if model_number.lower() in exact_model.lower() or exact_model.lower() in model_number.lower():
+                            if model_number.lower() in exact_model.lower() or exact_model.lower() in model_number.lower():
 
-                                    pass
-                                else:
-                                    result["error"] = f"Exact model from details page ({exact_model}) does not match expected model ({model_number})"
-                                    await browser.close()
-                                    return result
-                    except Exception as e:
-                        print(f"Error extracting exact model: {str(e)}")
-                    
-                    # Try to find sale end date
-                    try:
-                        sale_date_element = await page.query_selector('time[itemprop="priceValidUntil"]')
-                        if sale_date_element:
-                            sale_end_date = await sale_date_element.inner_text()
-                            result["sale_end_date"] = sale_end_date.strip()
-                        else:
-                            # Also try alternative selectors
-                            alt_selectors = [
-                                'p.text-micro-lg span time',
-                                'span.text-v2-value-red time',
-                                'p:has(span:contains("Sale ends")) time'
-                            ]
-                            
-                            for alt_selector in alt_selectors:
-                                try:
-                                    alt_element = await page.query_selector(alt_selector)
-                                    if alt_element:
-                                        sale_end_date = await alt_element.inner_text()
-                                        result["sale_end_date"] = sale_end_date.strip()
-                                        break
-                                except Exception:
-                                    continue
-                    except Exception as e:
-                        print(f"Error extracting sale end date: {str(e)}")
-                        # Continue without sale end date
+                                pass
+                            else:
+                                result["error"] = f"Exact model from details page ({exact_model}) does not match expected model ({model_number})"
+                                return result
+                except Exception as e:
+                    print(f"Error extracting exact model: {str(e)}")
+                
+                # Without a search card (cached detail URL) the price comes from this page
+                if result["price"] is None:
+                    price_element = await page.query_selector('div[data-automation="product-price"]')
+                    if price_element:
+                        result["price"] = parse_price_value(await price_element.inner_text())
+                        if result["price"] is not None:
+                            result["error"] = None
+                    if result["price"] is None:
+                        result["error"] = "Could not find or extract price"
                 
-                await browser.close()
+                # Try to find sale end date
+                sale_end_date = await self.find_sale_end_date(page)
+                if sale_end_date:
+                    result["sale_end_date"] = sale_end_date
                 
         except Exception as e:
             result["error"] = str(e)
@@ -317,5 +332,7 @@ async def main():
             print(f"Error: {result['error']}")
             print(f"Search URL: {result['url']}")
 
+    await close_browser_pool()
+
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -5,16 +5,38 @@
 # if you wish to contribute to this file, please add your name and phone number in the comments below
 
 import asyncio
-import re
-from playwright.async_api import async_playwright, TimeoutError
+from playwright.async_api import TimeoutError
+from utils.browser_pool import close_browser_pool
+from scrappers.base_scraper import BaseScraper
+from utils.tracing import traced
+from utils.price_parser import parse_price_value
+from utils.page_readiness import Readiness
+from utils.rate_limiter import throttle, throttled_goto
 from urllib.parse import quote_plus
-from utils.extract_model_number import extract_model_number
 import os
 
-class CostcoScraper:
+class CostcoScraper(BaseScraper):
+    retailer_id = "Costco"
+    engine = "webkit"
+    context_options = {
+        "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 13_2) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Safari/605.1.15",
+        "viewport": {"width": 1366, "height": 768}
+    }
+    readiness = {
+        "search": Readiness(['a[data-testid^="Link"][href*="product"]'], timeout=2000),
+        "detail": Readiness([
+            '.product-price .value',
+            '.price-value',
+            '.your-price .value',
+            '[data-automation="price"]',
+            '[data-testid^="Text_Price"]'
+        ], timeout=10000),
+    }
+
     def __init__(self):
         self.base_url = "https://www.costco.ca/s?langId=-24&keyword={}"
 
+    @traced("handle_dialogs")
     async def handle_dialogs(self, page):
         print("Handling possible dialogs...")
         selectors = [
@@ -39,7 +61,7 @@ class CostcoScraper:
         for attempt in range(retries):
             try:
                 print(f"Attempting navigation to {url} (try {attempt+1})")
-                await page.goto(url, wait_until="domcontentloaded", timeout=20000)
+                await throttled_goto(page, self.retailer_id, url, wait_until="domcontentloaded", timeout=20000)
                 return True
             except Exception as e:
                 print(f"Navigation failed: {e}")
@@ -48,15 +70,12 @@ class CostcoScraper:
 
     async def extract_price_from_element(self, element):
         try:
-            price_text = await element.inner_text()
-            match = re.search(r'[\d,]+\.?\d*', price_text)
-            if match:
-                return float(match.group(0).replace(',', ''))
+            return parse_price_value(await element.inner_text())
         except:
             return None
         return None
 
-    async def scrape_product(self, product_name: str) -> dict:
+    async def scrape_on_page(self, page, product_name: str) -> dict:
         result = {
             "retailer": "Costco",
             "product_name": product_name,
@@ -66,50 +85,47 @@ class CostcoScraper:
             "error": None
         }
 
-        model_number = extract_model_number(product_name)
+        model_number = self.extract_model_number(product_name)
         result["model_number"] = model_number
 
         try:
-            async with async_playwright() as p:
-                browser = await p.webkit.launch(headless=True)
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 13_2) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Safari/605.1.15",
-                    viewport={"width": 1366, "height": 768}
-                )
-                page = await context.new_page()
-
-                url = self.base_url.format(quote_plus(product_name))
-                if not await self.try_navigate(page, url):
-                    result["error"] = "Failed to load search page"
-                    return result
-
-                await self.handle_dialogs(page)
-                await page.wait_for_timeout(2000)
-
-                product_links = await page.query_selector_all('a[data-testid^="Link"][href*="product"]')
-                if product_links:
-                    print("Clicking into first product link...")
-                    await product_links[0].click()
-                    await page.wait_for_load_state("networkidle")
-
-                    os.makedirs("debug_screenshots", exist_ok=True)
-                    await page.screenshot(path=f"debug_screenshots/{model_number}_detail.png", full_page=True)
-
-                    price_selector = '.product-price .value, .price-value, .your-price .value, [data-automation="price"], [data-testid^="Text_Price"]'
-                    price_elem = await page.query_selector(price_selector)
-                    if price_elem:
-                        price = await self.extract_price_from_element(price_elem)
-                        if price:
-                            result["price"] = price
-                            result["url"] = page.url
-                        else:
-                            result["error"] = "Price element found but no valid price parsed"
+            url = self.base_url.format(quote_plus(product_name))
+            if not await self.try_navigate(page, url):
+                result["error"] = "Failed to load search page"
+                return result
+
+            await self.handle_dialogs(page)
+            await self.wait_ready(page, "search")
+
+            product_links = await page.query_selector_all('a[data-testid^="Link"][href*="product"]')
+            if product_links:
+                print("Clicking into first product link...")
+                await throttle(self.retailer_id)
+                await product_links[0].click()
+                await page.wait_for_load_state("domcontentloaded")
+                await self.wait_ready(page, "detail")
+
+                os.makedirs("debug_screenshots", exist_ok=True)
+                await page.screenshot(path=f"debug_screenshots/{model_number}_detail.png", full_page=True)
+
+                # schema.org data first; the selector chains below are the fallback
+                structured = await self.structured_product(page, model_number)
+                if structured:
+                    return self.apply_structured(result, structured, page.url)
+
+                price_selector = '.product-price .value, .price-value, .your-price .value, [data-automation="price"], [data-testid^="Text_Price"]'
+                price_elem = await page.query_selector(price_selector)
+                if price_elem:
+                    price = await self.extract_price_from_element(price_elem)
+                    if price:
+                        result["price"] = price
+                        result["url"] = page.url
                     else:
-                        result["error"] = "Price element not found"
+                        result["error"] = "Price element found but no valid price parsed"
                 else:
-                    result["error"] = "No product link found"
-
-                await browser.close()
+                    result["error"] = "Price element not found"
+            else:
+                result["error"] = "No product link found"
 
         except Exception as e:
             result["error"] = str(e)
@@ -121,5 +137,6 @@ if __name__ == "__main__":
         scraper = CostcoScraper()
         result = await scraper.scrape_product("Samsung 75\" Class - QN90F Series 4K UHD NEO QLED Mini LED TV - QN75QN90FAFXZC")
         print(result)
+        await close_browser_pool()
 
     asyncio.run(main())
\ No newline at end of file
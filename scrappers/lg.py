@@ -5,39 +5,34 @@
 # if you wish to contirbute to this file, please add your name and phone number in the comments below
 
 import asyncio
-import re
 import os
-from playwright.async_api import async_playwright, TimeoutError
+from playwright.async_api import TimeoutError
+from utils.browser_pool import close_browser_pool
+from scrappers.base_scraper import BaseScraper
+from utils.tracing import traced
+from utils.price_parser import parse_price_value
+from utils.page_readiness import Readiness
+from utils.rate_limiter import throttled_goto
 
-class LGScraper:
+class LGScraper(BaseScraper):
     """Specialized scraper for LG official website price information"""
     
+    retailer_id = "LG"
+    brand = "LG"
+    detail_pages = True
+    readiness = {
+        "search": Readiness(['.cs-search-result__all-item a.title[href]', '.no-results-message'], timeout=2000),
+        "detail": Readiness(['.c-price__purchase', '.c-text-contents__eyebrow .cmp-text'], timeout=2000),
+    }
+    
     def __init__(self):
         self.base_url = "https://www.lg.com/ca_en/search/?search={}"
-    
-    def extract_model_number(self, product_name: str) -> str:
-        """Extract model number from product name"""
-        # First try to match content after hyphen as model number
-        model_match = re.search(r'-\s*([A-Z0-9]+[A-Z0-9]*(?:[._-][A-Z0-9]+)*)(?:\s|$)', product_name)
         
-        # If no model found after hyphen, try matching other common model patterns
-        if not model_match:
-            # Match number+letter+number combinations
-            model_match = re.search(r'(\d+[A-Z]+\d+[A-Z0-9]*)(?:\s|$)', product_name)
-            
-        # If still not found, try matching letter+number combinations
-        if not model_match:
-            model_match = re.search(r'([A-Z]+\d+[A-Z0-9]*)(?:\s|$)', product_name)
-            
-        if model_match:
-            return model_match.group(1)
-        return product_name  # Return original name if extraction fails
-    
     def check_brand(self, product_name: str) -> bool:
         """Check if the first word of the product name is LG"""
-        first_word = product_name.strip().split(' ')[0].lower()
-        return first_word == "lg"
+        return self.carries_brand(product_name)
     
+    @traced("handle_dialogs")
     async def handle_dialogs(self, page):
         """Handle various dialogs that might appear"""
         # Handle cookie dialogs and other possible popups
@@ -62,7 +57,7 @@ class LGScraper:
         except Exception:
             pass
     
-    async def scrape_product(self, product_name: str) -> dict:
+    async def scrape_on_page(self, page, product_name: str, detail_url=None) -> dict:
         """Scrape LG website price information based on product name"""
         result = {
             "retailer": "LG",
@@ -87,114 +82,108 @@ class LGScraper:
         result["url"] = search_url
         
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context()
-                page = await context.new_page()
-                
-                await page.goto(search_url, wait_until="domcontentloaded", timeout=60000)
+            # A detail_url verified by an earlier run skips the search
+            if not detail_url:
+                await throttled_goto(page, self.retailer_id, search_url, wait_until="domcontentloaded", timeout=60000)
                 
                 # Handle possible dialogs
                 await self.handle_dialogs(page)
                 
                 # Wait for products to load
-                await page.wait_for_timeout(2000)
+                await self.wait_ready(page, "search")
                 
                 # Check if there are search results
                 no_results = await page.query_selector('.no-results-message')
                 if no_results:
                     result["error"] = "No search results found"
-                    await browser.close()
                     return result
                 
                 # Check if there are search results and get the first product URL
                 product_link = await page.query_selector('.cs-search-result__all-item a.title[href]')
                 if not product_link:
                     result["error"] = "No product links found"
-                    await browser.close()
                     return result
                 
                 # Get detail page URL and navigate to it
                 detail_url = await product_link.get_attribute('href')
                 if not detail_url.startswith('http'):
                     detail_url = 'https://www.lg.com' + detail_url
-                
-                # Update the URL in the result
-                result["url"] = detail_url
-                
-                # Navigate to the detail page
-                await page.goto(detail_url, wait_until="domcontentloaded", timeout=60000)
-                await page.wait_for_timeout(2000)
-                
-                # Handle possible dialogs on the detail page
-                await self.handle_dialogs(page)
-                
-                # Get the actual model number from the detail page
-                model_element = await page.query_selector('.c-text-contents__eyebrow .cmp-text')
-                product_model = None
-                if model_element:
-                    product_model = await model_element.inner_text()
-                    product_model = product_model.strip()
-                
-                if not product_model:
-                    result["error"] = "No product model found on detail page"
-                    await browser.close()
-                    return result
-                
-                # Try to get price
-                try:
-                    # Get price
-                    price_element = await page.query_selector('.c-price__purchase')
-                    if price_element:
-                        price_text = await price_element.inner_text()
-                        
-                        # Extract numbers from price text
-                        price_match = re.search(r'\$[\d,]+\.?\d*', price_text)
-                        if price_match:
-                            price_str = price_match.group(0).replace('$', '').replace(',', '')
-                            price = float(price_str)
-                        else:
-                            raise ValueError("Could not parse price from text")
-                        
-                        # Verify if product model matches our search model number
-                        # Case-insensitive exact match or close match
-                        if product_model and (model_number.upper() == product_model.upper() or 
-                                              model_number.upper().replace('-', '') == product_model.upper().replace('-', '')):
-                            result["price"] = price
-                        else:
-                            result["error"] = f"Model does not match: searching for '{model_number}', found '{product_model}'"
+            
+            # Update the URL in the result
+            result["url"] = detail_url
+            
+            # Navigate to the detail page
+            response = await throttled_goto(page, self.retailer_id, detail_url, wait_until="domcontentloaded", timeout=60000)
+            if response is not None and response.status >= 400:
+                result["error"] = f"Product page returned HTTP {response.status}"
+                return result
+            await self.wait_ready(page, "detail")
+            
+            # Handle possible dialogs on the detail page
+            await self.handle_dialogs(page)
+            
+            # schema.org data first; the selector chains below are the fallback
+            structured = await self.structured_product(page, model_number)
+            if structured:
+                return self.apply_structured(result, structured, page.url)
+            
+            # Get the actual model number from the detail page
+            model_element = await page.query_selector('.c-text-contents__eyebrow .cmp-text')
+            product_model = None
+            if model_element:
+                product_model = await model_element.inner_text()
+                product_model = product_model.strip()
+            
+            if not product_model:
+                result["error"] = "No product model found on detail page"
+                return result
+            
+            # Try to get price
+            try:
+                # Get price
+                price_element = await page.query_selector('.c-price__purchase')
+                if price_element:
+                    price_text = await price_element.inner_text()
+                    
+                    price = parse_price_value(price_text)
+                    if price is None:
+                        raise ValueError("Could not parse price from text")
+                    
+                    # Verify if product model matches our search model number
+                    # Case-insensitive exact match or close match
+                    if product_model and (model_number.upper() == product_model.upper() or 
+                                          model_number.upper().replace('-', '') == product_model.upper().replace('-', '')):
+                        result["price"] = price
                     else:
-                        # Try other possible price selectors
-                        alt_price_selectors = [
-                            '.price',
-                            '.product-price',
-                            '[data-price]',
-                            '.price-value'
-                        ]
-                        
-                        for selector in alt_price_selectors:
-                            alt_price_element = await page.query_selector(selector)
-                            if alt_price_element:
-                                price_text = await alt_price_element.inner_text()
-                                price_match = re.search(r'\$[\d,]+\.?\d*', price_text)
-                                if price_match:
-                                    price_str = price_match.group(0).replace('$', '').replace(',', '')
-                                    price = float(price_str)
-                                    
-                                    # Verify product model
-                                    if product_model and (model_number.upper() in product_model.upper() or product_model.upper() in model_number.upper()):
-                                        result["price"] = price
-                                        break
-                                    else:
-                                        result["error"] = f"Model does not match product model"
-                        
-                        if not result["price"] and not result["error"]:
-                            raise ValueError("Could not find price element")
-                
-                except Exception as e:
-                    result["error"] = f"Price extraction error: {str(e)}"
-                
-                await browser.close()
+                        result["error"] = f"Model does not match: searching for '{model_number}', found '{product_model}'"
+                else:
+                    # Try other possible price selectors
+                    alt_price_selectors = [
+                        '.price',
+                        '.product-price',
+                        '[data-price]',
+                        '.price-value'
+                    ]
+                    
+                    for selector in alt_price_selectors:
+                        alt_price_element = await page.query_selector(selector)
+                        if alt_price_element:
+                            price_text = await alt_price_element.inner_text()
+                            price = parse_price_value(price_text)
+                            if price is not None:
+                                
+                                # Verify product model
+                                if product_model and (model_number.upper() in product_model.upper() or product_model.upper() in model_number.upper()):
+                                    result["price"] = price
+                                    break
+                                else:
+                                    result["error"] = f"Model does not match product model"
+                    
+                    if not result["price"] and not result["error"]:
+                        raise ValueError("Could not find price element")
+            
+            except Exception as e:
+                result["error"] = f"Price extraction error: {str(e)}"
                 
         except TimeoutError as e:
             result["error"] = f"Timeout: {str(e)}"
@@ -223,5 +212,7 @@ async def main():
             if result["url"]:
                 print(f"Search URL: {result['url']}")
 
+    await close_browser_pool()
+
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
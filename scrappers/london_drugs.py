@@ -5,40 +5,52 @@
 # if you wish to contirbute to this file, please add your name and phone number in the comments below
 
 import asyncio
-import re
 import os
-from playwright.async_api import async_playwright, TimeoutError
+from playwright.async_api import TimeoutError
+from utils.browser_pool import close_browser_pool
+from scrappers.base_scraper import BaseScraper
+from utils.tracing import traced
+from utils.price_parser import parse_price_value
+from utils.candidate_match import best_candidate
+from utils.dom_extract import ExtractionSpec, Field
+from utils.page_readiness import Readiness
+from utils.rate_limiter import throttled_goto
 from urllib.parse import quote_plus
 
-class LondonDrugsScraper:
+class LondonDrugsScraper(BaseScraper):
     """Specialized scraper for London Drugs website price information"""
     
+    retailer_id = "LondonDrugs"
+    context_options = {
+        "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
+    }
+    readiness = {
+        "search": Readiness(['.product-card', '.product-item', 'div.no-results'], timeout=2000),
+    }
+    extraction = {
+        "search": ExtractionSpec(
+            cards=['.product-card, .product-item'],
+            fields={
+                "title": Field(['.product-name, h3']),
+                "price": Field([
+                    'small.font-semibold.text-accent',  # discount price
+                    'small.font-semibold',              # regular price
+                    '.product-card-price, .price'
+                ]),
+                "href": Field(['a'], attr='href'),
+            },
+        ),
+    }
+    
     def __init__(self):
         self.base_url = "https://www.londondrugs.com/search?q={}"
     
     def extract_brand_and_model(self, product_name: str) -> tuple:
         """Extract brand and model from product name"""
-        # Extract brand (usually the first word in product name)
-        brand_match = re.match(r'^([A-Za-z]+)', product_name)
-        brand = brand_match.group(1) if brand_match else ""
-        
-        # Extract model number from product name
-        # First try to match content after hyphen as model number
-        model_match = re.search(r'-\s*([A-Z0-9]+[A-Z0-9]*(?:[._-][A-Z0-9]+)*)(?:\s|$)', product_name)
-        
-        # If no model found after hyphen, try matching other common model patterns
-        if not model_match:
-            # Match number+letter+number combinations
-            model_match = re.search(r'(\d+[A-Z]+\d+[A-Z0-9]*)(?:\s|$)', product_name)
-            
-        # If still not found, try matching letter+number combinations
-        if not model_match:
-            model_match = re.search(r'([A-Z]+\d+[A-Z0-9]*)(?:\s|$)', product_name)
-        
-        model = model_match.group(1) if model_match else ""
-        
-        return brand, model
+        parsed = self.parse_model(product_name)
+        return parsed.brand, parsed.model or ""
     
+    @traced("handle_dialogs")
     async def handle_dialogs(self, page):
         """Handle various dialogs that might appear"""
         # Handle cookie dialogs and other possible popups
@@ -63,7 +75,7 @@ class LondonDrugsScraper:
         except Exception:
             pass
     
-    async def scrape_product(self, product_name: str) -> dict:
+    async def scrape_on_page(self, page, product_name: str) -> dict:
         """Scrape London Drugs price information based on product name"""
         result = {
             "retailer": "London Drugs",
@@ -86,106 +98,56 @@ class LondonDrugsScraper:
         result["url"] = search_url
         
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
-                )
-                
-                page = await context.new_page()
-                
-                await page.goto(search_url, wait_until="domcontentloaded", timeout=30000)
-                
-                # Handle possible dialogs
-                await self.handle_dialogs(page)
-                
-                # Wait for products to load
-                await page.wait_for_timeout(2000)
-                
-                # Check if there are search results
-                no_results = await page.query_selector('div.no-results, div:has-text("No results found")')
-                if no_results:
-                    result["error"] = "No search results found"
-                    await browser.close()
-                    return result
-                
-                # Get first search result product name
-                product_elements = await page.query_selector_all('.product-card, .product-item')
-                
-                if not product_elements or len(product_elements) == 0:
-                    result["error"] = "No product elements found"
-                    await browser.close()
-                    return result
-                
-                # Iterate through product elements, looking for matching model
-                for product_element in product_elements:
-                    # Get product name
-                    title_element = await product_element.query_selector('.product-name, h3')
-                    if not title_element:
-                        continue
-                    
-                    product_title = await title_element.inner_text()
-                    product_title = product_title.strip()
-                    
-                    # Verify if product title contains our search model
-                    if model_number.upper() not in product_title.upper():
-                        continue
-                    
-                    # Try to get price information - first check for discount price
-                    try:
-                        # Check if there's a discount price
-                        discount_price_element = await product_element.query_selector('small.font-semibold.text-accent')
-                        
-                        if discount_price_element:
-                            # If discount price found
-                            price_text = await discount_price_element.inner_text()
-                        else:
-                            # If no discount price, try to get regular price
-                            regular_price_element = await product_element.query_selector('small.font-semibold')
-                            
-                            if regular_price_element:
-                                price_text = await regular_price_element.inner_text()
-                            else:
-                                # If regular price can't be found, try other price selectors
-                                alt_price_element = await product_element.query_selector('.product-card-price, .price')
-                                if alt_price_element:
-                                    price_text = await alt_price_element.inner_text()
-                                else:
-                                    continue
-                        
-                        # Extract number from price text
-                        price_match = re.search(r'\$[\d,]+\.?\d*', price_text)
-                        if price_match:
-                            price_str = price_match.group(0).replace('$', '').replace(',', '')
-                            price = float(price_str)
-                            result["price"] = price
-                            
-                            # Get product URL
-                            try:
-                                link_element = await product_element.query_selector('a')
-                                if link_element:
-                                    product_url = await link_element.get_attribute('href')
-                                    if product_url:
-                                        if product_url.startswith('/'):
-                                            product_url = f"https://www.londondrugs.com{product_url}"
-                                        result["url"] = product_url
-                            except Exception:
-                                # This won't affect price result, so keep original search URL
-                                pass
-                            
-                            # Found matching product and price, can exit loop
-                            break
-                        else:
-                            continue
-                        
-                    except Exception:
-                        continue
-                
-                # If no matching product and price found
-                if not result["price"]:
-                    result["error"] = "Could not find matching product with price"
+            await throttled_goto(page, self.retailer_id, search_url, wait_until="domcontentloaded", timeout=30000)
+            
+            # Handle possible dialogs
+            await self.handle_dialogs(page)
+            
+            # Wait for products to load
+            await self.wait_ready(page, "search")
+            
+            # Check if there are search results
+            no_results = await page.query_selector('div.no-results, div:has-text("No results found")')
+            if no_results:
+                result["error"] = "No search results found"
+                return result
+            
+            # schema.org data first; the selector chains below are the fallback
+            structured = await self.structured_product(page, model_number)
+            if structured:
+                return self.apply_structured(result, structured, page.url)
+            
+            # Read every result card's title, price and link in one round trip
+            product_cards = await self.extract(page, "search")
+            
+            if not product_cards:
+                result["error"] = "No product elements found"
+                return result
+            self.harvest(product_cards, page.url)
+            
+            # Pick the card that best carries our model among those showing a price
+            # (price chain: discount price, then regular price, then other price selectors)
+            priced_cards = [card for card in product_cards
+                            if card["title"] and parse_price_value(card["price"]) is not None]
+            match = best_candidate(priced_cards, self.parse_model(product_name))
+            if match:
+                card = match.candidate
+                result["match_confidence"] = match.confidence
+                result["price"] = parse_price_value(card["price"])
                 
-                await browser.close()
+                # Get product URL
+                product_url = card["href"]
+                if product_url:
+                    if product_url.startswith('/'):
+                        product_url = f"https://www.londondrugs.com{product_url}"
+                    result["url"] = product_url
+            
+            # If no matching product and price found
+            if not result["price"]:
+                if priced_cards:
+                    result["error"] = f"No priced result matches model {model_number}"
+                else:
+                    result["error"] = "Could not read a price on any result card"
                 
         except TimeoutError as e:
             result["error"] = f"Timeout: {str(e)}"
@@ -213,5 +175,7 @@ async def main():
             print(f"Error: {result['error']}")
             print(f"Search URL: {result['url']}")
 
+    await close_browser_pool()
+
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
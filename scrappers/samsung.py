@@ -1,19 +1,39 @@
 import asyncio
-import re
 from urllib.parse import quote_plus
-from playwright.async_api import async_playwright, TimeoutError
-
-
-class SamsungScraper:
+from playwright.async_api import TimeoutError
+from utils.browser_pool import close_browser_pool
+from scrappers.base_scraper import BaseScraper
+from utils.tracing import traced
+from utils.price_parser import parse_price_value
+from utils.candidate_match import best_candidate
+from utils.dom_extract import ExtractionSpec, Field
+from utils.page_readiness import Readiness
+from utils.rate_limiter import throttled_goto
+
+
+class SamsungScraper(BaseScraper):
     """Scraper for Samsung Canada's official site to fetch product price based on search result cards."""
 
+    retailer_id = "Samsung"
+    brand = "Samsung"
+    readiness = {
+        "search": Readiness(['.aisearch__item'], timeout=2000),
+    }
+    extraction = {
+        "search": ExtractionSpec(
+            cards=['.aisearch__item'],
+            fields={
+                "sku": Field(['.aisearch-product__sku']),
+                "price": Field(['.aisearch-product__price-current']),
+                "href": Field(['a.aisearch-product__image'], attr='href'),
+            },
+        ),
+    }
+
     def __init__(self):
         self.search_url_template = "https://www.samsung.com/ca/aisearch/?searchvalue={}"
 
-    def extract_model_number(self, name: str) -> str:
-        match = re.search(r'(QN\d{2,}[A-Z0-9]+|UN\d{2,}[A-Z0-9]+)', name.upper())
-        return match.group(1) if match else name
-
+    @traced("handle_dialogs")
     async def handle_dialogs(self, page):
         selectors = [
             '#truste-consent-button',
@@ -31,7 +51,7 @@ class SamsungScraper:
             except:
                 continue
 
-    async def scrape_product(self, product_name: str) -> dict:
+    async def scrape_on_page(self, page, product_name: str) -> dict:
         result = {
             "retailer": "Samsung",
             "product_name": product_name,
@@ -47,44 +67,30 @@ class SamsungScraper:
         result["url"] = search_url
 
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context()
-                page = await context.new_page()
-
-                await page.goto(search_url, wait_until="domcontentloaded", timeout=60000)
-                await self.handle_dialogs(page)
-                await page.wait_for_timeout(2000)
-
-                # Iterate over all product result cards
-                items = await page.query_selector_all('.aisearch__item')
-                for item in items:
-                    sku_elem = await item.query_selector('.aisearch-product__sku')
-                    if not sku_elem:
-                        continue
-
-                    sku_text = (await sku_elem.inner_text()).strip().upper()
-                    if model_number.upper() not in sku_text:
-                        continue
-
-                    # Found the right item
-                    price_elem = await item.query_selector('.aisearch-product__price-current')
-                    if price_elem:
-                        price_text = await price_elem.inner_text()
-                        match = re.search(r'\$([\d,]+\.?\d*)', price_text)
-                        if match:
-                            result["price"] = float(match.group(1).replace(',', ''))
-
-                    link_elem = await item.query_selector('a.aisearch-product__image')
-                    if link_elem:
-                        href = await link_elem.get_attribute('href')
-                        result["url"] = f"https://www.samsung.com{href}"
-
-                    break
-                else:
-                    result["error"] = f"Model {model_number} not found in search results"
-
-                await browser.close()
+            await throttled_goto(page, self.retailer_id, search_url, wait_until="domcontentloaded", timeout=60000)
+            await self.handle_dialogs(page)
+            ready = await self.wait_ready(page, "search")
+
+            # schema.org data first; the selector chains below are the fallback
+            structured = await self.structured_product(page, model_number)
+            if structured:
+                return self.apply_structured(result, structured, page.url)
+
+            # Pick the result card whose SKU best matches, all read in one round trip
+            items = await self.extract(page, "search")
+            self.harvest(items, page.url, field="sku")
+            candidate = best_candidate(items, self.parse_model(product_name), fields=("sku",))
+            if candidate:
+                item = candidate.candidate
+                result["match_confidence"] = candidate.confidence
+                result["price"] = parse_price_value(item["price"])
+
+                if item["href"]:
+                    result["url"] = f"https://www.samsung.com{item['href']}"
+            elif not items and not ready:
+                result["error"] = "Search results did not load"
+            else:
+                result["error"] = f"Model {model_number} not found in search results"
 
         except TimeoutError as te:
             result["error"] = f"Timeout occurred: {str(te)}"
@@ -108,6 +114,8 @@ async def main():
             print(f"❌ Error: {result['error']}")
             print(f"🔍 Search URL: {result['url']}")
 
+    await close_browser_pool()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -5,34 +5,36 @@
 # if you wish to contirbute to this file, please add your name and phone number in the comments below
 
 import asyncio
-import re
 import os
-from playwright.async_api import async_playwright, TimeoutError
+from playwright.async_api import TimeoutError
+from utils.browser_pool import close_browser_pool
+from scrappers.base_scraper import BaseScraper
+from utils.tracing import traced
+from utils.candidate_match import DEFAULT_MIN_CONFIDENCE, match_confidence
+from utils.price_parser import parse_price_value
+from utils.page_readiness import Readiness, expect_response
+from utils.rate_limiter import throttled_goto
 
-class TanguayScraper:
+class TanguayScraper(BaseScraper):
     """Specialized scraper for Tanguay Canada website price information"""
     
+    retailer_id = "Tanguay"
+    detail_pages = True
+    context_options = {
+        "viewport": {"width": 1920, "height": 1080},
+        "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36"
+    }
+    # Coveo renders search results client-side from its query XHR: the page is ready
+    # once the result links show or the query answers (possibly with nothing)
+    readiness = {
+        "search": Readiness(['.CoveoResultLink'], response_url="/rest/search", timeout=15000),
+        "detail": Readiness(['span.pdp-info-mpn[itemprop="mpn"]'], timeout=8000),
+    }
+    
     def __init__(self):
         self.base_url = "https://www.tanguay.ca/en/search/?tanguay_prod_en%5Bquery%5D={}"
-    
-    def extract_model_number(self, product_name: str) -> str:
-        """Extract model number from product name"""
-        # First try to match content after hyphen as model number
-        model_match = re.search(r'-\s*([A-Z0-9]+[A-Z0-9]*(?:[._-][A-Z0-9]+)*)(?:\s|$)', product_name)
         
-        # If no model found after hyphen, try matching other common model patterns
-        if not model_match:
-            # Match number+letter+number combinations
-            model_match = re.search(r'(\d+[A-Z]+\d+[A-Z0-9]*)(?:\s|$)', product_name)
-            
-        # If still not found, try matching letter+number combinations
-        if not model_match:
-            model_match = re.search(r'([A-Z]+\d+[A-Z0-9]*)(?:\s|$)', product_name)
-            
-        if model_match:
-            return model_match.group(1)
-        return product_name  # Return original name if extraction fails
-    
+    @traced("handle_dialogs")
     async def handle_dialogs(self, page):
         """Handle various dialogs that might appear"""
         # Handle cookie dialogs
@@ -57,7 +59,11 @@ class TanguayScraper:
         except Exception:
             pass
     
-    async def scrape_product(self, product_name: str) -> dict:
+    async def prepare_page(self, page):
+        """Set longer timeout"""
+        page.set_default_timeout(60000)  # 60 seconds
+    
+    async def scrape_on_page(self, page, product_name: str, detail_url=None) -> dict:
         """Scrape Tanguay price information based on product name"""
         result = {
             "retailer": "Tanguay",
@@ -76,137 +82,131 @@ class TanguayScraper:
         search_url = self.base_url.format(model_number)
         result["url"] = search_url
         
-        async with async_playwright() as playwright:
-            try:
-                browser = await playwright.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    viewport={"width": 1920, "height": 1080},
-                    user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36"
-                )
-                page = await context.new_page()
-                
-                # Set longer timeout
-                page.set_default_timeout(60000)  # 60 seconds
-                
-                await page.goto(search_url, wait_until="networkidle")
+        try:
+            # A detail_url verified by an earlier run skips the search
+            if not detail_url:
+                query_response = expect_response(page, self.readiness["search"])
+                await throttled_goto(page, self.retailer_id, search_url, wait_until="domcontentloaded")
                 
                 # Handle possible dialog boxes
                 await self.handle_dialogs(page)
                 
-                # Wait for content to load
-                await page.wait_for_timeout(5000)
+                # Wait for the result links or the Coveo query response
+                ready = await self.wait_ready(page, "search", query_response)
                 
                 # Use XPath selector for more precision
                 product_link_element = await page.query_selector('.CoveoResultLink')
+                if not product_link_element and ready:
+                    # The query answered; give Coveo a moment to render what it returned
+                    try:
+                        product_link_element = await page.wait_for_selector(
+                            '.CoveoResultLink', state="attached", timeout=2000)
+                    except TimeoutError:
+                        pass
                 
                 if not product_link_element:
-                    result["error"] = "No product results found"
-                    await browser.close()
+                    # Only an answered query with no results means Tanguay doesn't list it
+                    result["error"] = "No product results found" if ready else "Search results did not load"
                     return result
                 
                 # Get the product detail URL
                 detail_url = await product_link_element.get_attribute('href')
                 if not detail_url:
                     result["error"] = "Product URL not found"
-                    await browser.close()
                     return result
                 
                 # Make the URL absolute if it's relative
                 if detail_url.startswith('/'):
                     detail_url = f"https://www.tanguay.ca{detail_url}"
+            
+            # Update the URL in the result
+            result["url"] = detail_url
+            
+            # Navigate to the product detail page
+            response = await throttled_goto(page, self.retailer_id, detail_url, wait_until="domcontentloaded")
+            if response is not None and response.status >= 400:
+                result["error"] = f"Product page returned HTTP {response.status}"
+                return result
+            await self.wait_ready(page, "detail")
+            
+            # schema.org data first; the selector chains below are the fallback
+            structured = await self.structured_product(page, model_number)
+            if structured:
+                return self.apply_structured(result, structured, page.url)
+            
+            # Extract the MPN (Model Number) from the detail page
+            mpn_element = await page.query_selector('span.pdp-info-mpn[itemprop="mpn"]')
+            
+            if mpn_element:
+                # Get the model number text
+                vendor_model = await mpn_element.inner_text()
+                vendor_model = vendor_model.strip()
                 
-                # Update the URL in the result
-                result["url"] = detail_url
+                # Check if the model number from the detail page matches what we searched for
+                if match_confidence(self.parse_model(product_name), vendor_model) < DEFAULT_MIN_CONFIDENCE:
+                    result["error"] = f"Model number mismatch: Expected {model_number}, found {vendor_model}"
+                    return result
                 
-                # Navigate to the product detail page
-                await page.goto(detail_url, wait_until="networkidle")
-                await page.wait_for_timeout(3000)
+                # Get the product name as well
+                product_title_element = await page.query_selector('h1.product-title')
+                if product_title_element:
+                    product_title = await product_title_element.inner_text()
+                    result["product_name"] = product_title.strip()
                 
-                # Extract the MPN (Model Number) from the detail page
-                mpn_element = await page.query_selector('span.pdp-info-mpn[itemprop="mpn"]')
+                # Get price element - look for span with itemprop="price"
+                price_element = await page.query_selector('span[itemprop="price"]')
                 
-                if mpn_element:
-                    # Get the model number text
-                    vendor_model = await mpn_element.inner_text()
-                    vendor_model = vendor_model.strip()
-                    
-                    # Check if the model number from the detail page matches what we searched for
-                    if model_number.upper() not in vendor_model.upper():
-                        result["error"] = f"Model number mismatch: Expected {model_number}, found {vendor_model}"
-                        await browser.close()
-                        return result
-                    
-                    # Get the product name as well
-                    product_title_element = await page.query_selector('h1.product-title')
-                    if product_title_element:
-                        product_title = await product_title_element.inner_text()
-                        result["product_name"] = product_title.strip()
+                if price_element:
+                    try:
+                        # Get the inner text (this is the displayed price including tax)
+                        price_text = (await price_element.inner_text()).strip()
+                        if not price_text:
+                            # If inner text is empty, fall back to content attribute
+                            price_text = ((await price_element.get_attribute('content')) or "").strip()
+                        
+                        # Handles the French "1 299,99 $" format as well
+                        if not price_text:
+                            result["error"] = "No price text found"
+                        else:
+                            price = parse_price_value(price_text)
+                            if price is not None:
+                                result["price"] = price
+                            else:
+                                result["error"] = "Failed to parse price text"
                     
-                    # Get price element - look for span with itemprop="price"
-                    price_element = await page.query_selector('span[itemprop="price"]')
+                    except Exception as e:
+                        result["error"] = f"Price extraction error: {str(e)}"
+                else:
+                    # Try other possible price selectors as fallback
+                    alternative_selectors = [
+                        '.bigprice.promo strong',
+                        '.price_ecofrais',
+                        '.v2box_reg_price',
+                        '.ucc-main-container.etat span',
+                        '#product-price',
+                        '.price-container'
+                    ]
                     
-                    if price_element:
-                        try:
-                            # Get the inner text (this is the displayed price including tax)
-                            price_text = await price_element.inner_text()
-                            price_text = price_text.strip().replace(' ', '').replace(',', '.')
+                    for selector in alternative_selectors:
+                        alt_price_element = await page.query_selector(selector)
+                        if alt_price_element:
+                            price_text = await alt_price_element.inner_text()
                             
-                            try:
-                                # Try to parse the inner text first (priority)
-                                if price_text:
-                                    price = float(price_text)
-                                    result["price"] = price
-                                else:
-                                    # If inner text is empty, fall back to content attribute
-                                    price_content = await price_element.get_attribute('content')
-                                    if price_content and price_content.strip():
-                                        price = float(price_content.strip())
-                                        result["price"] = price
-                                    else:
-                                        result["error"] = "No price text found"
-                            except ValueError:
-                                result["error"] = "Failed to parse price text"
-                        
-                        except Exception as e:
-                            result["error"] = f"Price extraction error: {str(e)}"
-                    else:
-                        # Try other possible price selectors as fallback
-                        alternative_selectors = [
-                            '.bigprice.promo strong',
-                            '.price_ecofrais',
-                            '.v2box_reg_price',
-                            '.ucc-main-container.etat span',
-                            '#product-price',
-                            '.price-container'
-                        ]
-                        
-                        for selector in alternative_selectors:
-                            alt_price_element = await page.query_selector(selector)
-                            if alt_price_element:
-                                price_text = await alt_price_element.inner_text()
-                                
-                                # Try to extract price
-                                price_match = re.search(r'(\d+(?:[\s,]\d+)*(?:\.\d+)?)', price_text.replace(',', '.'))
-                                if price_match:
-                                    price_str = price_match.group(1).replace(' ', '')
-                                    try:
-                                        price = float(price_str)
-                                        result["price"] = price
-                                        break
-                                    except ValueError:
-                                        continue
-                        
-                        if not result["price"]:
-                            result["error"] = "Price element not found"
-                else:
-                    result["error"] = "Model number element not found on product page"
-                
-                await browser.close()
-                
-            except TimeoutError as e:
-                result["error"] = f"Timeout: {str(e)}"
-            except Exception as e:
-                result["error"] = str(e)
+                            # Try to extract price
+                            price = parse_price_value(price_text)
+                            if price is not None:
+                                result["price"] = price
+                                break
+                    
+                    if not result["price"]:
+                        result["error"] = "Price element not found"
+            else:
+                result["error"] = "Model number element not found on product page"
+            
+        except TimeoutError as e:
+            result["error"] = f"Timeout: {str(e)}"
+        except Exception as e:
+            result["error"] = str(e)
         
         return result
 
@@ -228,5 +228,7 @@ async def main():
             print(f"Error: {result['error']}")
             print(f"Search URL: {result['url']}")
 
+    await close_browser_pool()
+
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
@@ -7,32 +7,39 @@
 import asyncio
 import re
 import os
-from playwright.async_api import async_playwright, TimeoutError
+from playwright.async_api import TimeoutError
+from utils.browser_pool import close_browser_pool
+from scrappers.base_scraper import BaseScraper
+from utils.tracing import traced
+from utils.candidate_match import DEFAULT_MIN_CONFIDENCE, match_confidence
+from utils.price_parser import parse_price_value
+from utils.dom_extract import ExtractionSpec, Field
+from utils.page_readiness import Readiness
+from utils.rate_limiter import throttled_goto
 
-class TeppermansScraper:
+class TeppermansScraper(BaseScraper):
     """Specialized scraper for TepperMan's website price information"""
     
+    retailer_id = "Terpermans"
+    detail_pages = True
+    readiness = {
+        "search": Readiness(['.product-item-info a', '.message.notice'], timeout=2000),
+        "detail": Readiness(['li.product-sku span', '.product.attribute.sku .value'], timeout=5000),
+    }
+    
+    # Different selectors for product links (in order of preference); {model} is filled in per search
+    product_link_selectors = [
+        '.product-item-link-overlay',  # Main product link overlay
+        'a.product.photo.product-item-photo',  # Product image link
+        '.product.name.product-item-name',  # Product name
+        '.product-item-info a[href*="{model}"]',  # Any link containing model number
+        '.product-item-info a'  # Any link in product-item-info
+    ]
+    
     def __init__(self):
         self.base_url = "https://www.teppermans.com/catalogsearch/result/?q={}"
-    
-    def extract_model_number(self, product_name: str) -> str:
-        """Extract model number from product name"""
-        # First try to match content after hyphen as model number
-        model_match = re.search(r'-\s*([A-Z0-9]+[A-Z0-9]*(?:[._-][A-Z0-9]+)*)(?:\s|$)', product_name)
         
-        # If no model found after hyphen, try matching other common model patterns
-        if not model_match:
-            # Match number+letter+number combinations
-            model_match = re.search(r'(\d+[A-Z]+\d+[A-Z0-9]*)(?:\s|$)', product_name)
-            
-        # If still not found, try matching letter+number combinations
-        if not model_match:
-            model_match = re.search(r'([A-Z]+\d+[A-Z0-9]*)(?:\s|$)', product_name)
-            
-        if model_match:
-            return model_match.group(1)
-        return product_name  # Return original name if extraction fails
-    
+    @traced("handle_dialogs")
     async def handle_dialogs(self, page):
         """Handle various dialogs that might appear"""
         # Handle cookie dialogs or other possible popups
@@ -55,7 +62,7 @@ class TeppermansScraper:
         except Exception:
             pass
     
-    async def scrape_product(self, product_name: str) -> dict:
+    async def scrape_on_page(self, page, product_name: str, detail_url=None) -> dict:
         """Scrape TepperMan's price information based on product name"""
         result = {
             "retailer": "TepperMan's",
@@ -75,18 +82,17 @@ class TeppermansScraper:
         result["url"] = search_url
         
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context()
-                page = await context.new_page()
-                
-                await page.goto(search_url, wait_until="domcontentloaded", timeout=60000)
+            if detail_url:
+                # Product page verified by an earlier run; no search needed
+                product_url = detail_url
+            else:
+                await throttled_goto(page, self.retailer_id, search_url, wait_until="domcontentloaded", timeout=60000)
                 
                 # Handle possible dialogs
                 await self.handle_dialogs(page)
                 
                 # Wait for products to load
-                await page.wait_for_timeout(2000)
+                await self.wait_ready(page, "search")
                 
                 # Check if there are search results
                 no_results = await page.query_selector('.message.notice')
@@ -94,114 +100,95 @@ class TeppermansScraper:
                     no_results_text = await no_results.inner_text()
                     if "no results" in no_results_text.lower():
                         result["error"] = "No search results found"
-                        await browser.close()
                         return result
                 
-                # Try different selectors for product links (in order of preference)
-                product_link_selectors = [
-                    '.product-item-link-overlay',  # Main product link overlay
-                    'a.product.photo.product-item-photo',  # Product image link
-                    '.product.name.product-item-name',  # Product name
-                    '.product-item-info a[href*="' + model_number + '"]',  # Any link containing model number
-                    '.product-item-info a'  # Any link in product-item-info
-                ]
-                
-                product_link = None
-                for selector in product_link_selectors:
-                    links = await page.query_selector_all(selector)
-                    if links and len(links) > 0:
-                        product_link = links[0]
-                        break
-                
-                if not product_link:
-                    result["error"] = "No product link found"
-                    await browser.close()
-                    return result
-                
-                # Get the URL from the link before clicking
-                product_url = await product_link.get_attribute('href')
+                # Walk the product link chain in one round trip
+                link_spec = ExtractionSpec({
+                    "href": Field([selector.replace('{model}', model_number) for selector in self.product_link_selectors],
+                                  attr='href', labels=self.product_link_selectors),
+                })
+                links = await self.extract(page, "links", link_spec)
+                product_url = links[0]["href"] if links else None
                 
                 if not product_url:
                     result["error"] = "Product URL not found"
-                    await browser.close()
-                    return result
-                
-                # Navigate directly to the product URL instead of clicking
-                await page.goto(product_url, wait_until="domcontentloaded", timeout=60000)
-                await page.wait_for_load_state("networkidle")
-                await page.wait_for_timeout(2000)
-                
-                # Update the URL in the result to the detail page
-                result["url"] = page.url
-                
-                # Get Product ID from detail page
-                product_sku = await page.query_selector('li.product-sku span')
-                vendor_model = None
-                
-                if product_sku:
-                    product_id_text = await product_sku.inner_text()
-                    # Extract the model number after "Product ID: "
-                    id_match = re.search(r'Product ID:\s*(\S+)', product_id_text)
-                    if id_match:
-                        vendor_model = id_match.group(1).strip()
-                
-                if not vendor_model:
-                    # If we couldn't find the Product ID, try alternative selector
-                    alt_sku = await page.query_selector('.product.attribute.sku .value')
-                    if alt_sku:
-                        vendor_model = await alt_sku.inner_text()
-                        vendor_model = vendor_model.strip()
-                
-                if not vendor_model:
-                    result["error"] = "Product ID not found on detail page"
-                    await browser.close()
                     return result
-                
-                # Check if the model number from the detail page matches what we searched for
-                if model_number.upper() not in vendor_model.upper():
-                    result["error"] = f"Model number mismatch: Expected {model_number}, found {vendor_model}"
-                    await browser.close()
-                    return result
-                
-                # Try to get price only if the model number matches
-                try:
-                    # Check for special price
-                    special_price_element = await page.query_selector('.special-price .price')
-                    if special_price_element:
-                        price_text = await special_price_element.inner_text()
-                    else:
-                        # Get regular price
-                        price_element = await page.query_selector('[data-price-amount]')
-                        if price_element:
-                            # Prefer using data-price-amount attribute
-                            price_amount = await price_element.get_attribute('data-price-amount')
-                            if price_amount:
-                                price = float(price_amount)
-                            else:
-                                # If attribute not available, try getting from content
-                                price_wrapper = await page.query_selector('.price-wrapper .price')
-                                if price_wrapper:
-                                    price_text = await price_wrapper.inner_text()
-                                else:
-                                    raise ValueError("Could not find price element")
-                        else:
-                            raise ValueError("Could not find price element")
-                    
-                    # Extract number from price text
-                    if 'price_text' in locals():
-                        price_match = re.search(r'[\d,.]+', price_text.replace(',', ''))
-                        if price_match:
-                            price = float(price_match.group(0))
+            
+            # Navigate directly to the product URL instead of clicking
+            response = await throttled_goto(page, self.retailer_id, product_url, wait_until="domcontentloaded", timeout=60000)
+            if response is not None and response.status >= 400:
+                result["error"] = f"Product page returned HTTP {response.status}"
+                return result
+            await self.wait_ready(page, "detail")
+            
+            # Update the URL in the result to the detail page
+            result["url"] = page.url
+            
+            # schema.org data first; the selector chains below are the fallback
+            structured = await self.structured_product(page, model_number)
+            if structured:
+                return self.apply_structured(result, structured, page.url)
+            
+            # Get Product ID from detail page
+            product_sku = await page.query_selector('li.product-sku span')
+            vendor_model = None
+            
+            if product_sku:
+                product_id_text = await product_sku.inner_text()
+                # Extract the model number after "Product ID: "
+                id_match = re.search(r'Product ID:\s*(\S+)', product_id_text)
+                if id_match:
+                    vendor_model = id_match.group(1).strip()
+            
+            if not vendor_model:
+                # If we couldn't find the Product ID, try alternative selector
+                alt_sku = await page.query_selector('.product.attribute.sku .value')
+                if alt_sku:
+                    vendor_model = await alt_sku.inner_text()
+                    vendor_model = vendor_model.strip()
+            
+            if not vendor_model:
+                result["error"] = "Product ID not found on detail page"
+                return result
+            
+            # Check if the model number from the detail page matches what we searched for
+            if match_confidence(self.parse_model(product_name), vendor_model) < DEFAULT_MIN_CONFIDENCE:
+                result["error"] = f"Model number mismatch: Expected {model_number}, found {vendor_model}"
+                return result
+            
+            # Try to get price only if the model number matches
+            try:
+                # Check for special price
+                price = None
+                special_price_element = await page.query_selector('.special-price .price')
+                if special_price_element:
+                    price = parse_price_value(await special_price_element.inner_text())
+                else:
+                    # Get regular price
+                    price_element = await page.query_selector('[data-price-amount]')
+                    if price_element:
+                        # Prefer using data-price-amount attribute
+                        price_amount = await price_element.get_attribute('data-price-amount')
+                        if price_amount:
+                            price = parse_price_value(price_amount)
                         else:
-                            raise ValueError("Could not parse price from text")
-                    
-                    # Set the price in the result
-                    result["price"] = price
+                            # If attribute not available, try getting from content
+                            price_wrapper = await page.query_selector('.price-wrapper .price')
+                            if price_wrapper:
+                                price = parse_price_value(await price_wrapper.inner_text())
+                            else:
+                                raise ValueError("Could not find price element")
+                    else:
+                        raise ValueError("Could not find price element")
                 
-                except Exception as e:
-                    result["error"] = f"Price extraction error: {str(e)}"
+                if price is None:
+                    raise ValueError("Could not parse price from text")
                 
-                await browser.close()
+                # Set the price in the result
+                result["price"] = price
+            
+            except Exception as e:
+                result["error"] = f"Price extraction error: {str(e)}"
                 
         except TimeoutError as e:
             result["error"] = f"Timeout: {str(e)}"
@@ -228,5 +215,7 @@ async def main():
             print(f"Error: {result['error']}")
             print(f"Search URL: {result['url']}")
 
+    await close_browser_pool()
+
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -5,34 +5,28 @@
 # if you wish to contirbute to this file, please add your name and phone number in the comments below
 
 import asyncio
-import re
 import os
-from playwright.async_api import async_playwright, TimeoutError
+from playwright.async_api import TimeoutError
+from utils.browser_pool import close_browser_pool
+from scrappers.base_scraper import BaseScraper
+from utils.tracing import traced
+from utils.candidate_match import DEFAULT_MIN_CONFIDENCE, match_confidence
+from utils.price_parser import parse_price_value
+from utils.page_readiness import Readiness
+from utils.rate_limiter import throttled_goto
 
-class VisionsScraper:
+class VisionsScraper(BaseScraper):
     """Specialized scraper for Visions Canada website price information"""
     
+    retailer_id = "Vision"
+    readiness = {
+        "search": Readiness(['.product.attribute.manufacturer .value', '.message.notice'], timeout=3000),
+    }
+    
     def __init__(self):
         self.base_url = "https://www.visions.ca/catalogsearch/result?q={}"
-    
-    def extract_model_number(self, product_name: str) -> str:
-        """Extract model number from product name"""
-        # First try to match content after hyphen as model number
-        model_match = re.search(r'-\s*([A-Z0-9]+[A-Z0-9]*(?:[._-][A-Z0-9]+)*)(?:\s|$)', product_name)
         
-        # If no model found after hyphen, try matching other common model patterns
-        if not model_match:
-            # Match number+letter+number combinations
-            model_match = re.search(r'(\d+[A-Z]+\d+[A-Z0-9]*)(?:\s|$)', product_name)
-            
-        # If still not found, try matching letter+number combinations
-        if not model_match:
-            model_match = re.search(r'([A-Z]+\d+[A-Z0-9]*)(?:\s|$)', product_name)
-            
-        if model_match:
-            return model_match.group(1)
-        return product_name  # Return original name if extraction fails
-    
+    @traced("handle_dialogs")
     async def handle_dialogs(self, page):
         """Handle various dialogs that might appear"""
         # Handle cookie dialogs
@@ -56,7 +50,7 @@ class VisionsScraper:
         except Exception:
             pass
     
-    async def scrape_product(self, product_name: str) -> dict:
+    async def scrape_on_page(self, page, product_name: str) -> dict:
         """Scrape Visions price information based on product name"""
         result = {
             "retailer": "Visions",
@@ -76,74 +70,69 @@ class VisionsScraper:
         result["url"] = search_url
         
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context()
-                page = await context.new_page()
-                
-                await page.goto(search_url, wait_until="domcontentloaded", timeout=60000)
-                
-                # Handle possible dialogs
-                await self.handle_dialogs(page)
-                
-                # Wait for page to load
-                await page.wait_for_timeout(3000)
-                
-                # Check URL - if redirected to product page, it will contain "/product/"
-                current_url = page.url
-                
-                # Check if there's a no results message
-                no_results = await page.query_selector('.message.notice')
-                if no_results:
-                    no_results_text = await no_results.inner_text()
-                    if "Your search returned no results" in no_results_text:
-                        result["error"] = "No search results found"
-                        await browser.close()
-                        return result
+            await throttled_goto(page, self.retailer_id, search_url, wait_until="domcontentloaded", timeout=60000)
+            
+            # Handle possible dialogs
+            await self.handle_dialogs(page)
+            
+            # Wait for page to load
+            await self.wait_ready(page, "search")
+            
+            # Check URL - if redirected to product page, it will contain "/product/"
+            current_url = page.url
+            
+            # Check if there's a no results message
+            no_results = await page.query_selector('.message.notice')
+            if no_results:
+                no_results_text = await no_results.inner_text()
+                if "Your search returned no results" in no_results_text:
+                    result["error"] = "No search results found"
+                    return result
+            
+            # schema.org data first; the selector chains below are the fallback
+            structured = await self.structured_product(page, model_number)
+            if structured:
+                return self.apply_structured(result, structured, page.url)
+            
+            # Get manufacturer info for model verification
+            manufacturer_element = await page.query_selector('.product.attribute.manufacturer .value')
+            if manufacturer_element:
+                manufacturer = await manufacturer_element.inner_text()
                 
-                # Get manufacturer info for model verification
-                manufacturer_element = await page.query_selector('.product.attribute.manufacturer .value')
-                if manufacturer_element:
-                    manufacturer = await manufacturer_element.inner_text()
-                    
-                    # Verify if model matches
-                    if model_number.upper() in manufacturer.upper():
-                        # Extract price
-                        # First try to get special price
-                        special_price_element = await page.query_selector('.special-price .price-wrapper .price')
-                        if special_price_element:
-                            price_text = await special_price_element.inner_text()
-                            price_match = re.search(r'[\d,]+\.\d+', price_text.replace(',', ''))
-                            if price_match:
-                                price = float(price_match.group(0))
+                # Verify if model matches
+                if match_confidence(self.parse_model(product_name), manufacturer) >= DEFAULT_MIN_CONFIDENCE:
+                    # Extract price
+                    # First try to get special price
+                    special_price_element = await page.query_selector('.special-price .price-wrapper .price')
+                    if special_price_element:
+                        price_text = await special_price_element.inner_text()
+                        price = parse_price_value(price_text)
+                        if price is not None:
+                            result["price"] = price
+                        else:
+                            result["error"] = "Could not parse special price"
+                    else:
+                        # Try to get regular price
+                        regular_price_element = await page.query_selector('.price-final_price .price-wrapper .price')
+                        if regular_price_element:
+                            price_text = await regular_price_element.inner_text()
+                            price = parse_price_value(price_text)
+                            if price is not None:
                                 result["price"] = price
                             else:
-                                result["error"] = "Could not parse special price"
+                                result["error"] = "Could not parse regular price"
                         else:
-                            # Try to get regular price
-                            regular_price_element = await page.query_selector('.price-final_price .price-wrapper .price')
-                            if regular_price_element:
-                                price_text = await regular_price_element.inner_text()
-                                price_match = re.search(r'[\d,]+\.\d+', price_text.replace(',', ''))
-                                if price_match:
-                                    price = float(price_match.group(0))
-                                    result["price"] = price
-                                else:
-                                    result["error"] = "Could not parse regular price"
-                            else:
-                                result["error"] = "Price element not found"
-                    else:
-                        result["error"] = f"Model number verification failed"
+                            result["error"] = "Price element not found"
                 else:
-                    result["error"] = "Could not verify model number"
-                
-                # Get product page title
-                title_element = await page.query_selector('.page-title')
-                if title_element:
-                    product_title = await title_element.inner_text()
-                    result["product_name"] = product_title.strip()
-                
-                await browser.close()
+                    result["error"] = f"Model number verification failed"
+            else:
+                result["error"] = "Could not verify model number"
+            
+            # Get product page title
+            title_element = await page.query_selector('.page-title')
+            if title_element:
+                product_title = await title_element.inner_text()
+                result["product_name"] = product_title.strip()
                 
         except TimeoutError as e:
             result["error"] = f"Timeout: {str(e)}"
@@ -170,5 +159,7 @@ async def main():
             print(f"Error: {result['error']}")
             print(f"Search URL: {result['url']}")
 
+    await close_browser_pool()
+
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,33 @@
+import asyncio
+
+from scrappers.bestBuy import BestBuyScraper
+
+
+class FakeElement:
+    def __init__(self, text):
+        self.text = text
+
+    async def inner_text(self):
+        return self.text
+
+
+class FakePage:
+    def __init__(self, elements):
+        self.elements = elements
+
+    async def query_selector(self, selector):
+        return self.elements.get(selector)
+
+
+def test_sale_end_date_from_the_priceValidUntil_element():
+    page = FakePage({'time[itemprop="priceValidUntil"]': FakeElement(" November 1, 2026 ")})
+    assert asyncio.run(BestBuyScraper().find_sale_end_date(page)) == "November 1, 2026"
+
+
+def test_sale_end_date_from_an_alternate_selector():
+    page = FakePage({"span.text-v2-value-red time": FakeElement("Nov 1, 2026")})
+    assert asyncio.run(BestBuyScraper().find_sale_end_date(page)) == "Nov 1, 2026"
+
+
+def test_no_sale_end_date():
+    assert asyncio.run(BestBuyScraper().find_sale_end_date(FakePage({}))) is None
@@ -0,0 +1,69 @@
+import pytest
+
+from utils.candidate_match import (CONTAINS, DEFAULT_MIN_CONFIDENCE, EXACT, OTHER_REGION, PARTIAL, SAME_SERIES,
+                                   CandidateIndex, best_candidate, match_confidence)
+
+MODEL = "QN65QN90FAFXZC"
+
+
+@pytest.mark.parametrize("title, confidence", [
+    ("Samsung 65\" QN90F Neo QLED - QN65QN90FAFXZC", EXACT),
+    ("Samsung 65\" QN90F Neo QLED - QN65-QN90FA-FXZC", EXACT),     # separators ignored
+    ("Samsung 65\" QN90F Neo QLED - QN65QN90FA", SAME_SERIES),      # listed without its region
+    ("Samsung 65\" QN90F Neo QLED - QN65QN90FAFXZA", OTHER_REGION),  # the US model
+    ("SamsungQN65QN90FAFXZCBundle", CONTAINS),
+    ("Samsung 65\" QN90F Neo QLED", PARTIAL),                        # only the series
+])
+def test_confidence_bands(title, confidence):
+    assert CandidateIndex([{"title": title}]).scores(MODEL)[0][0] == confidence
+
+
+def test_other_region_and_partial_fall_below_the_default_bar():
+    assert OTHER_REGION < DEFAULT_MIN_CONFIDENCE and PARTIAL < DEFAULT_MIN_CONFIDENCE
+    cards = [{"title": "Samsung 65\" QN90F Neo QLED - QN65QN90FAFXZA"}]
+    assert best_candidate(cards, MODEL) is None
+    assert best_candidate(cards, MODEL, min_confidence=PARTIAL).confidence == OTHER_REGION
+
+
+def test_best_prefers_the_stronger_match_over_page_order():
+    cards = [{"title": "Samsung 65\" QN90F"}, {"title": "Samsung QN65QN90FA"}, {"title": "Samsung QN65QN90FAFXZC"}]
+    match = best_candidate(cards, MODEL)
+    assert (match.index, match.confidence) == (2, EXACT)
+
+
+def test_ties_go_to_the_earliest_card():
+    cards = [{"title": "QN65QN90FAFXZC 2025"}, {"title": "QN65QN90FAFXZC open box"}]
+    assert best_candidate(cards, MODEL).index == 0
+
+
+def test_series_card_is_accepted_at_partial_for_the_same_screen_size():
+    cards = [{"title": "Samsung 75\" DU8000 Crystal UHD 4K Smart TV"}]
+    match = best_candidate(cards, "UN75DU8000FXZC", min_confidence=PARTIAL)
+    assert match.confidence == PARTIAL
+
+
+@pytest.mark.parametrize("title", [
+    "Samsung 65\" DU8000 Crystal UHD 4K Smart TV",
+    "Samsung 65-inch DU8000 Crystal UHD",
+    "Téléviseur Samsung DU8000 de 65 po",
+])
+def test_series_card_of_another_screen_size_is_never_a_partial_match(title):
+    assert best_candidate([{"title": title}], "UN75DU8000FXZC", min_confidence=PARTIAL) is None
+
+
+def test_staples_style_page_picks_the_matching_size():
+    cards = [{"title": "Samsung 65\" DU8000 Crystal UHD"}, {"title": "Samsung 75\" DU8000 Crystal UHD"}]
+    assert best_candidate(cards, "UN75DU8000FXZC", min_confidence=PARTIAL).index == 1
+
+
+def test_word_overlap_ranks_but_is_never_accepted():
+    index = CandidateIndex([{"title": "Samsung 65 inch Neo QLED"}, {"title": "LG soundbar"}])
+    scores = index.scores(MODEL, product_name="Samsung 65 inch Neo QLED QN65QN90FAFXZC")
+    assert list(scores) == [0] and scores[0][0] < PARTIAL
+    assert index.best(MODEL, product_name="Samsung 65 inch Neo QLED QN65QN90FAFXZC") is None
+
+
+def test_match_confidence_of_a_detail_page_model_field():
+    assert match_confidence(MODEL, "QN65QN90FAFXZC") == EXACT
+    assert match_confidence(MODEL, "QN65QN90FA") == SAME_SERIES
+    assert match_confidence(MODEL, "UN75DU8000FXZC") == 0.0
@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+from aiohttp import web
+
+from utils.catalog_crawl import CatalogIndex, CatalogSource, crawl_catalog
+from utils.url_cache import UrlCache
+
+
+def test_url_only_recrawl_does_not_refresh_an_old_price(tmp_path):
+    index = CatalogIndex(str(tmp_path / "cache.sqlite3"))
+    index.put_many("Best_Buy", [("QN65QN90FAFXZC", "https://www.bestbuy.ca/p/1", 1999.99, "Samsung 65")])
+    index._db.execute("UPDATE catalog SET priced_at = ?", (time.time() - 7200,))
+    index.put_many("Best_Buy", [("QN65QN90FAFXZC", "https://www.bestbuy.ca/p/1", None, None)])
+
+    listed = index.get("Best_Buy", "QN65QN90FAFXZC", max_age=3600)
+    assert listed["url"] == "https://www.bestbuy.ca/p/1"
+    assert listed["price"] is None
+    assert index.get("Best_Buy", "QN65QN90FAFXZC")["price"] == 1999.99
+    index.close()
+
+
+def test_fresh_listing_price_is_served(tmp_path):
+    index = CatalogIndex(str(tmp_path / "cache.sqlite3"))
+    index.put_many("Best_Buy", [("QN65QN90FAFXZC", "https://www.bestbuy.ca/p/1", 1999.99, None)])
+    assert index.get("Best_Buy", "QN65QN90FAFXZC", max_age=3600)["price"] == 1999.99
+    index.close()
+
+
+def test_stub_crawl_stores_the_retailers_own_urls(tmp_path):
+    sitemap = ('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+               '<url><loc>https://www.example-tv.ca/tvs/oled/OLED65C4PUA/</loc></url></urlset>')
+    listing = '<a href="/tvs/qled/QN65QN90FAFXZC/">Samsung 65</a><a href="http://{host}/tvs/qled/QN55Q80CAFXZC/">x</a>'
+
+    async def serve_sitemap(request):
+        return web.Response(text=sitemap)
+
+    async def serve_listing(request):
+        return web.Response(text=listing.format(host=request.host) if request.query["page"] == "1" else "")
+
+    async def crawl():
+        app = web.Application()
+        app.router.add_get("/sitemap.xml", serve_sitemap)
+        app.router.add_get("/tvs", serve_listing)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        source = CatalogSource(listings=["https://www.example-tv.ca/tvs?page={page}"],
+                               sitemaps=["https://www.example-tv.ca/sitemap.xml"], product_url=r"/tvs/")
+        try:
+            return await crawl_catalog(["Example"], str(tmp_path / "cache.sqlite3"),
+                                       base_url=f"http://127.0.0.1:{port}", sources={"Example": source})
+        finally:
+            await runner.cleanup()
+
+    assert asyncio.run(crawl()) == {"Example": 3}
+
+    index = CatalogIndex(str(tmp_path / "cache.sqlite3"))
+    urls = UrlCache(str(tmp_path / "cache.sqlite3"))
+    for model in ("QN65QN90FAFXZC", "QN55Q80CAFXZC", "OLED65C4PUA"):
+        assert index.get("Example", model)["url"].startswith("https://www.example-tv.ca/tvs/")
+        assert urls.get("Example", model).startswith("https://www.example-tv.ca/tvs/")
+    index.close()
+    urls.close()
+
+
+def test_crawled_url_never_replaces_a_verified_one(tmp_path):
+    urls = UrlCache(str(tmp_path / "cache.sqlite3"))
+    urls.put("Best_Buy", "QN65QN90FAFXZC", "https://www.bestbuy.ca/en-ca/product/verified/17000001")
+    urls.put_new("Best_Buy", "QN65QN90FAFXZC", "https://www.bestbuy.ca/en-ca/product/crawled/17000002")
+    urls.put_new("Best_Buy", "QN55Q80CAFXZC", "https://www.bestbuy.ca/en-ca/product/crawled/17000003")
+
+    assert urls.get("Best_Buy", "QN65QN90FAFXZC").endswith("/verified/17000001")
+    assert urls.get("Best_Buy", "QN55Q80CAFXZC").endswith("/crawled/17000003")
+    urls.close()
@@ -0,0 +1,64 @@
+import asyncio
+import socket
+from datetime import datetime
+
+from aiohttp import web
+
+from utils.change_feed import diff_runs, post_change_feed
+
+
+def comparison(price):
+    return {"results": {"Best_Buy": {"found": True, "result": {"price": price, "url": "https://www.bestbuy.ca/p/1"}}}}
+
+
+def run_events():
+    return diff_runs({"TV A": comparison(1299.99)}, {"TV A": comparison(999.99)}, now=datetime(2026, 1, 1))
+
+
+async def post_to_stub(handler, events, timeout=10):
+    """post_change_feed() against a local server answering with `handler`"""
+    app = web.Application()
+    app.router.add_post("/hook", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        return await post_change_feed(events, f"http://127.0.0.1:{runner.addresses[0][1]}/hook", timeout=timeout)
+    finally:
+        await runner.cleanup()
+
+
+def test_posts_the_diffed_events():
+    received = []
+
+    async def accept(request):
+        received.append(await request.json())
+        return web.Response(status=204)
+
+    events = run_events()
+    assert [e["type"] for e in events] == ["price_down"]
+    assert asyncio.run(post_to_stub(accept, events)) is True
+    assert received == [{"events": events}]
+
+
+def test_rejected_post_is_reported_not_raised():
+    async def reject(request):
+        return web.Response(status=500)
+
+    assert asyncio.run(post_to_stub(reject, run_events())) is False
+
+
+def test_unreachable_webhook_is_reported_not_raised():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    assert asyncio.run(post_change_feed(run_events(), f"http://127.0.0.1:{port}/hook")) is False
+
+
+def test_slow_webhook_times_out():
+    async def stall(request):
+        await asyncio.sleep(1)
+        return web.Response()
+
+    assert asyncio.run(post_to_stub(stall, run_events(), timeout=0.2)) is False
@@ -0,0 +1,40 @@
+import json
+
+from price_comparison import load_checkpoint
+from utils.result_writer import journal_part_path
+
+
+def write_journal(path, records):
+    with open(path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def test_only_settled_entries_count_as_completed(tmp_path):
+    journal = str(tmp_path / "results.jsonl")
+    write_journal(journal, [
+        {"product": "TV A", "retailer": "Best_Buy", "found": True, "result": {"price": 999.99}},
+        {"product": "TV A", "retailer": "Amazon", "found": False, "result": {}, "error": "Timeout 30000ms exceeded"},
+        {"product": "TV A", "retailer": "LG", "found": False, "result": {}, "skipped": "other brand"},
+        {"product": "TV A", "retailer": "Costco", "found": False, "result": {}, "error": "No search results"},
+    ])
+    write_journal(journal_part_path(journal, 0), [
+        {"product": "TV B", "retailer": "Best_Buy", "found": True, "result": {"price": 499.99}},
+        {"product": "TV B", "retailer": "Amazon", "found": False, "result": {}, "error": "Browser crashed"},
+    ])
+
+    completed, recovered = load_checkpoint(journal)
+
+    assert set(completed) == {("TV A", "Best_Buy"), ("TV A", "LG"), ("TV A", "Costco"), ("TV B", "Best_Buy")}
+    assert set(recovered) == {("TV B", "Best_Buy")}
+
+
+def test_settled_part_entry_replaces_a_transient_main_entry(tmp_path):
+    journal = str(tmp_path / "results.jsonl")
+    write_journal(journal, [{"product": "TV A", "retailer": "Amazon", "found": False, "result": {}, "error": "Timeout"}])
+    write_journal(journal_part_path(journal, 1),
+                  [{"product": "TV A", "retailer": "Amazon", "found": True, "result": {"price": 899.99}}])
+
+    completed, recovered = load_checkpoint(journal)
+
+    assert completed[("TV A", "Amazon")]["found"] and ("TV A", "Amazon") in recovered
@@ -0,0 +1,64 @@
+import asyncio
+
+from utils.page_readiness import Readiness, expect_response, wait_until_ready
+
+
+class FakeResponse:
+    def __init__(self, url):
+        self.url = url
+
+
+class FakePage:
+    """Just enough of a Playwright page: a selector and a response that show up after a delay"""
+
+    def __init__(self, selector_after=None, response_url=None, response_after=None):
+        self.selector_after = selector_after
+        self.response_url = response_url
+        self.response_after = response_after
+
+    async def wait_for_selector(self, selector, state, timeout):
+        if self.selector_after is None or self.selector_after > timeout / 1000:
+            await asyncio.sleep(timeout / 1000)
+            raise TimeoutError(selector)
+        await asyncio.sleep(self.selector_after)
+
+    async def wait_for_event(self, event, predicate, timeout):
+        if self.response_after is not None and self.response_after <= timeout / 1000:
+            await asyncio.sleep(self.response_after)
+            response = FakeResponse(self.response_url)
+            if predicate(response):
+                return response
+        await asyncio.sleep(timeout / 1000)
+        raise TimeoutError(event)
+
+    async def wait_for_timeout(self, timeout):
+        await asyncio.sleep(timeout / 1000)
+
+
+SEARCH = Readiness([".CoveoResultLink"], response_url="/rest/search", timeout=300)
+
+
+def check(page, readiness=SEARCH):
+    async def run():
+        return await wait_until_ready(page, readiness, expect_response(page, readiness))
+    return asyncio.run(run())
+
+
+def test_query_response_without_results_counts_as_ready():
+    assert check(FakePage(response_url="https://platform.cloud.coveo.com/rest/search/v2", response_after=0.05))
+
+
+def test_result_links_count_as_ready():
+    assert check(FakePage(selector_after=0.05))
+
+
+def test_unrelated_response_does_not_count():
+    assert not check(FakePage(response_url="https://www.tanguay.ca/static/app.js", response_after=0.05))
+
+
+def test_slow_query_is_not_ready():
+    assert not check(FakePage(response_url="https://platform.cloud.coveo.com/rest/search/v2", response_after=1))
+
+
+def test_no_response_waiter_without_response_url():
+    assert expect_response(FakePage(), Readiness([".x"])) is None
@@ -0,0 +1,74 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from utils.price_analytics import PriceMatrix  # noqa: E402
+from utils.price_history import DAY, PriceHistory  # noqa: E402
+
+
+def found(price):
+    return {"found": True, "result": {"price": price}}
+
+
+COMPARISONS = {
+    "TV A": {"results": {"Best_Buy": found(999.99), "Amazon": found(949.99), "Costco": {"found": False, "result": {}}}},
+    "TV B": {"results": {"Best_Buy": found(499.99), "Amazon": {"found": False, "result": {}},
+                         "Costco": {"found": False, "result": {}}}},
+    "TV C": {"results": {"Best_Buy": {"found": False, "result": {}}, "Amazon": {"found": False, "result": {}},
+                         "Costco": {"found": False, "result": {}}}},
+}
+
+
+def test_best_second_best_and_spread_per_product():
+    matrix = PriceMatrix.from_comparisons(COMPARISONS, ts=0)
+    best, retailer = matrix.best()
+    assert best[:2].tolist() == pytest.approx([949.99, 499.99])
+    assert math.isnan(best[2])
+    assert [matrix.retailers[j] if j >= 0 else None for j in retailer] == ["Amazon", "Best_Buy", None]
+
+    second = matrix.second_best()
+    assert second[0] == pytest.approx(999.99) and math.isnan(second[1]) and math.isnan(second[2])
+    spread = matrix.spread()
+    assert spread[0] == pytest.approx(50.0, abs=0.01) and spread[1] == 0 and math.isnan(spread[2])
+
+
+def test_win_rates_count_only_products_with_a_price():
+    rates = PriceMatrix.from_comparisons(COMPARISONS, ts=0).win_rates()
+    assert rates == {"Best_Buy": 0.5, "Amazon": 0.5, "Costco": 0.0}
+
+
+def test_from_history_buckets_by_day_and_finds_the_biggest_drops(tmp_path):
+    path = str(tmp_path / "history.sqlite3")
+    history = PriceHistory(path)
+    day = 20_000 * DAY
+    history.record([
+        ("QN65QN90FAFXZC", "Best_Buy", day + 3600, 1999.99, None, "TV A"),
+        ("QN65QN90FAFXZC", "Best_Buy", day + 7200, 1899.99, None, "TV A"),   # the day's low wins
+        ("QN65QN90FAFXZC", "Best_Buy", day + DAY + 3600, 1499.99, None, "TV A"),
+        ("OLED65C4PUA", "Amazon", day + 3600, 2499.99, None, "TV B"),
+        ("OLED65C4PUA", "Amazon", day + DAY + 3600, 2399.99, None, "TV B"),
+    ])
+    history.close()
+
+    matrix = PriceMatrix.from_history(path)
+    assert matrix.prices.shape == (2, 2, 2)
+    assert matrix.times.tolist() == [day, day + DAY]
+    i, j = matrix.products.index("QN65QN90FAFXZC"), matrix.retailers.index("Best_Buy")
+    assert matrix.prices[i, j].tolist() == pytest.approx([1899.99, 1499.99])
+
+    drops = matrix.top_drops(k=5)
+    assert [(product, retailer) for product, retailer, *_ in drops] == [
+        ("QN65QN90FAFXZC", "Best_Buy"), ("OLED65C4PUA", "Amazon")]
+    assert drops[0][4] == pytest.approx(400.0, abs=0.01)
+
+
+def test_save_and_memory_mapped_load_round_trip(tmp_path):
+    matrix = PriceMatrix.from_comparisons(COMPARISONS, ts=0)
+    path = str(tmp_path / "matrix.npy")
+    matrix.save(path)
+
+    loaded = PriceMatrix.load(path)
+    assert (loaded.products, loaded.retailers, loaded.times.tolist()) == (matrix.products, matrix.retailers, [0])
+    assert np.array_equal(loaded.prices, matrix.prices, equal_nan=True)
@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import price_comparison
+from scrappers.base_scraper import BaseScraper
+from utils.model_numbers import parse_model_number
+from utils.result_cache import is_fresh_entry
+from utils.search_harvest import configure_search_harvest
+
+PRODUCT = "Samsung 65\" QN90F Neo QLED - QN65QN90FAFXZC"
+
+
+class FakeScraper(BaseScraper):
+    """Answers every product with one price and remembers what it was handed"""
+
+    retailer_id = "Fake"
+    calls = []
+
+    async def scrape_product(self, product_name, model=None):
+        if model is not None:
+            self.known_models = {product_name: model}
+        FakeScraper.calls.append((product_name, model, self.parse_model(product_name)))
+        return {"product_name": product_name, "price": 999.99, "url": "https://example.com/p/1", "sale_end_date": ""}
+
+
+@pytest.fixture
+def fake_run(monkeypatch):
+    monkeypatch.setattr(price_comparison, "SCRAPERS", {"Fake": FakeScraper})
+    configure_search_harvest(False)
+    FakeScraper.calls = []
+    yield lambda **kwargs: asyncio.run(price_comparison.get_market_prices([{"name": PRODUCT}], **kwargs))
+    configure_search_harvest(True)
+
+
+def earlier(scraped_at=None, **entry):
+    entry = {"found": True, "result": {"name": PRODUCT, "price": 1099.99, "url": "https://example.com/p/1",
+                                       "price_validity": ""}, **entry}
+    if scraped_at is not None:
+        entry["scraped_at"] = scraped_at
+    return {PRODUCT: {"results": {"Fake": entry}}}
+
+
+def test_incremental_run_keeps_a_fresh_entry(fake_run):
+    scraped_at = datetime.now().isoformat(timespec="seconds")
+    results = fake_run(previous=earlier(scraped_at))
+    assert FakeScraper.calls == []
+    assert results[PRODUCT]["results"]["Fake"]["result"]["price"] == 1099.99
+
+
+def test_incremental_run_rescrapes_an_entry_without_scraped_at(fake_run):
+    results = fake_run(previous=earlier())
+    assert len(FakeScraper.calls) == 1
+    assert results[PRODUCT]["results"]["Fake"]["result"]["price"] == 999.99
+
+
+def test_incremental_run_rescrapes_an_expired_entry(fake_run):
+    scraped_at = (datetime.now() - timedelta(days=2)).isoformat(timespec="seconds")
+    fake_run(previous=earlier(scraped_at))
+    assert len(FakeScraper.calls) == 1
+
+
+@pytest.mark.parametrize("entry", [
+    {"found": True, "result": {"price": 999.99}},                                    # no scraped_at
+    {"found": True, "result": {"price": 999.99}, "scraped_at": "not a date"},
+    {"found": False, "result": {}, "error": "Timeout 30000ms exceeded", "scraped_at": "2026-10-18T11:00:00"},
+    {"found": True, "result": {"price": 999.99, "price_validity": "2026-10-17"}, "scraped_at": "2026-10-18T11:00:00"},
+])
+def test_stale_entries(entry):
+    now = datetime(2026, 10, 18, 12).timestamp()
+    assert not is_fresh_entry("Best_Buy", entry, now=now)
+
+
+def test_not_carried_entry_is_fresh_for_the_negative_ttl():
+    entry = {"found": False, "result": {}, "error": "No search results found", "scraped_at": "2026-10-18T11:00:00"}
+    assert is_fresh_entry("Best_Buy", entry, now=datetime(2026, 10, 18, 12).timestamp())
+    assert not is_fresh_entry("Best_Buy", entry, now=datetime(2026, 10, 18, 15).timestamp())
+
+
+def test_scraper_gets_the_orchestrators_model_number(fake_run):
+    fake_run()
+    (name, handed, used), = FakeScraper.calls
+    assert handed is parse_model_number(PRODUCT)
+    assert used is handed and used.canonical == "QN65QN90FAFXZC"
+
+
+def test_known_model_is_used_without_reparsing_the_name():
+    scraper = FakeScraper()
+    model = parse_model_number("QN65QN90FAFXZC")
+    scraper.known_models = {"Samsung 65 inch TV": model}
+    assert scraper.parse_model("Samsung 65 inch TV") is model
+    assert scraper.extract_model_number("Samsung 65 inch TV") == model.model
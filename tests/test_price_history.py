@@ -0,0 +1,49 @@
+import time
+
+from utils.price_history import DAY, PriceHistory
+
+NOW = int(time.time()) // DAY * DAY + 12 * 3600   # today at noon, so the day buckets are unambiguous
+OLD_DAY = NOW // DAY * DAY - 120 * DAY
+
+
+def history_with_points(tmp_path):
+    history = PriceHistory(str(tmp_path / "history.sqlite3"))
+    history.record([
+        ("QN65QN90FAFXZC", "Best_Buy", OLD_DAY + 3600, 1999.99, None, "TV"),
+        ("QN65QN90FAFXZC", "Best_Buy", OLD_DAY + 7200, 1899.99, None, "TV"),
+        ("QN65QN90FAFXZC", "Best_Buy", OLD_DAY + 10800, 1949.99, None, "TV"),
+        ("QN65QN90FAFXZC", "Amazon", OLD_DAY + 3600, 1949.99, None, "TV"),
+        ("QN65QN90FAFXZC", "Best_Buy", NOW - 3600, 1799.99, None, "TV"),
+        ("QN65QN90FAFXZC", "Best_Buy", NOW - 1800, 1749.99, None, "TV"),
+    ])
+    return history
+
+
+def test_compact_keeps_each_old_days_low_and_leaves_recent_points(tmp_path):
+    history = history_with_points(tmp_path)
+
+    assert history.compact(older_than_days=90, now=NOW) == 2
+    assert history.series("QN65QN90FAFXZC", "Best_Buy") == [
+        (OLD_DAY, 1899.99), (NOW - 3600, 1799.99), (NOW - 1800, 1749.99)]
+    assert history.series("QN65QN90FAFXZC", "Amazon") == [(OLD_DAY, 1949.99)]
+    history.close()
+
+
+def test_compacting_twice_changes_nothing(tmp_path):
+    history = history_with_points(tmp_path)
+    history.compact(older_than_days=90, now=NOW)
+    before = history.series("QN65QN90FAFXZC", "Best_Buy")
+
+    assert history.compact(older_than_days=90, now=NOW) == 0
+    assert history.series("QN65QN90FAFXZC", "Best_Buy") == before
+    history.close()
+
+
+def test_compact_if_due_runs_once_per_interval(tmp_path):
+    history = history_with_points(tmp_path)
+    history.compact_if_due(older_than_days=90, now=NOW)
+    history.record([("QN65QN90FAFXZC", "Amazon", OLD_DAY + 7200, 1899.99, None, "TV")])
+
+    assert history.compact_if_due(older_than_days=90, now=NOW) == 0
+    assert len(history.series("QN65QN90FAFXZC", "Amazon")) == 2
+    history.close()
@@ -0,0 +1,86 @@
+import pytest
+
+from utils.price_parser import parse_price, parse_price_value
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("$899.99 (eco fee $4.50)", 899.99),
+    ("$899.99 EHF $4.50", 899.99),
+    ("899,99 $ + écofrais 4,50 $", 899.99),
+    ("Prix: 1 099,99 $ (éco-frais 5,00 $)", 1099.99),
+    ("$1,099.99 + EHF", 1099.99),
+    ("$4.50 eco fee + $899.99", 899.99),
+])
+def test_fee_next_to_price_is_skipped(text, expected):
+    assert parse_price_value(text) == expected
+
+
+@pytest.mark.parametrize("text", ["EHF $4.50", "$4.50 eco fee", "éco-frais : 5,00 $"])
+def test_fee_alone_is_not_a_price(text):
+    assert parse_price_value(text) is None
+
+
+def test_was_now_pair():
+    parsed = parse_price("Reg. $1,299.99 Sale $999.99")
+    assert (parsed.cents, parsed.was_cents, parsed.kind) == (99999, 129999, "now")
+
+
+def test_range_takes_low_end():
+    parsed = parse_price("$999 - $1,299")
+    assert (parsed.cents, parsed.high_cents, parsed.kind) == (99900, 129900, "range")
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1299.0000", 1299.0),
+    ("1299.000", 1299.0),
+    ("899.990", 899.99),
+    ("1799.989999", 1799.99),
+    ("1299", 1299.0),
+    (1299.5, 1299.5),
+])
+def test_machine_numbers_are_plain_decimals(value, expected):
+    assert parse_price_value(value) == expected
+
+
+@pytest.mark.parametrize("value", ["0", "0.00", "$0.00", 0])
+def test_never_a_zero_price(value):
+    assert parse_price_value(value) is None
+
+
+def test_structured_offer_price_with_extra_decimals():
+    from utils.structured_data import extract_structured_data
+
+    html = ('<script type="application/ld+json">'
+            '{"@type": "Product", "mpn": "QN65QN90FAFXZC", "offers": {"price": "1299.000"}}</script>')
+    assert extract_structured_data(html)[0]["price"] == 1299.0
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("4.5 out of 5 stars $299.99", 299.99),
+    ("$1.299,99", 1299.99),
+    ("Model 55 inch 2024 $649.99", 649.99),
+    ("$1,299.99 $999.99", 999.99),
+    ("$999.99 $1,299.99", 999.99),
+    ("$1,299.99 or 12 payments of $108.33", 1299.99),
+])
+def test_currency_marked_amount_wins_over_other_numbers(text, expected):
+    assert parse_price_value(text) == expected
+
+
+def test_adjacent_unlabeled_pair_records_regular_price():
+    assert parse_price("$1,299.99 $999.99").was_cents == 129999
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("649,99 $ 4,5 étoiles", 649.99),
+    ("649,99 $ 799,99 $", 649.99),
+    ("1 099,99 $ 1 299,99 $", 1099.99),
+])
+def test_french_trailing_marker_stays_with_its_amount(text, expected):
+    assert parse_price_value(text) == expected
+
+
+@pytest.mark.parametrize("text", ["$1,299.99\nSave $300.00\n$999.99", "1 299,99 $\nÉconomisez 300,00 $\n999,99 $"])
+def test_stacked_card_skips_the_savings_line(text):
+    parsed = parse_price(text)
+    assert (parsed.cents, parsed.was_cents) == (99999, 129999)
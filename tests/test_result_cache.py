@@ -0,0 +1,50 @@
+import pytest
+
+from utils.model_numbers import parse_model_number
+from utils.result_cache import ResultCache, cache_key, is_not_carried
+
+
+@pytest.mark.parametrize("error", [
+    "No search results for 'QN65QN90FAFXZC'",
+    "No results found",
+    "No product results found",
+])
+def test_empty_search_means_not_carried(error):
+    assert is_not_carried(error)
+
+
+@pytest.mark.parametrize("error", [
+    "Model mismatch: no result title matches 'QN65QN90FAFXZC'",
+    "Model number mismatch: Expected QN65QN90FAFXZC, found QN65QN90FAFXZA",
+    "Model does not match product model",
+    "Model QN65QN90FAFXZC not found in search results",      # Samsung: no card matched the model
+    "Could not find matching product with price",           # London Drugs, as older journals have it
+    "No priced result matches model QN65QN90FAFXZC",
+    "Could not read a price on any result card",
+    "Timeout 30000ms exceeded",
+    None,
+])
+def test_mismatches_and_failures_are_not_a_catalog_answer(error):
+    assert not is_not_carried(error)
+
+
+def test_cache_key_uses_the_model_already_parsed():
+    model = parse_model_number("Samsung QN65QN90FAFXZC")
+    assert cache_key("Best_Buy", "Samsung 65 inch QLED", model) == ("Best_Buy", model.canonical)
+    assert cache_key("Best_Buy", "Samsung QN65QN90FAFXZC") == ("Best_Buy", model.canonical)
+
+
+def test_cached_entry_is_not_changed_through_the_callers_dicts(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"))
+    entry = {"found": True, "result": {"price": 999.99}}
+    cache.put("Best_Buy", "QN65QN90FAFXZC", entry)
+    entry["result"]["price"] = 1.0
+    entry["cached"] = False
+
+    hit, _ = cache.get("Best_Buy", "QN65QN90FAFXZC")
+    hit["result"]["price"] = 2.0
+    hit["scraped_at"] = "2026-01-01T00:00:00"
+
+    again, _ = cache.get("Best_Buy", "QN65QN90FAFXZC")
+    assert again == {"found": True, "result": {"price": 999.99}}
+    cache.close()
@@ -0,0 +1,32 @@
+from utils.dom_extract import ExtractionSpec, Field
+from utils.selector_stats import SelectorStats
+
+
+def _run(stats, spec, hits):
+    """One run that extracts once, hitting the selectors labelled in `hits`"""
+    used = stats.order("Shop", "search", spec)
+    row = {"_hits": {name: used.fields[name].labels.index(label) for name, label in hits.items() if name != "cards"}}
+    if "cards" in hits:
+        row["_hits"]["cards"] = used.cards.index(hits["cards"])
+    stats.record("Shop", "search", used, [row])
+    stats.flush()
+
+
+def test_priority_chains_keep_source_order(tmp_path):
+    stats = SelectorStats(str(tmp_path / "stats.sqlite3"))
+    spec = ExtractionSpec({"price": Field([".sale-price", ".price"])}, cards=[".card", "body"])
+    for _ in range(3):
+        _run(stats, spec, {"price": ".price", "cards": "body"})
+    used = stats.order("Shop", "search", spec)
+    assert used.fields["price"].labels == [".sale-price", ".price"]
+    assert used.cards == [".card", "body"]
+    stats.close()
+
+
+def test_only_the_reorderable_head_moves(tmp_path):
+    stats = SelectorStats(str(tmp_path / "stats.sqlite3"))
+    spec = ExtractionSpec({"title": Field([".old-title", ".new-title", "h4"], reorderable=2)})
+    for _ in range(3):
+        _run(stats, spec, {"title": ".new-title"})
+    assert stats.order("Shop", "search", spec).fields["title"].labels == [".new-title", ".old-title", "h4"]
+    stats.close()
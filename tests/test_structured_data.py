@@ -0,0 +1,28 @@
+import json
+
+from utils.structured_data import extract_structured_data
+
+
+def product_page(offers):
+    product = {"@type": "Product", "mpn": "QN65QN90FAFXZC", "offers": offers}
+    return f'<script type="application/ld+json">{json.dumps(product)}</script>'
+
+
+def test_new_condition_offer_beats_a_cheaper_open_box_one():
+    html = product_page([
+        {"@type": "Offer", "price": "1499.99", "itemCondition": "https://schema.org/RefurbishedCondition"},
+        {"@type": "Offer", "price": "1999.99", "itemCondition": "https://schema.org/NewCondition",
+         "priceValidUntil": "2026-11-01"},
+    ])
+    record = extract_structured_data(html)[0]
+    assert (record["price"], record["price_valid_until"]) == (1999.99, "2026-11-01")
+
+
+def test_first_offer_wins_when_conditions_are_not_given():
+    html = product_page([{"@type": "Offer", "price": "1999.99"}, {"@type": "Offer", "price": "1299.99"}])
+    assert extract_structured_data(html)[0]["price"] == 1999.99
+
+
+def test_used_offer_is_kept_when_it_is_the_only_one():
+    html = product_page({"@type": "Offer", "price": "899.99", "itemCondition": "UsedCondition"})
+    assert extract_structured_data(html)[0]["price"] == 899.99
@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+from utils.tracing import (Tracer, configure_tracing, get_tracer, merge_trace_parts, span, summarize, tagged,
+                           trace_part_path, traced, write_trace)
+
+
+def worker_events(retailer, product, phases):
+    """What one shard worker writes: its own tracer's spans, tagged with its task"""
+    tracer = Tracer()
+    with tagged(retailer, product):
+        for phase in phases:
+            with tracer.span(phase):
+                pass
+    return tracer.trace_events()
+
+
+def test_merge_collects_every_shard_part_and_removes_them(tmp_path):
+    path = str(tmp_path / "trace.json")
+    write_trace(trace_part_path(path, 0), worker_events("Best_Buy", "TV A", ["goto", "extract:search"]))
+    write_trace(trace_part_path(path, 1), worker_events("Amazon", "TV B", ["goto"]))
+    main_events = worker_events(None, None, ["crawl"])
+
+    events = merge_trace_parts(path, main_events)
+
+    spans = sorted((e["cat"], e["name"]) for e in events if e["ph"] == "X")
+    assert spans == [("Amazon", "goto"), ("Best_Buy", "extract:search"), ("Best_Buy", "goto"), ("run", "crawl")]
+    assert list(tmp_path.iterdir()) == [tmp_path / "trace.json"]
+    with open(path) as f:
+        assert json.load(f)["traceEvents"] == events
+
+
+def test_unreadable_part_is_skipped(tmp_path):
+    path = str(tmp_path / "trace.json")
+    write_trace(trace_part_path(path, 0), worker_events("Best_Buy", "TV A", ["goto"]))
+    with open(trace_part_path(path, 1), "w") as f:
+        f.write('{"traceEvents": [')   # a worker killed mid-write
+
+    events = merge_trace_parts(path)
+
+    assert [(e["cat"], e["name"]) for e in events if e["ph"] == "X"] == [("Best_Buy", "goto")]
+    assert list(tmp_path.iterdir()) == [tmp_path / "trace.json"]
+
+
+def test_summary_counts_spans_from_every_part(tmp_path):
+    path = str(tmp_path / "trace.json")
+    for index in range(3):
+        write_trace(trace_part_path(path, index), worker_events("Best_Buy", f"TV {index}", ["goto"]))
+
+    summary = summarize(merge_trace_parts(path))
+
+    assert summary["Best_Buy"]["goto"][0] == 3
+
+
+def test_each_task_gets_its_own_thread_row():
+    tracer = Tracer()
+    for product in ("TV A", "TV B"):
+        with tagged("Best_Buy", product), tracer.span("goto"):
+            pass
+    events = tracer.trace_events()
+    names = {e["tid"]: e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert sorted(names.values()) == ["Best_Buy: TV A", "Best_Buy: TV B"]
+    assert {e["tid"] for e in events if e["ph"] == "X"} == set(names)
+
+
+def test_spans_are_no_ops_when_tracing_is_off():
+    configure_tracing(False)
+
+    @traced("decorated")
+    async def work():
+        with span("inner"):
+            return 42
+
+    assert asyncio.run(work()) == 42 and get_tracer() is None
+
+    configure_tracing(True)
+    try:
+        asyncio.run(work())
+        assert [s[0] for s in get_tracer().spans] == ["inner", "decorated"]
+    finally:
+        configure_tracing(False)
@@ -0,0 +1,133 @@
+import asyncio
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+from utils.tracing import span
+
+
+class _BrowserSlot:
+    """A launched browser plus the bookkeeping the pool needs to recycle it"""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.uses = 0        # contexts handed out over the browser's lifetime
+        self.active = 0      # contexts currently open
+        self.retiring = False
+
+
+class BrowserPool:
+    """Process-wide pool of warm browsers that hands out isolated contexts and pages.
+
+    One Playwright driver is started lazily and shared by every scraper. Browsers are
+    kept per (engine, launch args) so Costco's WebKit and Staples' custom Chromium flags
+    get their own instances. Each lease gets a fresh context, so cookies and storage
+    never leak between scrapes, and a browser is retired after serving
+    `max_contexts_per_browser` contexts to keep memory in check.
+    """
+
+    def __init__(self, browsers_per_engine=2, max_contexts_per_browser=50, headless=True):
+        self.browsers_per_engine = browsers_per_engine
+        self.max_contexts_per_browser = max_contexts_per_browser
+        self.headless = headless
+        self._playwright = None
+        self._slots = {}  # (engine, launch_args) -> list of _BrowserSlot
+        self._lock = asyncio.Lock()
+
+    async def _acquire(self, engine, launch_args):
+        async with self._lock:
+            if self._playwright is None:
+                with span("playwright_start"):
+                    self._playwright = await async_playwright().start()
+
+            slots = self._slots.setdefault((engine, launch_args), [])
+
+            # Forget browsers that crashed or were closed underneath us
+            slots[:] = [slot for slot in slots if slot.browser.is_connected()]
+
+            live = [slot for slot in slots if not slot.retiring]
+            idle = [slot for slot in live if slot.active == 0]
+            if not idle and len(live) < self.browsers_per_engine:
+                launcher = getattr(self._playwright, engine)
+                with span("browser_launch", engine=engine):
+                    browser = await launcher.launch(headless=self.headless, args=list(launch_args))
+                slot = _BrowserSlot(browser)
+                slots.append(slot)
+                live.append(slot)
+
+            slot = min(live, key=lambda s: s.active)
+            slot.uses += 1
+            slot.active += 1
+            if slot.uses >= self.max_contexts_per_browser:
+                slot.retiring = True
+            return slot
+
+    async def _release(self, engine, launch_args, slot):
+        slot.active -= 1
+        if slot.retiring and slot.active == 0:
+            async with self._lock:
+                slots = self._slots.get((engine, launch_args), [])
+                if slot in slots:
+                    slots.remove(slot)
+            try:
+                await slot.browser.close()
+            except Exception:
+                pass
+
+    @asynccontextmanager
+    async def context(self, engine="chromium", launch_args=(), init_script=None, **context_options):
+        """Lease a fresh browser context; it is closed and the browser recycled on exit"""
+        launch_args = tuple(launch_args)
+        slot = await self._acquire(engine, launch_args)
+        context = None
+        try:
+            with span("new_context", engine=engine):
+                context = await slot.browser.new_context(**context_options)
+                if init_script:
+                    await context.add_init_script(init_script)
+            yield context
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            await self._release(engine, launch_args, slot)
+
+    @asynccontextmanager
+    async def page(self, engine="chromium", launch_args=(), init_script=None, **context_options):
+        """Lease a page inside its own fresh context"""
+        async with self.context(engine, launch_args, init_script, **context_options) as context:
+            page = await context.new_page()
+            yield page
+
+    async def close(self):
+        """Close every pooled browser and stop the Playwright driver"""
+        async with self._lock:
+            for slots in self._slots.values():
+                for slot in slots:
+                    try:
+                        await slot.browser.close()
+                    except Exception:
+                        pass
+            self._slots.clear()
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+
+_browser_pool = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """Return the process-wide browser pool, creating it on first use"""
+    global _browser_pool
+    if _browser_pool is None:
+        _browser_pool = BrowserPool()
+    return _browser_pool
+
+
+async def close_browser_pool():
+    """Shut down the process-wide browser pool if one was started"""
+    global _browser_pool
+    if _browser_pool is not None:
+        await _browser_pool.close()
+        _browser_pool = None
@@ -0,0 +1,151 @@
+import re
+from typing import NamedTuple
+
+from utils.model_numbers import normalize_model, parse_model_number
+from utils.tracing import span
+
+
+# Accept a candidate at or above this confidence
+DEFAULT_MIN_CONFIDENCE = 0.7
+
+# Confidence of each way a candidate can carry the model
+EXACT = 1.0               # a token is the model (separators ignored)
+SAME_SERIES = 0.85        # one side lists the model without its region suffix
+CONTAINS = 0.7            # the model is buried in a longer token or run of text
+OTHER_REGION = 0.6        # same series, different region suffix (FXZA vs FXZC)
+PARTIAL = 0.5             # a card token is part of the model ("DU8000" for UN75DU8000FXZC)
+WORD_OVERLAP = 0.5        # at most this from shared title words alone
+
+_TOKEN = re.compile(r"[A-Z0-9]+(?:[._/-][A-Z0-9]+)*")
+_WORD = re.compile(r"[a-z0-9]+")
+# A screen size in a title: 65", 65-inch, 65 in, 65 po
+_SIZE = re.compile(r"(?<![\d.])(\d{2,3})\s*-?\s*(?:\"|”|″|''|inch(?:es)?\b|in\b|po\b|pouces?\b)", re.IGNORECASE)
+# The screen size most TV model numbers lead with: UN75..., OLED65..., 65UT...
+_MODEL_SIZE = re.compile(r"^[A-Z]{0,4}(\d{2,3})(?=[A-Z])")
+
+
+class Match(NamedTuple):
+    candidate: dict
+    index: int            # position on the results page
+    confidence: float
+    reason: str
+
+
+def _model_tokens(text):
+    """Canonical forms of the tokens in `text` that look like model numbers"""
+    tokens = set()
+    for token in _TOKEN.findall((text or "").upper()):
+        canonical = normalize_model(token)
+        if len(canonical) >= 4 and not canonical.isdigit() and not canonical.isalpha():
+            tokens.add(canonical)
+    return tokens
+
+
+def _model_size(canonical):
+    """Screen size in inches a model number encodes, or None"""
+    match = _MODEL_SIZE.match(canonical or "")
+    size = int(match.group(1)) if match else None
+    return size if size and 19 <= size <= 115 else None
+
+
+def _series(canonical):
+    aliases = parse_model_number(canonical).aliases
+    return aliases[0] if aliases else canonical
+
+
+class CandidateIndex:
+    """Index over the candidate cards of one results page.
+
+    Each card's `fields` are tokenized once into canonical model tokens, their
+    region-less series and plain words. best() then scores every card against a
+    model with dictionary lookups, falling back to substring and word-overlap checks
+    only when no card carries the model or its series as a token. Partial and
+    word-overlap matches rank cards but fall below DEFAULT_MIN_CONFIDENCE, and a
+    partial match never goes to a card whose title shows another screen size.
+    """
+
+    def __init__(self, candidates, fields=("title",)):
+        self.candidates = list(candidates)
+        self.by_model = {}        # canonical token -> [card index]
+        self.by_series = {}       # series -> [(card index, canonical token)]
+        self.texts = []           # per card: all of its fields, normalized
+        self.tokens = []          # per card: canonical model tokens
+        self.words = []           # per card: lower-case words
+        self.sizes = []           # per card: screen sizes its text shows
+        for i, card in enumerate(self.candidates):
+            text = " ".join(str(card.get(field) or "") for field in fields)
+            self.texts.append(normalize_model(text))
+            self.tokens.append(_model_tokens(text))
+            self.words.append(set(_WORD.findall(text.lower())))
+            self.sizes.append({int(size) for size in _SIZE.findall(text)})
+            for token in self.tokens[i]:
+                self.by_model.setdefault(token, []).append(i)
+                self.by_series.setdefault(_series(token), []).append((i, token))
+
+    def scores(self, model, product_name=None):
+        """{card index: (confidence, reason)} for every card that carries the model at all.
+
+        With `product_name`, cards that don't mention the model still get a low score
+        from the words their titles share with it.
+        """
+        if isinstance(model, str):
+            model = parse_model_number(model)
+        canonical = model.canonical
+        series = model.aliases[0] if model.aliases else canonical
+        scores = {}
+
+        def offer(i, confidence, reason):
+            if confidence > scores.get(i, (0, ""))[0]:
+                scores[i] = (confidence, reason)
+
+        for i in self.by_model.get(canonical, ()):
+            offer(i, EXACT, f"lists {canonical}")
+        for i, token in self.by_series.get(series, ()):
+            if token == series or canonical == series:
+                offer(i, SAME_SERIES, f"lists {token} for {canonical}")
+            else:
+                offer(i, OTHER_REGION, f"lists {token}, a different region of {series}")
+
+        if not scores and canonical:
+            size = _model_size(canonical)
+            for i, text in enumerate(self.texts):
+                if canonical in text:
+                    offer(i, CONTAINS, f"mentions {canonical}")
+                else:
+                    part = max((t for t in self.tokens[i] if len(t) >= 5 and t in canonical), key=len, default=None)
+                    # "65\" DU8000" is the series, but not the 75" UN75DU8000FXZC
+                    if part and not (size and self.sizes[i] and size not in self.sizes[i]):
+                        offer(i, PARTIAL, f"lists {part}, part of {canonical}")
+
+        if not scores and product_name:
+            # Nothing mentions the model; word overlap can still rank cards but never
+            # reaches DEFAULT_MIN_CONFIDENCE on its own
+            wanted = set(_WORD.findall(product_name.lower()))
+            for i, words in enumerate(self.words):
+                if wanted and words & wanted:
+                    offer(i, WORD_OVERLAP * len(words & wanted) / len(wanted | words), "shares title words")
+        return scores
+
+    def best(self, model, min_confidence=DEFAULT_MIN_CONFIDENCE, product_name=None):
+        """The highest-confidence card for a model (earliest on ties), or None below min_confidence"""
+        scores = self.scores(model, product_name)
+        if not scores:
+            return None
+        i = min(scores, key=lambda i: (-scores[i][0], i))
+        confidence, reason = scores[i]
+        if confidence < min_confidence:
+            return None
+        return Match(self.candidates[i], i, confidence, reason)
+
+
+def best_candidate(candidates, model, fields=("title",), min_confidence=DEFAULT_MIN_CONFIDENCE):
+    """Index one page's candidate cards and pick the best match for `model`, or None"""
+    with span("verify_model"):
+        return CandidateIndex(candidates, fields).best(model, min_confidence)
+
+
+def match_confidence(model, text) -> float:
+    """Confidence that a single piece of text (a detail page's model field) is the model"""
+    with span("verify_model"):
+        scores = CandidateIndex([{"text": text}], fields=("text",)).scores(model)
+    return scores[0][0] if scores else 0.0
@@ -0,0 +1,288 @@
+import argparse
+import asyncio
+import re
+import sqlite3
+import time
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+import aiohttp
+
+from utils.model_numbers import normalize_model, parse_model_number
+from utils.rate_limiter import throttle
+from utils.result_cache import DEFAULT_CACHE_PATH
+from utils.structured_data import extract_structured_data
+from utils.url_cache import UrlCache
+
+
+class CatalogSource:
+    """Where a retailer lists its TVs in bulk"""
+
+    def __init__(self, listings=(), sitemaps=(), product_url=r".", max_pages=20):
+        self.listings = list(listings)    # category listing URLs, "{page}" filled in from 1
+        self.sitemaps = list(sitemaps)    # sitemap.xml or sitemap index URLs
+        self.product_url = re.compile(product_url)  # which linked or mapped URLs are product pages
+        self.max_pages = max_pages        # listing pages read at most, per listing
+
+
+# Keyed by the retailer names used in price_comparison.SCRAPERS
+CATALOG_SOURCES = {
+    "Best_Buy": CatalogSource(
+        listings=["https://www.bestbuy.ca/en-ca/category/televisions/21344?page={page}"],
+        product_url=r"/en-ca/product/",
+    ),
+    "LondonDrugs": CatalogSource(
+        listings=["https://www.londondrugs.com/electronics/tv-video/televisions/?page={page}"],
+        product_url=r"/[^/]+/L\d+",
+    ),
+    "Samsung": CatalogSource(
+        sitemaps=["https://www.samsung.com/ca/sitemap.xml"],
+        product_url=r"/ca/tvs/[^/]+/[^/]+/",
+    ),
+    "LG": CatalogSource(
+        sitemaps=["https://www.lg.com/ca_en/sitemap.xml"],
+        product_url=r"/ca_en/tvs?/",
+    ),
+    "Staples": CatalogSource(
+        listings=["https://www.staples.ca/collections/televisions-1023?page={page}"],
+        product_url=r"/products/",
+    ),
+    "Vision": CatalogSource(
+        listings=["https://www.visions.ca/tv-video/televisions?p={page}"],
+        sitemaps=["https://www.visions.ca/sitemap.xml"],
+        product_url=r"visions\.ca/[^/?]+-[a-z0-9]+(?:\.html)?$",
+    ),
+}
+
+_HREF = re.compile(r"""<a\b[^>]*?\bhref\s*=\s*["']([^"'#]+)""", re.IGNORECASE)
+_URL_TOKEN = re.compile(r"[A-Za-z0-9]+")
+
+
+def rebase(url, base_url):
+    """`url` with its scheme and host swapped for `base_url`'s, e.g. a local stub server"""
+    if not base_url:
+        return url
+    base = urlsplit(base_url)
+    parts = urlsplit(url)
+    return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, parts.fragment))
+
+
+def unrebase(url, base_url, origin):
+    """`url` moved back onto `origin`'s host if it points at `base_url`'s, e.g. a link a stub page wrote"""
+    if not base_url or urlsplit(url).netloc != urlsplit(base_url).netloc:
+        return url
+    return rebase(url, origin)
+
+
+def model_from_url(url):
+    """Model number named in a product URL's path, or None"""
+    best = None
+    for token in _URL_TOKEN.findall(urlsplit(url).path):
+        if len(token) < 6 or token.isdigit() or token.isalpha():
+            continue
+        model = parse_model_number(token.upper()).model
+        if model and (best is None or len(model) > len(best)):
+            best = model
+    return best
+
+
+def sitemap_locations(xml):
+    """(nested sitemap URLs, page URLs) listed in a sitemap or sitemap index"""
+    try:
+        root = ET.fromstring(xml)
+    except ET.ParseError:
+        return [], []
+    locations = [el.text.strip() for el in root.iter() if el.tag.rsplit("}", 1)[-1] == "loc" and el.text]
+    if root.tag.rsplit("}", 1)[-1] == "sitemapindex":
+        return locations, []
+    return [], locations
+
+
+class CatalogIndex:
+    """Persistent (retailer, normalized model) -> product URL, price and title.
+
+    Filled in bulk by crawl_catalog() from category listings and sitemaps. Sitemap
+    entries only carry a URL; their price stays empty until a listing page supplies
+    one. `priced_at` records when the price was last read, separately from `seen_at`,
+    so re-finding a URL never makes an old price look current.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS catalog ("
+            " retailer TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " url TEXT NOT NULL,"
+            " price REAL,"
+            " title TEXT,"
+            " seen_at REAL NOT NULL,"
+            " priced_at REAL,"
+            " PRIMARY KEY (retailer, model))"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(catalog)")}
+        if "priced_at" not in columns:
+            # Indexes written before prices had their own timestamp: trust none of them
+            self._db.execute("ALTER TABLE catalog ADD COLUMN priced_at REAL")
+        self._db.commit()
+
+    def put_many(self, retailer, products):
+        """Record (model, url, price, title) tuples; a missing price keeps the one already known"""
+        now = time.time()
+        self._db.executemany(
+            "INSERT INTO catalog (retailer, model, url, price, title, seen_at, priced_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (retailer, model) DO UPDATE SET url = excluded.url,"
+            " price = COALESCE(excluded.price, price), title = COALESCE(excluded.title, title),"
+            " seen_at = excluded.seen_at, priced_at = COALESCE(excluded.priced_at, priced_at)",
+            [(retailer, normalize_model(model), url, price, title, now, now if price is not None else None)
+             for model, url, price, title in products],
+        )
+        self._db.commit()
+
+    def get(self, retailer, model, max_age=None):
+        """{"url", "price", "title", "seen_at", "priced_at"} for a listed model, or None.
+
+        With `max_age` (seconds), a price read longer ago than that comes back as None.
+        """
+        row = self._db.execute(
+            "SELECT url, price, title, seen_at, priced_at FROM catalog WHERE retailer = ? AND model = ?",
+            (retailer, normalize_model(model)),
+        ).fetchone()
+        if row is None:
+            return None
+        url, price, title, seen_at, priced_at = row
+        if max_age is not None and (priced_at is None or priced_at < time.time() - max_age):
+            price = None
+        return {"url": url, "price": price, "title": title, "seen_at": seen_at, "priced_at": priced_at}
+
+    def count(self, retailer=None):
+        if retailer is None:
+            return self._db.execute("SELECT COUNT(*) FROM catalog").fetchone()[0]
+        return self._db.execute("SELECT COUNT(*) FROM catalog WHERE retailer = ?", (retailer,)).fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+
+async def _fetch(session, retailer, url):
+    """Body of a rate-limited GET, or None on any failure"""
+    await throttle(retailer)
+    try:
+        async with session.get(url) as response:
+            if response.status >= 400:
+                print(f"⚠️ {retailer}: {url} returned HTTP {response.status}")
+                return None
+            return await response.text()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"⚠️ {retailer}: could not fetch {url}: {e}")
+        return None
+
+
+def listing_products(html, page_url, source):
+    """(model, url, price, title) for each product on a listing page.
+
+    schema.org Products come with a price; other links to product pages only with
+    the model their URL names.
+    """
+    products = {}
+    for record in extract_structured_data(html):
+        url = urljoin(page_url, record["url"]) if record["url"] else None
+        model = None
+        for text in (record["mpn"], record["sku"], record["name"]):
+            model = parse_model_number(text).model if text else None
+            if model:
+                break
+        model = model or (model_from_url(url) if url else None)
+        if model and url:
+            products[normalize_model(model)] = (model, url, record["price"], record["name"])
+    for href in _HREF.findall(html):
+        url = urljoin(page_url, href)
+        if not source.product_url.search(url):
+            continue
+        model = model_from_url(url)
+        if model and normalize_model(model) not in products:
+            products[normalize_model(model)] = (model, url, None, None)
+    return list(products.values())
+
+
+async def crawl_retailer(session, retailer, source, base_url=None, max_sitemaps=50):
+    """Walk one retailer's listings and sitemaps; returns its (model, url, price, title) tuples.
+
+    With `base_url`, pages are fetched from that host but the returned URLs are the
+    retailer's own, so a stub-server crawl never leaks the stub host into the caches.
+    """
+    found = {}
+
+    for template in source.listings:
+        for page_number in range(1, source.max_pages + 1):
+            url = template.format(page=page_number)
+            html = await _fetch(session, retailer, rebase(url, base_url))
+            if html is None:
+                break
+            new = [p for p in listing_products(html, url, source) if normalize_model(p[0]) not in found]
+            if not new:
+                break  # past the last page, or the site ignores the page number
+            for model, product_url, price, title in new:
+                found[normalize_model(model)] = (model, unrebase(product_url, base_url, url), price, title)
+
+    pending = list(source.sitemaps)
+    fetched = 0
+    while pending and fetched < max_sitemaps:
+        sitemap_url = pending.pop(0)
+        xml = await _fetch(session, retailer, rebase(sitemap_url, base_url))
+        fetched += 1
+        if xml is None:
+            continue
+        nested, pages = sitemap_locations(xml)
+        pending.extend(unrebase(url, base_url, sitemap_url) for url in nested)
+        for url in (unrebase(url, base_url, sitemap_url) for url in pages):
+            if not source.product_url.search(url):
+                continue
+            model = model_from_url(url)
+            if model and normalize_model(model) not in found:
+                found[normalize_model(model)] = (model, url, None, None)
+
+    return list(found.values())
+
+
+async def crawl_catalog(retailers=None, path=DEFAULT_CACHE_PATH, base_url=None, sources=None, timeout=30):
+    """Crawl every retailer with a CatalogSource into the CatalogIndex at `path`.
+
+    Product URLs also go into the URL cache where it has none for the model yet, so
+    scrapers that read detail pages refresh a listed model with one navigation
+    instead of a search; URLs a scrape already verified are kept. `base_url`
+    points every request at another host, e.g. a stub server replaying saved pages;
+    what is stored still names the retailer's own URLs.
+    Returns {retailer: products indexed}.
+    """
+    sources = CATALOG_SOURCES if sources is None else sources
+    retailers = [r for r in (retailers or sources) if r in sources]
+    index = CatalogIndex(path)
+    urls = UrlCache(path)
+    counts = {}
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+            crawled = await asyncio.gather(*(crawl_retailer(session, r, sources[r], base_url) for r in retailers))
+        for retailer, products in zip(retailers, crawled):
+            index.put_many(retailer, products)
+            for model, url, price, title in products:
+                urls.put_new(retailer, model, url)
+            counts[retailer] = len(products)
+            priced = sum(1 for p in products if p[2] is not None)
+            print(f"✅ {retailer}: {len(products)} products indexed ({priced} with a listing price)")
+    finally:
+        index.close()
+        urls.close()
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index retailers' TV catalogs from category listings and sitemaps")
+    parser.add_argument("retailers", nargs="*", help="retailers to crawl (default: all with a catalog source)")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH, help="SQLite file the index is kept in")
+    parser.add_argument("--base-url", help="send every request to this host instead, e.g. http://127.0.0.1:8000")
+    args = parser.parse_args()
+    asyncio.run(crawl_catalog(args.retailers or None, args.cache_path, args.base_url))
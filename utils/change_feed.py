@@ -0,0 +1,105 @@
+import asyncio
+import json
+from datetime import datetime
+
+import aiohttp
+
+from utils.result_cache import is_not_carried, parse_sale_end
+
+
+DEFAULT_CHANGES_PATH = "price_changes.jsonl"
+
+# Price moves smaller than this are rounding noise, not changes
+PRICE_EPSILON = 0.005
+
+
+def _price(entry):
+    return entry["result"]["price"] if entry and entry.get("found") else None
+
+
+def _timestamp(iso):
+    try:
+        return datetime.fromisoformat(iso).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def diff_runs(previous, current, now=None):
+    """Change events between two runs' comparisons dicts.
+
+    Emits new_listing, disappeared, price_down, price_up, best_retailer_changed and
+    sale_ended events. A result that failed this run (timeout, block) says nothing
+    about the listing, so it never counts as a disappearance; only a "not carried"
+    outcome does. A sale_ended event fires once, on the first run after the end
+    date of a sale price the previous run reported.
+    """
+    now = datetime.now() if now is None else now
+    now_ts = now.timestamp()
+    run_at = now.isoformat()
+    events = []
+
+    def event(kind, product, **fields):
+        events.append({"type": kind, "product": product, "run_at": run_at, **fields})
+
+    for product, info in current.items():
+        old_info = previous.get(product)
+        if old_info is None:
+            continue  # products new to the input list have nothing to diff against
+        old_results = old_info.get("results", {})
+
+        for retailer, entry in info["results"].items():
+            old = old_results.get(retailer)
+            old_price, new_price = _price(old), _price(entry)
+
+            if new_price is not None and old_price is None:
+                event("new_listing", product, retailer=retailer, new_price=new_price, url=entry["result"].get("url"))
+            elif old_price is not None and new_price is None:
+                if is_not_carried(entry.get("error")):
+                    event("disappeared", product, retailer=retailer, old_price=old_price,
+                          url=old["result"].get("url"))
+            elif old_price is not None and abs(new_price - old_price) >= PRICE_EPSILON:
+                delta = round(new_price - old_price, 2)
+                event("price_down" if delta < 0 else "price_up", product, retailer=retailer,
+                      old_price=old_price, new_price=new_price, delta=delta,
+                      delta_pct=round(100 * delta / old_price, 2) if old_price else None,
+                      url=entry["result"].get("url"))
+
+            if old_price is not None:
+                sale_end = parse_sale_end(old["result"].get("price_validity"))
+                scraped_at = _timestamp(old.get("scraped_at"))
+                if sale_end is not None and sale_end <= now_ts and (scraped_at is None or scraped_at < sale_end):
+                    event("sale_ended", product, retailer=retailer, sale_price=old_price,
+                          sale_end_date=old["result"].get("price_validity"), new_price=new_price)
+
+        old_best = (old_info.get("best_price") or {}).get("retailer")
+        new_best = (info.get("best_price") or {})
+        if new_best.get("retailer") and old_best and new_best["retailer"] != old_best:
+            event("best_retailer_changed", product, old_retailer=old_best,
+                  old_price=old_info["best_price"]["price"], new_retailer=new_best["retailer"],
+                  new_price=new_best["price"])
+
+    return events
+
+
+def append_change_feed(events, path=DEFAULT_CHANGES_PATH):
+    """Append events to the JSON Lines feed at `path`"""
+    with open(path, "a") as f:
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+
+
+async def post_change_feed(events, url, timeout=10):
+    """POST the run's events as {"events": [...]} to a webhook; returns whether it was accepted.
+
+    A webhook that is down must not fail the run, so errors are printed, not raised.
+    """
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+            async with session.post(url, json={"events": events}) as response:
+                if response.status >= 400:
+                    print(f"⚠️ Change webhook returned HTTP {response.status}")
+                    return False
+                return True
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"⚠️ Could not post changes to webhook: {e}")
+        return False
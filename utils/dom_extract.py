@@ -0,0 +1,128 @@
+# Evaluates every selector fallback chain for a page in a single page.evaluate() call.
+# Chains are tried in order inside the browser, so a page with dozens of fallbacks
+# costs one CDP round trip instead of one query_selector + inner_text per selector.
+
+_EXTRACT_JS = """
+(spec) => {
+    const pick = (scope, field) => {
+        const pattern = field.pattern ? new RegExp(field.pattern) : null;
+        for (let i = 0; i < field.chain.length; i++) {
+            const [selector, attr] = field.chain[i];
+            const el = selector ? scope.querySelector(selector) : scope;
+            if (!el) continue;
+            let value = attr ? el.getAttribute(attr) : el.innerText;
+            if (value == null) continue;
+            value = value.trim();
+            if (!value) continue;
+            if (pattern && !pattern.test(value)) continue;
+            return [value, i];
+        }
+        return [null, -1];
+    };
+
+    let roots = [document];
+    let cardHit = -1;
+    if (spec.cards.length) {
+        roots = [];
+        for (let i = 0; i < spec.cards.length; i++) {
+            const found = document.querySelectorAll(spec.cards[i]);
+            if (found.length) {
+                roots = Array.from(found);
+                cardHit = i;
+                break;
+            }
+        }
+    }
+    if (spec.limit) roots = roots.slice(0, spec.limit);
+
+    return roots.map((root) => {
+        const out = {_hits: {cards: cardHit}};
+        for (const [name, field] of Object.entries(spec.fields)) {
+            const [value, hit] = pick(root, field);
+            out[name] = value;
+            out._hits[name] = hit;
+        }
+        return out;
+    });
+}
+"""
+
+
+class Field:
+    """A fallback chain for one value.
+
+    `selectors` are tried in order; each entry is a CSS selector (read with `attr`,
+    or innerText when attr is None) or a (selector, attr) pair to override it. A
+    selector of None means the card element itself. The first non-empty value that
+    matches `pattern` (a JavaScript-compatible regex) wins.
+
+    `labels` name the entries for hit statistics; they default to the selectors and
+    only need setting when a selector is filled in per page (a model number in it).
+
+    Chains are priority lists by default. `reorderable` is how many leading entries
+    are interchangeable variants of the same element (old and new site markup), which
+    selector statistics may try hottest first; the entries after them keep their place.
+    """
+
+    def __init__(self, selectors, attr=None, pattern=None, labels=None, reorderable=0):
+        self.chain = [entry if isinstance(entry, tuple) else (entry, attr) for entry in selectors]
+        self.pattern = pattern
+        self.labels = list(labels) if labels is not None else [selector or "(card)" for selector, _ in self.chain]
+        self.reorderable = reorderable
+
+    def reordered(self, order):
+        """Copy with the chain entries in `order` (a permutation of their indices)"""
+        field = Field([], pattern=self.pattern, reorderable=self.reorderable)
+        field.chain = [self.chain[i] for i in order]
+        field.labels = [self.labels[i] for i in order]
+        return field
+
+    def to_js(self):
+        return {"chain": [list(entry) for entry in self.chain], "pattern": self.pattern}
+
+
+class ExtractionSpec:
+    """Selector chains for one kind of page.
+
+    With `cards`, the first card selector that matches anything defines the result
+    cards (at most `limit` of them) and each field is resolved inside every card.
+    Without it the fields are resolved once against the whole document.
+    Plain CSS only: Playwright extensions such as :has-text() don't work in-page.
+    `reorderable_cards` works like Field's `reorderable` for the card selectors.
+    """
+
+    def __init__(self, fields, cards=(), limit=None, reorderable_cards=0):
+        self.fields = fields
+        self.cards = list(cards)
+        self.limit = limit
+        self.reorderable_cards = reorderable_cards
+
+    def reordered(self, orders):
+        """Copy with chains permuted; `orders` maps field names (and "cards") to index orders"""
+        fields = {name: field.reordered(orders[name]) if name in orders else field
+                  for name, field in self.fields.items()}
+        cards = [self.cards[i] for i in orders["cards"]] if "cards" in orders else self.cards
+        return ExtractionSpec(fields, cards, self.limit, self.reorderable_cards)
+
+    def to_js(self):
+        return {
+            "cards": self.cards,
+            "limit": self.limit,
+            "fields": {name: field.to_js() for name, field in self.fields.items()},
+        }
+
+
+async def extract(page, spec) -> list:
+    """Resolve every chain in `spec` in one round trip.
+
+    Returns one plain dict per card (or a single-item list for document-level specs)
+    mapping field name to its text/attribute value or None. `_hits` records which
+    entry of each chain matched (-1 for none).
+    """
+    return await page.evaluate(_EXTRACT_JS, spec.to_js())
+
+
+async def extract_first(page, spec):
+    """Like extract() but return only the first card, or None if there were none"""
+    rows = await extract(page, spec)
+    return rows[0] if rows else None
@@ -4,19 +4,5 @@
 
 # if you wish to contirbute to this file, please add your name and phone number in the comments below
 
-import re
-
-def extract_model_number(product_name: str) -> str:
-
-    model_match = re.search(r'-\s*([A-Z0-9]+[A-Z0-9]*(?:[._-][A-Z0-9]+)*)(?:\s|$)', product_name)
-    
-    if not model_match:
-        model_match = re.search(r'(\d+[A-Z]+\d+[A-Z0-9]*)(?:\s|$)', product_name)
-        
-    if not model_match:
-        model_match = re.search(r'([A-Z]+\d+[A-Z0-9]*)(?:\s|$)', product_name)
-        
-    if model_match:
-        return model_match.group(1)
-    
-    return product_name 
+# The extraction itself lives in utils.model_numbers, with brand grammars and a memo
+from utils.model_numbers import extract_model_number  # noqa: F401
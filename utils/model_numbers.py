@@ -0,0 +1,141 @@
+import re
+import time
+from functools import lru_cache
+from typing import NamedTuple
+
+
+class ModelNumber(NamedTuple):
+    brand: str            # canonical brand if known ("Samsung"), else the name's first word
+    model: str            # the model number as written in the name, or None if none was found
+    canonical: str        # upper case, no separators: the form cache keys use
+    aliases: tuple        # other canonical forms retailers list it under (without the region suffix)
+
+
+# Brand grammars, tried before the generic patterns. `base` is the model proper and
+# `region` the market suffix some retailers drop.
+BRAND_GRAMMARS = {
+    # QN65Q60DAFXZC, UN75DU7100FXZC; FXZC is Canada, FXZA the US
+    "Samsung": re.compile(r"\b(?P<base>(?:QN|UN)\d{2}[A-Z0-9]*?)(?P<region>FXZC|FXZA)?\b"),
+    # OLED65C4PUA, 50UT7570PUB, 55QNED80TUC
+    "LG": re.compile(
+        r"\b(?P<base>OLED\d{2}[A-Z]\d[A-Z]?|\d{2}(?:UT|UQ|UR|NANO|QNED)\d{2,4}[A-Z]?)"
+        r"(?P<region>PUA|PUB|PUC|TUA|TUC|AUA|AUB|PSA)?\b"
+    ),
+    # 50A68N, 32A4KV, 65U8N
+    "Hisense": re.compile(r"\b(?P<base>\d{2}(?:A|U|H|Q|QD|UX)\d{1,2}[A-Z0-9]*)\b"),
+    # KD75X77L, KD-75X77L, XR65A80L, K-65XR70
+    "Sony": re.compile(r"\b(?P<base>(?:KD|XR|K)-?\d{2}[A-Z]{1,2}\d{2,3}[A-Z]?)\b"),
+}
+
+_BRANDS = {brand.upper(): brand for brand in BRAND_GRAMMARS}
+
+# The original extractor, for brands without a grammar: the token after a hyphen, then
+# number+letter+number, then letter+number
+GENERIC_PATTERNS = (
+    re.compile(r"-\s*([A-Z0-9]+[A-Z0-9]*(?:[._-][A-Z0-9]+)*)(?:\s|$)"),
+    re.compile(r"(\d+[A-Z]+\d+[A-Z0-9]*)(?:\s|$)"),
+    re.compile(r"([A-Z]+\d+[A-Z0-9]*)(?:\s|$)"),
+)
+
+_SEPARATORS = re.compile(r"[\s._-]")
+_FIRST_WORD = re.compile(r"^([A-Za-z]+)")
+
+MEMO_SIZE = 65536
+
+
+def normalize_model(model_number: str) -> str:
+    """Canonical form of a model number for cache keys: upper case, no separators"""
+    return _SEPARATORS.sub("", (model_number or "").upper())
+
+
+def _grammar_match(grammar, product_name):
+    # The full model outlasts series names in the same title ("QN85D - QN65QN85DBFXZC")
+    best = None
+    for match in grammar.finditer(product_name):
+        if best is None or len(match.group(0)) >= len(best.group(0)):
+            best = match
+    return best
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def parse_model_number(product_name: str) -> ModelNumber:
+    """Brand, model number, canonical form and aliases of a product name; memoized"""
+    product_name = product_name or ""
+    first_word = _FIRST_WORD.match(product_name)
+    first_word = first_word.group(1) if first_word else ""
+    brand = _BRANDS.get(first_word.upper())
+
+    # Other brands get the generic patterns, except for a bare model number
+    if brand:
+        grammars = [brand]
+    else:
+        grammars = list(BRAND_GRAMMARS) if len(product_name.split()) == 1 else []
+    for name in grammars:
+        match = _grammar_match(BRAND_GRAMMARS[name], product_name)
+        if match:
+            canonical = normalize_model(match.group(0))
+            aliases = tuple({normalize_model(match.group("base"))} - {canonical})
+            return ModelNumber(brand or name, match.group(0), canonical, aliases)
+
+    for pattern in GENERIC_PATTERNS:
+        match = pattern.search(product_name)
+        if match:
+            return ModelNumber(brand or first_word, match.group(1), normalize_model(match.group(1)), ())
+    return ModelNumber(brand or first_word, None, normalize_model(product_name), ())
+
+
+def parse_model_numbers(product_names):
+    """parse_model_number for a whole catalog: {product name: ModelNumber}, each name parsed once"""
+    return {name: parse_model_number(name) for name in dict.fromkeys(product_names)}
+
+
+def extract_model_number(product_name: str) -> str:
+    """The model number in a product name, or the name itself if none is found"""
+    return parse_model_number(product_name).model or product_name
+
+
+def benchmark(product_names, rounds=20, retailers=11):
+    """Seconds per product to get its model number for every retailer.
+
+    "per_scraper" is the old way: each retailer's own copy of the extractor runs
+    re.search on the pattern strings. "cold" parses the catalog once with an empty
+    memo, "memoized" with a warm one.
+    """
+    def per_scraper(name):
+        for pattern in GENERIC_PATTERNS:
+            match = re.search(pattern.pattern, name)
+            if match:
+                return match.group(1)
+        return name
+
+    names = list(product_names)
+    timings = {}
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for name in names:
+            for _ in range(retailers):
+                per_scraper(name)
+    timings["per_scraper"] = (time.perf_counter() - start) / (rounds * len(names))
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        parse_model_number.cache_clear()
+        parse_model_numbers(names)
+    timings["cold"] = (time.perf_counter() - start) / (rounds * len(names))
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        parse_model_numbers(names)
+    timings["memoized"] = (time.perf_counter() - start) / (rounds * len(names))
+    return timings
+
+
+if __name__ == "__main__":
+    from testdata import test_data
+
+    names = [product["name"] for product in test_data]
+    for name, parsed in parse_model_numbers(names).items():
+        print(f"{parsed.brand:8} {parsed.model or '-':16} {parsed.canonical:16} {', '.join(parsed.aliases)}")
+    print()
+    for label, seconds in benchmark(names).items():
+        print(f"{label:12} {seconds * 1e6:8.2f} µs/product")
@@ -0,0 +1,59 @@
+import asyncio
+
+
+class Readiness:
+    """What "ready" means for one kind of page at a retailer.
+
+    The page is ready as soon as any of `selectors` is attached, or a response whose
+    URL contains `response_url` completes. `timeout` (ms) is the upper bound and
+    replaces the fixed sleeps the scrapers used to take unconditionally.
+    """
+
+    def __init__(self, selectors=(), response_url=None, timeout=5000):
+        self.selectors = tuple(selectors)
+        self.response_url = response_url
+        self.timeout = timeout
+
+
+def expect_response(page, readiness):
+    """Start listening for the readiness response; call before navigating"""
+    if not readiness.response_url:
+        return None
+    return asyncio.ensure_future(page.wait_for_event(
+        "response",
+        predicate=lambda response: readiness.response_url in response.url,
+        timeout=readiness.timeout,
+    ))
+
+
+async def wait_until_ready(page, readiness, response_waiter=None) -> bool:
+    """Wait until any ready condition holds or the timeout passes.
+
+    Returns True if the page became ready, False if we gave up at the upper bound.
+    Callers carry on either way, exactly as they did after the old fixed sleep.
+    """
+    waiters = []
+    if readiness.selectors:
+        waiters.append(asyncio.ensure_future(page.wait_for_selector(
+            ", ".join(readiness.selectors), state="attached", timeout=readiness.timeout
+        )))
+    if response_waiter is not None:
+        waiters.append(response_waiter)
+    if not waiters:
+        await page.wait_for_timeout(readiness.timeout)
+        return False
+
+    ready = False
+    pending = set(waiters)
+    try:
+        while pending and not ready:
+            done, pending = await asyncio.wait(pending, timeout=readiness.timeout / 1000,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            ready = any(not task.cancelled() and task.exception() is None for task in done)
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    return ready
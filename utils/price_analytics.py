@@ -0,0 +1,215 @@
+import json
+import sqlite3
+import time
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for analytics; scraping works without it
+    np = None
+
+from utils.price_history import DAY, DEFAULT_HISTORY_PATH
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("price analytics need numpy: pip install numpy")
+
+
+class PriceMatrix:
+    """Prices as a products x retailers x time float32 array, NaN where nothing was found.
+
+    Time is bucketed (daily by default) and each cell holds the lowest price seen in
+    its bucket. Every statistic below is a vectorized reduction over the retailer
+    axis, so a year of daily runs over 100k products stays in numpy the whole way. Pass
+    `mmap_path` when building from history to back the array with a .npy file instead
+    of RAM.
+    """
+
+    def __init__(self, products, retailers, times, prices):
+        _require_numpy()
+        self.products = list(products)
+        self.retailers = list(retailers)
+        self.times = np.asarray(times, dtype=np.int64)
+        self.prices = prices
+
+    @classmethod
+    def from_comparisons(cls, comparisons, retailers=None, ts=None):
+        """A single time slice from a run's comparisons dict"""
+        _require_numpy()
+        products = list(comparisons)
+        if retailers is None:
+            retailers = list(dict.fromkeys(r for info in comparisons.values() for r in info["results"]))
+        column = {retailer: j for j, retailer in enumerate(retailers)}
+        prices = np.full((len(products), len(retailers), 1), np.nan, dtype=np.float32)
+        for i, product in enumerate(products):
+            for retailer, entry in comparisons[product]["results"].items():
+                if entry.get("found") and retailer in column:
+                    prices[i, column[retailer], 0] = entry["result"]["price"]
+        return cls(products, retailers, [int(time.time() if ts is None else ts)], prices)
+
+    @classmethod
+    def from_history(cls, path=DEFAULT_HISTORY_PATH, since=None, until=None, bucket=DAY, retailers=None,
+                     mmap_path=None, chunk_size=500_000):
+        """Load a PriceHistory database, one time slice per `bucket` seconds"""
+        _require_numpy()
+        db = sqlite3.connect(path)
+        try:
+            since = since or 0
+            until = until or 2 ** 62
+            first, last = db.execute(
+                "SELECT MIN(ts), MAX(ts) FROM price_points WHERE ts >= ? AND ts <= ?", (since, until)
+            ).fetchone()
+            if first is None:
+                return cls([], retailers or [], [], np.empty((0, len(retailers or []), 0), dtype=np.float32))
+            first = first // bucket * bucket
+            times = np.arange(first, last // bucket * bucket + bucket, bucket, dtype=np.int64)
+
+            # Let SQLite number the products and retailers so rows arrive as plain integers
+            db.execute("CREATE TEMP TABLE products AS SELECT DISTINCT model FROM price_points"
+                       " WHERE ts >= ? AND ts <= ? ORDER BY model", (since, until))
+            products = [row[0] for row in db.execute("SELECT model FROM products ORDER BY rowid")]
+            if retailers is None:
+                retailers = [row[0] for row in db.execute(
+                    "SELECT DISTINCT retailer FROM price_points WHERE ts >= ? AND ts <= ? ORDER BY retailer",
+                    (since, until))]
+            db.execute("CREATE TEMP TABLE retailers (name TEXT PRIMARY KEY, idx INTEGER)")
+            db.executemany("INSERT INTO retailers VALUES (?, ?)", [(r, j) for j, r in enumerate(retailers)])
+
+            shape = (len(products), len(retailers), len(times))
+            if mmap_path:
+                prices = np.lib.format.open_memmap(mmap_path, mode="w+", dtype=np.float32, shape=shape)
+                prices[:] = np.nan
+            else:
+                prices = np.full(shape, np.nan, dtype=np.float32)
+
+            cursor = db.execute(
+                "SELECT p.rowid - 1, r.idx, (pp.ts - ?) / ?, MIN(pp.price)"
+                " FROM price_points pp"
+                " JOIN products p ON p.model = pp.model"
+                " JOIN retailers r ON r.name = pp.retailer"
+                " WHERE pp.ts >= ? AND pp.ts <= ?"
+                " GROUP BY pp.model, pp.retailer, (pp.ts - ?) / ?",
+                (first, bucket, since, until, first, bucket),
+            )
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                block = np.array(rows, dtype=np.float64)
+                index = block[:, :3].astype(np.int64)
+                prices[index[:, 0], index[:, 1], index[:, 2]] = block[:, 3]
+            if mmap_path:
+                prices.flush()
+        finally:
+            db.close()
+        return cls(products, retailers, times, prices)
+
+    def save(self, path):
+        """Write the array to `path` (.npy) and its labels next to it (.json)"""
+        np.save(path, self.prices)
+        with open(f"{path}.json", "w") as f:
+            json.dump({"products": self.products, "retailers": self.retailers, "times": self.times.tolist()}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Read a matrix written by save(), memory-mapped unless mmap=False"""
+        _require_numpy()
+        with open(f"{path}.json") as f:
+            labels = json.load(f)
+        prices = np.load(path, mmap_mode="r" if mmap else None)
+        return cls(labels["products"], labels["retailers"], labels["times"], prices)
+
+    def _slice(self, t):
+        return np.asarray(self.prices[:, :, t], dtype=np.float32)
+
+    def best(self, t=-1):
+        """(best price, best retailer index) per product at time index t; NaN / -1 if none"""
+        prices = self._slice(t)
+        filled = np.where(np.isnan(prices), np.inf, prices)
+        retailer = np.argmin(filled, axis=1) if filled.shape[1] else np.zeros(len(prices), dtype=np.int64)
+        price = filled[np.arange(len(filled)), retailer] if filled.shape[1] else np.full(len(prices), np.inf)
+        found = np.isfinite(price)
+        return np.where(found, price, np.nan), np.where(found, retailer, -1)
+
+    def second_best(self, t=-1):
+        """Second lowest price per product at time index t; NaN with fewer than two offers"""
+        prices = self._slice(t)
+        if prices.shape[1] < 2:
+            return np.full(len(prices), np.nan, dtype=np.float32)
+        filled = np.where(np.isnan(prices), np.inf, prices)
+        second = np.partition(filled, 1, axis=1)[:, 1]
+        return np.where(np.isfinite(second), second, np.nan)
+
+    def spread(self, t=-1):
+        """Highest minus lowest price per product at time index t; NaN if none found"""
+        prices = self._slice(t)
+        found = ~np.isnan(prices)
+        high = np.where(found, prices, -np.inf).max(axis=1, initial=-np.inf)
+        low = np.where(found, prices, np.inf).min(axis=1, initial=np.inf)
+        return np.where(found.any(axis=1), high - low, np.nan)
+
+    def win_rates(self, chunk_size=10_000):
+        """Share of (product, time) slices with any price where each retailer was cheapest"""
+        wins = np.zeros(len(self.retailers), dtype=np.int64)
+        total = 0
+        # A block of products at a time, so a memory-mapped year never has to fit in RAM
+        for start in range(0, len(self.products), chunk_size):
+            block = np.asarray(self.prices[start:start + chunk_size], dtype=np.float32)
+            filled = np.where(np.isnan(block), np.inf, block)
+            winner = np.argmin(filled, axis=1)                 # (products, times)
+            contested = np.isfinite(filled.min(axis=1))
+            wins += np.bincount(winner[contested], minlength=len(self.retailers))
+            total += int(contested.sum())
+        return {retailer: (float(wins[j] / total) if total else 0.0) for j, retailer in enumerate(self.retailers)}
+
+    def top_drops(self, k=10, lookback=1):
+        """The k biggest price drops between time index -1-lookback and the latest one.
+
+        Returns [(product, retailer, old price, new price, drop)], largest drop first.
+        """
+        if len(self.times) <= lookback:
+            return []
+        old = self._slice(-1 - lookback)
+        new = self._slice(-1)
+        drop = old - new
+        drop = np.where(np.isnan(drop), -np.inf, drop).ravel()
+        k = min(k, int(np.isfinite(drop).sum()), drop.size)
+        if k <= 0:
+            return []
+        top = np.argpartition(-drop, k - 1)[:k]
+        top = top[np.argsort(-drop[top])]
+        drops = []
+        for flat in top:
+            if drop[flat] <= 0:
+                break
+            i, j = divmod(int(flat), len(self.retailers))
+            drops.append((self.products[i], self.retailers[j], float(old[i, j]), float(new[i, j]), float(drop[flat])))
+        return drops
+
+
+def main():
+    matrix = PriceMatrix.from_history(since=int(time.time()) - 365 * DAY)
+    if not matrix.products:
+        print("No price history yet")
+        return
+
+    best, retailer = matrix.best()
+    second = matrix.second_best()
+    spread = matrix.spread()
+    print(f"{len(matrix.products)} products x {len(matrix.retailers)} retailers x {len(matrix.times)} days\n")
+    for i, product in enumerate(matrix.products):
+        if retailer[i] >= 0:
+            print(f"{product}: best ${best[i]:.2f} at {matrix.retailers[retailer[i]]}, "
+                  f"second ${second[i]:.2f}, spread ${spread[i]:.2f}")
+
+    print("\nWin rates:")
+    for name, rate in sorted(matrix.win_rates().items(), key=lambda item: -item[1]):
+        print(f"  - {name}: {rate:.1%}")
+
+    print("\nBiggest drops since the previous day:")
+    for product, name, old, new, drop in matrix.top_drops():
+        print(f"  - {product} at {name}: ${old:.2f} -> ${new:.2f} (-${drop:.2f})")
+
+
+if __name__ == "__main__":
+    main()
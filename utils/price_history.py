@@ -0,0 +1,129 @@
+import sqlite3
+import time
+from datetime import datetime
+
+from utils.result_cache import cache_key, normalize_model
+
+
+DEFAULT_HISTORY_PATH = "price_history.sqlite3"
+
+# Points older than this are downsampled to one per model, retailer and day
+DEFAULT_COMPACT_AFTER_DAYS = 90
+DEFAULT_COMPACT_INTERVAL = 24 * 3600
+
+DAY = 24 * 3600
+
+
+class PriceHistory:
+    """Append-only store of every price a run found.
+
+    One row per (model, retailer, timestamp), with model numbers normalized the same
+    way as the result cache. The unique (model, retailer, ts) index serves the
+    per-retailer series and makes re-recording a kept result a no-op. The covering
+    (model, ts, retailer, price) index serves "cheapest over a window" queries.
+    compact() is the one exception to append-only: it collapses old points to a
+    daily low.
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS price_points ("
+            " model TEXT NOT NULL,"
+            " retailer TEXT NOT NULL,"
+            " ts INTEGER NOT NULL,"
+            " price REAL NOT NULL,"
+            " url TEXT,"
+            " product_name TEXT,"
+            " resolution INTEGER NOT NULL DEFAULT 0);"
+            "CREATE UNIQUE INDEX IF NOT EXISTS price_points_series ON price_points (model, retailer, ts);"
+            "CREATE INDEX IF NOT EXISTS price_points_window ON price_points (model, ts, retailer, price);"
+            "CREATE INDEX IF NOT EXISTS price_points_ts ON price_points (ts);"
+            "CREATE TABLE IF NOT EXISTS history_meta (key TEXT PRIMARY KEY, value REAL);"
+        )
+        self._db.commit()
+
+    def record(self, points):
+        """Append (model, retailer, ts, price, url, product_name) tuples; returns rows added"""
+        before = self._db.total_changes
+        self._db.executemany(
+            "INSERT OR IGNORE INTO price_points (model, retailer, ts, price, url, product_name)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            points,
+        )
+        self._db.commit()
+        return self._db.total_changes - before
+
+    def record_comparisons(self, comparisons, models=None):
+        """Append every found, live-scraped price of a run's comparisons.
+
+        `models` maps product names to the ModelNumbers already parsed for the run.
+        """
+        models = models or {}
+        points = []
+        for product, info in comparisons.items():
+            for retailer, entry in info["results"].items():
+                # Cached hits re-report a price we already recorded when it was scraped
+                if not entry.get("found") or entry.get("cached"):
+                    continue
+                scraped_at = entry.get("scraped_at")
+                ts = int(datetime.fromisoformat(scraped_at).timestamp()) if scraped_at else int(time.time())
+                _, model = cache_key(retailer, product, models.get(product))
+                points.append((model, retailer, ts, entry["result"]["price"], entry["result"].get("url"), product))
+        return self.record(points)
+
+    def series(self, model, retailer, since=None, until=None):
+        """[(ts, price)] for one model at one retailer, oldest first"""
+        model = normalize_model(model)
+        return self._db.execute(
+            "SELECT ts, price FROM price_points WHERE model = ? AND retailer = ? AND ts >= ? AND ts <= ? ORDER BY ts",
+            (model, retailer, since or 0, until or 2 ** 62),
+        ).fetchall()
+
+    def cheapest_retailer(self, model, days=30, now=None):
+        """(retailer, lowest price, ts) over the last `days` days, or None"""
+        model = normalize_model(model)
+        since = int((now or time.time()) - days * DAY)
+        return self._db.execute(
+            "SELECT retailer, price, ts FROM price_points WHERE model = ? AND ts >= ? ORDER BY price, ts DESC LIMIT 1",
+            (model, since),
+        ).fetchone()
+
+    def compact(self, older_than_days=DEFAULT_COMPACT_AFTER_DAYS, now=None):
+        """Downsample raw points older than the cutoff to each day's lowest price"""
+        now = now or time.time()
+        cutoff = int(now - older_than_days * DAY) // DAY * DAY
+        with self._db:
+            self._db.execute(
+                "CREATE TEMP TABLE daily AS"
+                " SELECT model, retailer, ts / ? * ? AS day, MIN(price) AS price, url, product_name"
+                " FROM price_points WHERE resolution = 0 AND ts < ?"
+                " GROUP BY model, retailer, day",
+                (DAY, DAY, cutoff),
+            )
+            removed = self._db.execute(
+                "DELETE FROM price_points WHERE resolution = 0 AND ts < ?", (cutoff,)
+            ).rowcount
+            self._db.execute(
+                "INSERT OR REPLACE INTO price_points (model, retailer, ts, price, url, product_name, resolution)"
+                " SELECT model, retailer, day, price, url, product_name, ? FROM daily",
+                (DAY,),
+            )
+            added = self._db.execute("SELECT COUNT(*) FROM daily").fetchone()[0]
+            self._db.execute("DROP TABLE daily")
+            self._db.execute(
+                "INSERT OR REPLACE INTO history_meta (key, value) VALUES ('last_compacted', ?)", (now,)
+            )
+        return removed - added
+
+    def compact_if_due(self, interval=DEFAULT_COMPACT_INTERVAL, **kwargs):
+        """Run compact() if it hasn't run in the last `interval` seconds"""
+        row = self._db.execute("SELECT value FROM history_meta WHERE key = 'last_compacted'").fetchone()
+        if row is not None and time.time() - row[0] < interval:
+            return 0
+        return self.compact(**kwargs)
+
+    def close(self):
+        self._db.close()
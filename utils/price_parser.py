@@ -0,0 +1,185 @@
+import re
+from typing import NamedTuple
+
+
+class ParsedPrice(NamedTuple):
+    cents: int            # the selling price
+    start: int            # span of the chosen amount in the text
+    end: int
+    kind: str             # "price", "now", "was" (only a regular price was shown) or "range"
+    was_cents: int = None     # the crossed-out regular price, if the text had one
+    high_cents: int = None    # top of a "$999 - $1,299" range
+
+
+# One amount: English (1,299.99) or French (1 299,99, 1.299,99) grouping, optional $ / CAD on
+# either side. A French amount always takes the marker after it, even when another
+# number follows ("649,99 $ 799,99 $"); an English one only when no number follows.
+# Bare integers only count when nothing in the text looks more like a price.
+_AMOUNT = re.compile(r"""
+    (?P<pre>(?:C?\$|CAD)\s?)?
+    (?<![\d.,])                                        # never start inside a longer number
+    (?P<number>
+        \d{1,3}(?:,\d{3})+(?:\.\d{1,2})?                # 1,299.99  1,299
+      | (?P<french>
+            \d{1,3}(?:\.\d{3})+,\d{1,2}                # 1.299,99
+          | \d{1,3}(?:[ \u00a0\u202f]\d{3})+(?:,\d{1,2})?   # 1 299,99  1 299 (space, nbsp or narrow nbsp)
+          | \d+,\d{1,2}                                # 373,74
+        )
+      | \d+(?:\.\d{1,2})?                              # 1299.99  899
+    )
+    (?![\d.,]?\d|\s?%)
+    (?P<post>(?(french)\s?(?:\$|CAD)|\s?(?:\$|CAD)(?!\s?\d)))?
+""", re.VERBOSE | re.IGNORECASE)
+
+_WAS = re.compile(r"\b(?:was|reg(?:ular)?(?: price)?|compare at|list price|msrp|avant|était|rég|"
+                  r"prix (?:régulier|courant|ordinaire)|ordinaire)\b\.?\s*:?\s*$", re.IGNORECASE)
+_NOW = re.compile(r"\b(?:now|sale(?: price)?|special|our price|maintenant|prix spécial|en solde|"
+                  r"notre prix|promo)\b\s*:?\s*$", re.IGNORECASE)
+_SAVE = re.compile(r"\b(?:save|you save|économisez|economisez|rabais)\b\s*:?\s*$", re.IGNORECASE)
+# What may sit between the two prices of a stacked card once its savings amount is cut out
+_SAVE_GAP = re.compile(r"^(?:\s|:|\bsave\b|\byou save\b|\béconomisez\b|\beconomisez\b|\brabais\b|"
+                       r"\boff\b|\bde rabais\b)*$", re.IGNORECASE)
+_FEE_LABEL = (r"(?:eco[\s-]?fees?|éco[\s-]?frais|[eé]cofrais|\behf\b|environmental (?:handling )?fee|"
+              r"recycling fee|frais environnementaux)")
+# A fee label only claims the amount right after it ("EHF $4.50", "éco-frais : 5,00 $")
+# or, when no amount follows it, the one right before it ("$4.50 eco fee"); never one
+# across a "+" or a parenthesis
+_FEE_BEFORE = re.compile(_FEE_LABEL + r"\s*[:=-]?\s*$", re.IGNORECASE)
+_FEE_AFTER = re.compile(r"^\s*" + _FEE_LABEL, re.IGNORECASE)
+_PER_MONTH = re.compile(r"^\s*(?:/\s?mo\b|/\s?month|per month|a month|/\s?mois|par mois)", re.IGNORECASE)
+_OFF = re.compile(r"^\s*(?:off\b|de rabais)", re.IGNORECASE)
+_DECIMALS = re.compile(r"[.,](\d{1,2})$")
+# A plain machine number (data attributes, schema.org offers): no grouping, any precision
+_MACHINE_NUMBER = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*$")
+_RANGE = re.compile(r"^\s*(?:-|–|—|to|à)\s*$", re.IGNORECASE)
+
+# How far around an amount a label is looked for
+_CONTEXT = 30
+
+
+def _cents(number: str) -> int:
+    """Integer cents of a matched number, without going through float"""
+    match = _DECIMALS.search(number)
+    whole = number[:match.start()] if match else number
+    fraction = match.group(1).ljust(2, "0") if match else "00"
+    return int(re.sub(r"\D", "", whole) or "0") * 100 + int(fraction)
+
+
+def _amounts(text):
+    """(cents, start, end, kind, money rank) for every amount in text, in order.
+
+    The rank is 2 for an amount with a $ or CAD marker, 1 for a bare decimal and
+    0 for a bare integer.
+    """
+    amounts = []
+    previous_end = 0
+    matches = list(_AMOUNT.finditer(text))
+    for i, match in enumerate(matches):
+        before = text[max(previous_end, match.start() - _CONTEXT):match.start()]
+        next_start = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        after = text[match.end():min(next_start, match.end() + _CONTEXT)]
+        number = match.group("number")
+        rank = 2 if match.group("pre") or match.group("post") else 1 if _DECIMALS.search(number) else 0
+
+        label_after = _FEE_AFTER.search(after) and not (
+            i + 1 < len(matches) and _FEE_BEFORE.search(text[match.end():next_start]))
+        if _FEE_BEFORE.search(before) or label_after:
+            kind = "fee"
+        elif _PER_MONTH.search(after):
+            kind = "monthly"
+        elif _SAVE.search(before) or _OFF.search(after):
+            kind = "save"
+        elif _WAS.search(before):
+            kind = "was"
+        elif _NOW.search(before):
+            kind = "now"
+        elif amounts and amounts[-1][3] == "price" and _RANGE.match(before):
+            kind = "range_high"
+        else:
+            kind = "price"
+        amounts.append((_cents(number), match.start(), match.end(), kind, rank))
+        previous_end = match.end()
+    return amounts
+
+
+def parse_price(text, first=False):
+    """The selling price in a price element's text, or None.
+
+    Handles "$1,299.99", "1 299,99 $", "was $1,299.99 now $999.99", unlabeled
+    strike-through pairs (two adjacent amounts; the lower one wins), "$999 - $1,299"
+    ranges (the low end) and ignores eco fees, savings and monthly payments. Otherwise
+    the first amount with a currency marker wins, then the first bare decimal, so
+    ratings and other numbers ahead of the price are skipped. With `first`, for text
+    wider than one price element (a whole page), pairs aren't looked for.
+    """
+    if text is None:
+        return None
+    text = str(text)
+    amounts = _amounts(text)
+    if not amounts:
+        return None
+
+    was = next((a for a in amounts if a[3] == "was"), None)
+    was_cents = was[0] if was else None
+    now = next((a for a in amounts if a[3] == "now"), None)
+    if now:
+        return ParsedPrice(now[0], now[1], now[2], "now", was_cents)
+
+    prices = [a for a in amounts if a[3] == "price"]
+    if prices:
+        rank = max(a[4] for a in prices)
+        candidates = [a for a in prices if a[4] == rank]
+        chosen = candidates[0]
+        index = amounts.index(chosen)
+        following = amounts[index + 1] if index + 1 < len(amounts) else None
+        if following and following[3] == "range_high":
+            return ParsedPrice(chosen[0], chosen[1], following[2], "range", was_cents, following[0])
+        # A "Save $300" line between the two prices of a stacked card is skipped over
+        savings = []
+        while following and following[3] == "save":
+            savings.append(following)
+            index += 1
+            following = amounts[index + 1] if index + 1 < len(amounts) else None
+        gap = text[chosen[2]:following[1]] if following else ""
+        for saving in reversed(savings):
+            gap = gap[:saving[1] - chosen[2]] + gap[saving[2] - chosen[2]:]
+        if (not first and was_cents is None and rank and len(candidates) > 1 and following is candidates[1]
+                and _SAVE_GAP.match(gap) and (savings or not gap.strip())):
+            # Unlabeled pair of amounts: the higher one is the crossed-out regular price
+            low, high = sorted((chosen, following), key=lambda a: a[0])
+            if low[0] != high[0]:
+                return ParsedPrice(low[0], low[1], low[2], "price", high[0])
+        return ParsedPrice(chosen[0], chosen[1], chosen[2], "price", was_cents)
+
+    if was:
+        return ParsedPrice(was[0], was[1], was[2], "was")
+    return None
+
+
+def parse_prices(texts):
+    """parse_price for many strings at once, e.g. a whole archive; repeated strings are parsed once"""
+    seen = {}
+    results = []
+    for text in texts:
+        if text not in seen:
+            seen[text] = parse_price(text)
+        results.append(seen[text])
+    return results
+
+
+def parse_price_value(value, first=False):
+    """Dollars as a float from a number or price text, or None; what scrapers store in result["price"].
+
+    "1299.000" style values are read as plain decimals rather than through the
+    thousands-grouping rules, and a zero price is never returned.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value > 0 else None
+    machine = _MACHINE_NUMBER.match(str(value))
+    if machine:
+        price = round(float(machine.group(1)), 2)
+        return price if price > 0 else None
+    parsed = parse_price(value, first)
+    return parsed.cents / 100 if parsed and parsed.cents > 0 else None
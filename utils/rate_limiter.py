@@ -0,0 +1,90 @@
+import asyncio
+import random
+
+from utils.tracing import span
+
+
+class RateLimit:
+    """Pacing settings for one retailer"""
+
+    def __init__(self, rate=1.0, burst=1, min_interval=0.0, jitter=0.0):
+        self.rate = rate                  # sustained requests per second
+        self.burst = burst                # requests allowed back to back after idling
+        self.min_interval = min_interval  # seconds between any two requests
+        self.jitter = jitter              # random extra delay (seconds) added to each wait
+
+
+DEFAULT_RATE_LIMIT = RateLimit(rate=1.0, burst=3, min_interval=0.25, jitter=0.1)
+
+# Keyed by the retailer names used in price_comparison.SCRAPERS
+RETAILER_RATE_LIMITS = {
+    "Amazon": RateLimit(rate=0.5, burst=2, min_interval=1.0, jitter=0.5),
+    "Best_Buy": RateLimit(rate=0.5, burst=2, min_interval=1.0, jitter=0.5),
+    "Costco": RateLimit(rate=0.5, burst=1, min_interval=1.5, jitter=0.5),
+    # Staples sits behind Cloudflare; this replaces its old random "human-like" sleeps
+    "Staples": RateLimit(rate=0.2, burst=1, min_interval=4.0, jitter=2.0),
+}
+
+
+class TokenBucket:
+    """Token bucket with a minimum spacing between requests.
+
+    Waiters are served in arrival order; the lock is held while sleeping so a burst
+    of tasks hitting the same retailer queues up instead of racing for tokens.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.tokens = float(limit.burst)
+        self._updated = None
+        self._last_request = None
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now):
+        if self._updated is not None:
+            elapsed = now - self._updated
+            self.tokens = min(float(self.limit.burst), self.tokens + elapsed * self.limit.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Wait until a request is allowed, then consume a token"""
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            while True:
+                now = loop.time()
+                self._refill(now)
+                delay = 0.0
+                if self.tokens < 1:
+                    delay = (1 - self.tokens) / self.limit.rate
+                if self._last_request is not None:
+                    delay = max(delay, self._last_request + self.limit.min_interval - now)
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay + random.uniform(0, self.limit.jitter))
+            self.tokens -= 1
+            self._last_request = now
+
+
+_buckets = {}
+
+
+def get_bucket(retailer) -> TokenBucket:
+    """Return the shared bucket for a retailer, creating it from RETAILER_RATE_LIMITS"""
+    bucket = _buckets.get(retailer)
+    if bucket is None:
+        bucket = TokenBucket(RETAILER_RATE_LIMITS.get(retailer, DEFAULT_RATE_LIMIT))
+        _buckets[retailer] = bucket
+    return bucket
+
+
+async def throttle(retailer):
+    """Block until the retailer's rate limit allows another navigation"""
+    await get_bucket(retailer).acquire()
+
+
+async def throttled_goto(page, retailer, url, **kwargs):
+    """page.goto() that first waits for the retailer's rate limit"""
+    with span("throttle"):
+        await throttle(retailer)
+    with span("goto", url=url):
+        return await page.goto(url, **kwargs)
@@ -0,0 +1,99 @@
+from urllib.parse import urlsplit
+
+
+# Resource types we never read from; see playwright Request.resource_type
+DEFAULT_BLOCKED_TYPES = ("image", "media", "font")
+
+# Analytics, ads and session-replay hosts. Matched against the host and its parents.
+DEFAULT_BLOCKED_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "facebook.net",
+    "facebook.com",
+    "bing.com",
+    "hotjar.com",
+    "criteo.com",
+    "criteo.net",
+    "taboola.com",
+    "outbrain.com",
+    "pinterest.com",
+    "tiktok.com",
+    "snapchat.com",
+    "quantserve.com",
+    "scorecardresearch.com",
+    "newrelic.com",
+    "nr-data.net",
+    "fullstory.com",
+    "clarity.ms",
+    "branch.io",
+    "adsrvr.org",
+    "amazon-adsystem.com",
+)
+
+
+def _matches(host, domains):
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+
+class ResourcePolicy:
+    """Decides which requests a scraper's browser context is allowed to make.
+
+    Requests are blocked when their resource type is in `block_types`, or their host
+    is in `block_domains`, unless the host is in `allow_domains`. With
+    `block_third_party` every host outside `first_party_domains` and `allow_domains`
+    is blocked as well.
+    """
+
+    def __init__(self, block_types=DEFAULT_BLOCKED_TYPES, block_domains=DEFAULT_BLOCKED_DOMAINS,
+                 allow_domains=(), block_third_party=False, first_party_domains=()):
+        self.block_types = frozenset(block_types)
+        self.block_domains = tuple(block_domains)
+        self.allow_domains = tuple(allow_domains)
+        self.block_third_party = block_third_party
+        self.first_party_domains = tuple(first_party_domains)
+        self.blocked = 0
+
+    def should_block(self, url, resource_type) -> bool:
+        host = (urlsplit(url).hostname or "").lower()
+        if _matches(host, self.allow_domains):
+            return False
+        if resource_type in self.block_types:
+            return True
+        if _matches(host, self.block_domains):
+            return True
+        if self.block_third_party and host and not _matches(host, self.first_party_domains):
+            return True
+        return False
+
+    async def _handle(self, route):
+        request = route.request
+        if self.should_block(request.url, request.resource_type):
+            self.blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def apply(self, context):
+        """Install the policy on every page of a browser context"""
+        await context.route("**/*", self._handle)
+
+
+# Per-retailer overrides for sites that break without some resource.
+# Keyed by the retailer names used in price_comparison.SCRAPERS.
+RETAILER_RESOURCE_POLICIES = {
+    # Costco saves a full-page debug screenshot of the detail page
+    "Costco": dict(block_types=("media", "font")),
+    # Search results are served by Coveo's hosted platform
+    "Tanguay": dict(allow_domains=("coveo.com", "coveo.ca")),
+    # The Cloudflare challenge has to load for the page to render at all
+    "Staples": dict(allow_domains=("challenges.cloudflare.com",)),
+}
+
+
+def get_resource_policy(retailer) -> ResourcePolicy:
+    """Build a fresh policy for a retailer, applying any override"""
+    return ResourcePolicy(**RETAILER_RESOURCE_POLICIES.get(retailer, {}))
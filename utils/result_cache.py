@@ -0,0 +1,234 @@
+import copy
+import json
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from utils.bloom_filter import BloomFilter
+from utils.model_numbers import normalize_model, parse_model_number
+
+
+DEFAULT_CACHE_PATH = "price_cache.sqlite3"
+
+# Seconds a found price stays fresh; retailers not listed get DEFAULT_CACHE_TTL
+DEFAULT_CACHE_TTL = 6 * 3600
+RETAILER_CACHE_TTLS = {
+    # Marketplace prices move several times a day
+    "Amazon": 2 * 3600,
+    "Best_Buy": 4 * 3600,
+    # Warehouse and brand-store prices change with weekly flyers
+    "Costco": 24 * 3600,
+    "LG": 24 * 3600,
+    "Samsung": 24 * 3600,
+}
+
+# Seconds a "not carried" outcome is trusted. Shorter than the price TTLs because a
+# retailer picking up a model is worth noticing sooner than a price change.
+DEFAULT_NEGATIVE_TTL = 3 * 3600
+
+# Scraper errors meaning the retailer doesn't list the model, as opposed to timeouts,
+# blocks and crashes that say nothing about the catalog. Only an empty search page
+# counts: results that don't match the model, or whose prices didn't parse, are as
+# likely a matching or extraction slip.
+NOT_CARRIED_ERRORS = (
+    "no search results",
+    "no results found",
+    "no product results found",
+)
+
+# Formats retailers use for a sale end date ("2025-06-01", "June 1, 2025", "Jun 1, 2025")
+_SALE_END_FORMATS = ("%Y-%m-%d", "%B %d, %Y", "%b %d, %Y", "%d/%m/%Y")
+
+
+def cache_key(retailer, product_name, model=None):
+    """(retailer, normalized model number) for a product name; `model` is its ModelNumber if already parsed"""
+    return retailer, (model or parse_model_number(product_name)).canonical
+
+
+def is_not_carried(error) -> bool:
+    """Whether a scraper error says the retailer doesn't carry the model"""
+    text = (error or "").lower()
+    return any(marker in text for marker in NOT_CARRIED_ERRORS)
+
+
+def parse_sale_end(sale_end_date):
+    """Timestamp at which a sale ending on `sale_end_date` is over, or None if unparseable"""
+    if not sale_end_date:
+        return None
+    text = str(sale_end_date).strip()
+    text = re.sub(r"^(sale\s+)?ends?:?\s*", "", text, flags=re.IGNORECASE)
+    text = text[:10] if re.match(r"\d{4}-\d{2}-\d{2}T", text) else text
+    for fmt in _SALE_END_FORMATS:
+        try:
+            day = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        # The sale price holds through the whole end day
+        return (day + timedelta(days=1)).timestamp()
+    return None
+
+
+def is_fresh_entry(retailer, entry, now=None, ttls=None):
+    """Whether a comparison result from an earlier run can be kept without re-scraping.
+
+    Found prices stay fresh for the retailer's TTL and never past their sale end date;
+    "not carried" outcomes for DEFAULT_NEGATIVE_TTL. Timeouts, crashes and entries
+    without a scraped_at timestamp are always stale.
+    """
+    ttls = RETAILER_CACHE_TTLS if ttls is None else ttls
+    now = time.time() if now is None else now
+    try:
+        scraped_at = datetime.fromisoformat(entry["scraped_at"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return False
+    age = now - scraped_at
+
+    if entry.get("found"):
+        sale_end = parse_sale_end(entry.get("result", {}).get("price_validity"))
+        if sale_end is not None and sale_end <= now:
+            return False
+        return age < ttls.get(retailer, DEFAULT_CACHE_TTL)
+    if is_not_carried(entry.get("error")):
+        return age < DEFAULT_NEGATIVE_TTL
+    return False
+
+
+class ResultCache:
+    """Two-tier cache of comparison results keyed by (retailer, normalized model).
+
+    An in-memory LRU of at most `memory_size` entries sits in front of a SQLite table
+    at `path`, so a run reuses anything a previous run found while it is still fresh.
+    Each entry expires after its retailer's TTL, or earlier when the retailer reported
+    a sale end date. Several processes may share one database file.
+
+    Pairs a retailer is known not to carry go in a separate negative table with the
+    shorter `negative_ttl`. A Bloom filter of every negative key answers the common
+    "not known" case for large catalogs without touching SQLite.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, memory_size=1024, ttls=None, default_ttl=DEFAULT_CACHE_TTL,
+                 negative_ttl=DEFAULT_NEGATIVE_TTL, negative_capacity=100_000):
+        self.path = path
+        self.memory_size = memory_size
+        self.ttls = RETAILER_CACHE_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self._memory = OrderedDict()  # key -> (expires_at, stored_at, entry)
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " retailer TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " entry TEXT NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (retailer, model))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS not_carried ("
+            " retailer TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " reason TEXT,"
+            " stored_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (retailer, model))"
+        )
+        self._db.commit()
+
+        rows = self._db.execute(
+            "SELECT retailer, model FROM not_carried WHERE expires_at > ?", (time.time(),)
+        ).fetchall()
+        self._negative_keys = BloomFilter(max(negative_capacity, 2 * len(rows)))
+        for retailer, model in rows:
+            self._negative_keys.add(f"{retailer}\0{model}")
+
+    def ttl_for(self, retailer):
+        return self.ttls.get(retailer, self.default_ttl)
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, retailer, model):
+        """Return (entry, stored_at) for a fresh cached result, or None; the entry is the caller's own copy"""
+        key = (retailer, normalize_model(model))
+        now = time.time()
+        value = self._memory.get(key)
+        if value is None:
+            row = self._db.execute(
+                "SELECT expires_at, stored_at, entry FROM results WHERE retailer = ? AND model = ?", key
+            ).fetchone()
+            if row is not None:
+                value = (row[0], row[1], json.loads(row[2]))
+                self._remember(key, value)
+        else:
+            self._memory.move_to_end(key)
+
+        if value is None or value[0] <= now:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return copy.deepcopy(value[2]), value[1]
+
+    def put(self, retailer, model, entry, sale_end_date=None):
+        """Store a result; it expires after the retailer's TTL or when its sale ends"""
+        key = (retailer, normalize_model(model))
+        now = time.time()
+        expires_at = now + self.ttl_for(retailer)
+        sale_end = parse_sale_end(sale_end_date)
+        if sale_end is not None:
+            expires_at = min(expires_at, sale_end)
+        if expires_at <= now:
+            return
+        # A copy, so callers changing their entry afterwards don't change the cached one
+        self._remember(key, (expires_at, now, copy.deepcopy(entry)))
+        self._db.execute(
+            "INSERT OR REPLACE INTO results (retailer, model, entry, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (key[0], key[1], json.dumps(entry), now, expires_at),
+        )
+        self._db.commit()
+
+    def get_not_carried(self, retailer, model):
+        """Return (reason, stored_at) if the retailer is known not to carry the model, else None"""
+        key = (retailer, normalize_model(model))
+        if f"{key[0]}\0{key[1]}" not in self._negative_keys:
+            return None
+        row = self._db.execute(
+            "SELECT reason, stored_at FROM not_carried WHERE retailer = ? AND model = ? AND expires_at > ?",
+            (key[0], key[1], time.time()),
+        ).fetchone()
+        if row is None:
+            return None
+        self.negative_hits += 1
+        return row[0], row[1]
+
+    def put_not_carried(self, retailer, model, reason):
+        """Remember that a retailer doesn't carry a model for negative_ttl seconds"""
+        key = (retailer, normalize_model(model))
+        now = time.time()
+        self._negative_keys.add(f"{key[0]}\0{key[1]}")
+        self._db.execute(
+            "INSERT OR REPLACE INTO not_carried (retailer, model, reason, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (key[0], key[1], reason, now, now + self.negative_ttl),
+        )
+        self._db.commit()
+
+    def purge_expired(self):
+        """Delete expired rows from disk and memory"""
+        now = time.time()
+        self._db.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+        self._db.execute("DELETE FROM not_carried WHERE expires_at <= ?", (now,))
+        self._db.commit()
+        for key in [key for key, value in self._memory.items() if value[0] <= now]:
+            del self._memory[key]
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,131 @@
+import csv
+import glob
+import json
+import os
+import queue
+import threading
+
+
+STREAM_CSV_HEADER = ["Product", "Retailer", "Price", "URL", "Cached", "Scraped At"]
+
+
+class ResultStreamWriter:
+    """Appends each (product, retailer) result to a JSON Lines file and a CSV as it lands.
+
+    write() only puts the record on a queue; a background thread does the file I/O and
+    flushes after every batch, so the event loop never waits on disk and results are
+    readable while the run is still going. Every result becomes one JSON line; found
+    prices also get a CSV row.
+
+    With `durable` every batch is fsynced, which makes the JSONL file a checkpoint
+    journal: a run that dies loses at most the results still in the queue.
+    """
+
+    def __init__(self, jsonl_path, csv_path=None, append=False, durable=False):
+        self.jsonl_path = jsonl_path
+        self.csv_path = csv_path
+        self.append = append
+        self.durable = durable
+        self.written = 0
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def write(self, product, retailer, entry):
+        """Queue one result; safe to call from the event loop"""
+        self._queue.put({"product": product, "retailer": retailer, **entry})
+
+    def close(self):
+        """Write everything still queued and stop the background thread"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _ends_mid_line(self):
+        # A run killed mid-write leaves a torn last line; don't glue the next record to it
+        try:
+            with open(self.jsonl_path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() == 0:
+                    return False
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) != b"\n"
+        except OSError:
+            return False
+
+    def _run(self):
+        mode = "a" if self.append else "w"
+        torn = self.append and self._ends_mid_line()
+        with open(self.jsonl_path, mode) as jsonl_file:
+            if torn:
+                jsonl_file.write("\n")
+            csv_file = open(self.csv_path, mode, newline="") if self.csv_path else None
+            try:
+                csv_writer = csv.writer(csv_file) if csv_file else None
+                if csv_writer and csv_file.tell() == 0:
+                    csv_writer.writerow(STREAM_CSV_HEADER)
+                done = False
+                while not done:
+                    # Block for one record, then drain whatever else is waiting
+                    batch = [self._queue.get()]
+                    while True:
+                        try:
+                            batch.append(self._queue.get_nowait())
+                        except queue.Empty:
+                            break
+                    for record in batch:
+                        if record is None:
+                            done = True
+                            continue
+                        jsonl_file.write(json.dumps(record) + "\n")
+                        if csv_writer and record.get("found"):
+                            csv_writer.writerow([
+                                record["product"],
+                                record["retailer"],
+                                record["result"].get("price"),
+                                record["result"].get("url"),
+                                "✅" if record.get("cached") else "",
+                                record.get("scraped_at", ""),
+                            ])
+                        self.written += 1
+                    jsonl_file.flush()
+                    if self.durable:
+                        os.fsync(jsonl_file.fileno())
+                    if csv_file:
+                        csv_file.flush()
+            finally:
+                if csv_file:
+                    csv_file.close()
+
+
+def journal_part_path(jsonl_path, index):
+    """Journal a worker process keeps for its own shard next to the main one"""
+    return f"{jsonl_path}.part{index}"
+
+
+def journal_parts(jsonl_path):
+    return sorted(glob.glob(glob.escape(jsonl_path) + ".part*"))
+
+
+def read_result_stream(jsonl_path):
+    """Yield the records of a result stream, skipping a torn last line"""
+    try:
+        with open(jsonl_path) as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+    except OSError:
+        return
@@ -0,0 +1,56 @@
+from utils.model_numbers import normalize_model, parse_model_number
+
+
+class SearchHarvest:
+    """Every priced product card seen on a search results page during this run.
+
+    A results page usually lists more than the product searched for: other sizes of
+    the same series, the previous year's model. Scrapers add all of its cards here,
+    keyed by (retailer, normalized model), and get_market_prices answers later
+    products from them instead of loading another search page.
+    """
+
+    def __init__(self):
+        self._cards = {}   # (retailer, model) -> {"model", "title", "price", "url"}
+        self.added = 0
+        self.hits = 0
+
+    def add(self, retailer, text, price, url, title=None):
+        """Keep one card whose `text` (title or SKU) names a model; returns the model, or None"""
+        model = parse_model_number(text or "").model
+        if not model or price is None:
+            return None
+        key = (retailer, normalize_model(model))
+        if key not in self._cards:
+            self.added += 1
+        self._cards[key] = {"model": model, "title": title or text, "price": price, "url": url}
+        return model
+
+    def get(self, retailer, model):
+        """The card a search page showed for the model at this retailer, or None"""
+        card = self._cards.get((retailer, normalize_model(model)))
+        if card is not None:
+            self.hits += 1
+        return card
+
+    def __len__(self):
+        return len(self._cards)
+
+
+_search_harvest = None
+_search_harvest_enabled = True
+
+
+def configure_search_harvest(enabled):
+    """Turn harvesting on or off for this process; either way the harvest starts empty"""
+    global _search_harvest, _search_harvest_enabled
+    _search_harvest = None
+    _search_harvest_enabled = enabled
+
+
+def get_search_harvest():
+    """Return the process-wide harvest, creating it on first use; None when turned off"""
+    global _search_harvest
+    if _search_harvest is None and _search_harvest_enabled:
+        _search_harvest = SearchHarvest()
+    return _search_harvest
@@ -0,0 +1,205 @@
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime
+
+
+DEFAULT_STATS_PATH = "selector_stats.sqlite3"
+
+# Each run's hits are added to the chain's scores after the old ones are scaled by
+# this, so a selector that stopped matching loses first place within a few runs
+DECAY = 0.8
+
+# One extraction in this many keeps the source order, so a preferred selector that
+# starts matching again is noticed even while a later one sits in first place
+EXPLORE_EVERY = 20
+
+MISS = ""  # selector column for "nothing in the chain matched"
+
+
+class SelectorStats:
+    """Which entry of each selector fallback chain actually matches, per retailer.
+
+    order() puts the highest-scoring selector of every reorderable chain first
+    before an extraction, record() counts what the extraction hit, and flush()
+    folds the run's counts into decayed scores on disk. When a chain's top selector
+    changes, flush() logs a drift event and prints it: the site most likely changed
+    its markup.
+    """
+
+    def __init__(self, path=DEFAULT_STATS_PATH):
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS selector_scores ("
+            " retailer TEXT NOT NULL, kind TEXT NOT NULL, field TEXT NOT NULL, selector TEXT NOT NULL,"
+            " score REAL NOT NULL, hits INTEGER NOT NULL, last_hit REAL,"
+            " PRIMARY KEY (retailer, kind, field, selector));"
+            "CREATE TABLE IF NOT EXISTS selector_winners ("
+            " retailer TEXT NOT NULL, kind TEXT NOT NULL, field TEXT NOT NULL, selector TEXT NOT NULL,"
+            " since REAL NOT NULL, PRIMARY KEY (retailer, kind, field));"
+            "CREATE TABLE IF NOT EXISTS selector_drift ("
+            " ts REAL NOT NULL, retailer TEXT NOT NULL, kind TEXT NOT NULL, field TEXT NOT NULL,"
+            " old_selector TEXT, new_selector TEXT);"
+        )
+        self._db.commit()
+        self._scores = {}          # (retailer, kind, field) -> {selector: score} as of the last run
+        self._pending = Counter()  # (retailer, kind, field, selector) -> hits this run
+        self._uses = Counter()     # (retailer, kind) -> extractions this run
+
+    def _chain_scores(self, retailer, kind, field):
+        key = (retailer, kind, field)
+        if key not in self._scores:
+            rows = self._db.execute(
+                "SELECT selector, score FROM selector_scores WHERE retailer = ? AND kind = ? AND field = ?", key
+            ).fetchall()
+            self._scores[key] = dict(rows)
+        return self._scores[key]
+
+    def _order(self, retailer, kind, field, labels, reorderable):
+        scores = self._chain_scores(retailer, kind, field)
+        head = sorted(range(reorderable), key=lambda i: (-scores.get(labels[i], 0.0), i))
+        return head + list(range(reorderable, len(labels)))
+
+    def order(self, retailer, kind, spec):
+        """`spec` with the reorderable head of each chain sorted hottest first.
+
+        Only the leading entries a chain marks as interchangeable move (ties and
+        unseen selectors stay in source order); priority chains are left alone.
+        """
+        self._uses[(retailer, kind)] += 1
+        if self._uses[(retailer, kind)] % EXPLORE_EVERY == 0:
+            return spec
+        orders = {name: self._order(retailer, kind, name, field.labels, min(field.reorderable, len(field.labels)))
+                  for name, field in spec.fields.items() if field.reorderable > 1}
+        if spec.cards and spec.reorderable_cards > 1:
+            orders["cards"] = self._order(retailer, kind, "cards", spec.cards,
+                                          min(spec.reorderable_cards, len(spec.cards)))
+        return spec.reordered(orders) if orders else spec
+
+    def record(self, retailer, kind, spec, rows):
+        """Count which entry of each chain matched in extract() rows produced with `spec`"""
+        for row in rows:
+            hits = row.get("_hits", {})
+            for name, field in spec.fields.items():
+                hit = hits.get(name, -1)
+                self._pending[(retailer, kind, name, field.labels[hit] if hit >= 0 else MISS)] += 1
+        if spec.cards and rows:
+            hit = rows[0].get("_hits", {}).get("cards", -1)
+            self._pending[(retailer, kind, "cards", spec.cards[hit] if hit >= 0 else MISS)] += 1
+
+    def flush(self):
+        """Fold this run's hits into the stored scores; returns the drift events found"""
+        now = time.time()
+        chains = {key[:3] for key in self._pending}
+        drifts = []
+        with self._db:
+            for chain in chains:
+                self._db.execute(
+                    "UPDATE selector_scores SET score = score * ? WHERE retailer = ? AND kind = ? AND field = ?",
+                    (DECAY, *chain),
+                )
+            for (retailer, kind, field, selector), hits in self._pending.items():
+                self._db.execute(
+                    "INSERT INTO selector_scores (retailer, kind, field, selector, score, hits, last_hit)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (retailer, kind, field, selector) DO UPDATE SET"
+                    " score = score + excluded.score, hits = hits + excluded.hits, last_hit = excluded.last_hit",
+                    (retailer, kind, field, selector, hits, hits, now),
+                )
+            for chain in chains:
+                top = self._db.execute(
+                    "SELECT selector FROM selector_scores WHERE retailer = ? AND kind = ? AND field = ?"
+                    " AND selector != ? ORDER BY score DESC LIMIT 1",
+                    (*chain, MISS),
+                ).fetchone()
+                if top is None:
+                    continue
+                winner = self._db.execute(
+                    "SELECT selector FROM selector_winners WHERE retailer = ? AND kind = ? AND field = ?", chain
+                ).fetchone()
+                if winner is not None and winner[0] == top[0]:
+                    continue
+                self._db.execute(
+                    "INSERT OR REPLACE INTO selector_winners (retailer, kind, field, selector, since)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (*chain, top[0], now),
+                )
+                if winner is not None:
+                    self._db.execute(
+                        "INSERT INTO selector_drift (ts, retailer, kind, field, old_selector, new_selector)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        (now, *chain, winner[0], top[0]),
+                    )
+                    drifts.append((*chain, winner[0], top[0]))
+                    print(f"⚠️ Selector drift at {chain[0]} ({chain[1]}.{chain[2]}): "
+                          f"'{winner[0]}' -> '{top[0]}'")
+        self._pending.clear()
+        self._scores.clear()
+        return drifts
+
+    def report(self, since=None):
+        """Per-chain score shares plus the drift events since `since` (a timestamp), as printable lines"""
+        lines = []
+        rows = self._db.execute(
+            "SELECT retailer, kind, field, selector, score, hits FROM selector_scores"
+            " ORDER BY retailer, kind, field, score DESC"
+        ).fetchall()
+        chain = None
+        for retailer, kind, field, selector, score, hits in rows:
+            if (retailer, kind, field) != chain:
+                chain = (retailer, kind, field)
+                total = sum(r[4] for r in rows if r[:3] == chain) or 1
+                lines.append(f"{retailer} {kind}.{field}:")
+            label = selector or "(no match)"
+            lines.append(f"  {score / total:6.1%}  {label}  ({hits} hits)")
+
+        drifts = self._db.execute(
+            "SELECT ts, retailer, kind, field, old_selector, new_selector FROM selector_drift"
+            " WHERE ts >= ? ORDER BY ts", (since or 0,)
+        ).fetchall()
+        if drifts:
+            lines.append("")
+            lines.append("Drift:")
+        for ts, retailer, kind, field, old, new in drifts:
+            when = datetime.fromtimestamp(ts).isoformat(timespec="seconds")
+            lines.append(f"  {when} {retailer} {kind}.{field}: '{old}' -> '{new}'")
+        return lines
+
+    def close(self):
+        self._db.close()
+
+
+_selector_stats = None
+_selector_stats_path = DEFAULT_STATS_PATH
+
+
+def configure_selector_stats(path):
+    """Point the process-wide selector stats at another file; None turns them off"""
+    global _selector_stats_path
+    close_selector_stats()
+    _selector_stats_path = path
+
+
+def get_selector_stats():
+    """Return the process-wide selector stats, opening them on first use; None when turned off"""
+    global _selector_stats
+    if _selector_stats is None and _selector_stats_path:
+        _selector_stats = SelectorStats(_selector_stats_path)
+    return _selector_stats
+
+
+def close_selector_stats():
+    """Flush this process's hits and close the stats"""
+    global _selector_stats
+    if _selector_stats is not None:
+        _selector_stats.flush()
+        _selector_stats.close()
+        _selector_stats = None
+
+
+if __name__ == "__main__":
+    stats = SelectorStats()
+    print("\n".join(stats.report()) or "No selector statistics yet")
+    stats.close()
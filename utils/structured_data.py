@@ -0,0 +1,269 @@
+import json
+from html.parser import HTMLParser
+
+from utils.model_numbers import normalize_model
+from utils.price_parser import parse_price_value
+
+
+# Elements whose value lives in an attribute rather than their text (microdata spec)
+_VALUE_ATTRS = {
+    "meta": "content",
+    "a": "href",
+    "link": "href",
+    "area": "href",
+    "img": "src",
+    "time": "datetime",
+    "data": "value",
+    "meter": "value",
+}
+_VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+class _StructuredDataParser(HTMLParser):
+    """Single pass over a page's HTML collecting JSON-LD blocks and microdata items"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.json_ld = []       # raw JSON-LD script bodies
+        self.items = []         # top-level microdata scopes
+        self.loose = {"type": "", "props": {}}  # itemprops outside any itemscope
+        self._in_json_ld = False
+        self._json_ld_chunks = []
+        self._stack = []        # open elements: (tag, scope or None, pending itemprop or None)
+        self._text = []         # text buffers for itemprops waiting on their end tag
+
+    def _current_scope(self):
+        for tag, scope, prop in reversed(self._stack):
+            if scope is not None:
+                return scope
+        return self.loose
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "script" and (attrs.get("type") or "").lower() == "application/ld+json":
+            self._in_json_ld = True
+            self._json_ld_chunks = []
+            return
+
+        parent = self._current_scope()
+        itemprop = attrs.get("itemprop")
+        scope = None
+        if "itemscope" in attrs:
+            scope = {"type": attrs.get("itemtype") or "", "props": {}}
+            if itemprop and parent is not self.loose:
+                for name in itemprop.split():
+                    parent["props"].setdefault(name, scope)
+            else:
+                self.items.append(scope)
+            itemprop = None
+
+        pending = None
+        if itemprop:
+            value = attrs.get("content")
+            if value is None and tag in _VALUE_ATTRS:
+                value = attrs.get(_VALUE_ATTRS[tag])
+            if value is not None:
+                for name in itemprop.split():
+                    parent["props"].setdefault(name, value.strip())
+            elif tag not in _VOID_ELEMENTS:
+                pending = (parent, itemprop.split(), len(self._text))
+                self._text.append([])
+
+        if tag not in _VOID_ELEMENTS:
+            self._stack.append((tag, scope, pending))
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._in_json_ld:
+            self._in_json_ld = False
+            self.json_ld.append("".join(self._json_ld_chunks))
+            return
+        if not any(open_tag == tag for open_tag, _, _ in self._stack):
+            return
+        # Pop until the matching element, closing anything left unclosed inside it
+        while self._stack:
+            open_tag, scope, pending = self._stack.pop()
+            if pending is not None:
+                parent, names, index = pending
+                text = " ".join("".join(self._text[index]).split())
+                del self._text[index:]
+                for name in names:
+                    parent["props"].setdefault(name, text)
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self._in_json_ld:
+            self._json_ld_chunks.append(data)
+        for buffer in self._text:
+            buffer.append(data)
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _type_names(node):
+    names = []
+    for value in _as_list(node.get("@type") if isinstance(node, dict) else None):
+        names.append(str(value).rsplit("/", 1)[-1])
+    return names
+
+
+def _walk_json_ld(node):
+    """Yield every dict in a JSON-LD document, descending into @graph and nested values"""
+    if isinstance(node, list):
+        for child in node:
+            yield from _walk_json_ld(child)
+    elif isinstance(node, dict):
+        yield node
+        for value in node.values():
+            if isinstance(value, (list, dict)):
+                yield from _walk_json_ld(value)
+
+
+def _first(*values):
+    for value in values:
+        if isinstance(value, list):
+            value = value[0] if value else None
+        if isinstance(value, dict):
+            value = value.get("@id") or value.get("name")
+        if value not in (None, ""):
+            return str(value).strip()
+    return None
+
+
+def _condition_rank(offer):
+    """0 for a new-condition offer, 1 when the condition isn't given, 2 for used, refurbished, ..."""
+    condition = _first(offer.get("itemCondition"))
+    if not condition:
+        return 1
+    return 0 if condition.rsplit("/", 1)[-1] == "NewCondition" else 2
+
+
+def _record(name, mpn, sku, url, offers):
+    """Flatten a Product and its main offer into one plain dict.
+
+    The main offer is the first priced one in new condition, else the first priced
+    one that doesn't say it isn't new: the cheapest is often open-box or marketplace.
+    """
+    record = {
+        "name": name,
+        "mpn": mpn,
+        "sku": sku,
+        "url": url,
+        "price": None,
+        "currency": None,
+        "price_valid_until": None,
+        "availability": None,
+    }
+    best_rank = None
+    for offer in offers:
+        price = parse_price_value(_first(offer.get("price"), offer.get("lowPrice")))
+        if price is None:
+            spec = offer.get("priceSpecification")
+            if isinstance(spec, list):
+                spec = spec[0] if spec else None
+            if isinstance(spec, dict):
+                price = parse_price_value(_first(spec.get("price")))
+        if price is None:
+            continue
+        rank = _condition_rank(offer)
+        if best_rank is None or rank < best_rank:
+            best_rank = rank
+            record["price"] = price
+            record["currency"] = _first(offer.get("priceCurrency"))
+            record["price_valid_until"] = _first(offer.get("priceValidUntil"))
+            record["availability"] = _first(offer.get("availability"))
+            record["url"] = url or _first(offer.get("url"))
+    return record
+
+
+def extract_structured_data(html: str) -> list:
+    """Extract every schema.org Product (JSON-LD and microdata) from a page's HTML.
+
+    Returns a list of dicts with name, mpn, sku, url, price (float), currency,
+    price_valid_until and availability; fields the page doesn't provide are None.
+    """
+    parser = _StructuredDataParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        pass
+
+    products = []
+
+    for block in parser.json_ld:
+        try:
+            document = json.loads(block)
+        except ValueError:
+            continue
+        for node in _walk_json_ld(document):
+            if "Product" not in _type_names(node) and "ProductGroup" not in _type_names(node):
+                continue
+            offers = []
+            for offer in _as_list(node.get("offers")):
+                if isinstance(offer, dict):
+                    offers.append(offer)
+                    offers.extend(o for o in _as_list(offer.get("offers")) if isinstance(o, dict))
+            products.append(_record(
+                _first(node.get("name")),
+                _first(node.get("mpn")),
+                _first(node.get("sku"), node.get("productID")),
+                _first(node.get("url")),
+                offers,
+            ))
+
+    def microdata_scopes(scopes):
+        for scope in scopes:
+            yield scope
+            yield from microdata_scopes(v for v in scope["props"].values() if isinstance(v, dict))
+
+    loose = parser.loose
+    if "price" in loose["props"] and ("mpn" in loose["props"] or "sku" in loose["props"]):
+        loose = dict(loose, type="Product")
+    for scope in microdata_scopes(parser.items + [loose]):
+        if not scope["type"].rstrip("/").endswith("Product"):
+            continue
+        props = scope["props"]
+        offers = [v["props"] for v in _as_list(props.get("offers")) if isinstance(v, dict)]
+        # Some sites put offer properties directly on the product
+        if not offers and "price" in props:
+            offers = [props]
+        products.append(_record(
+            _first(props.get("name")),
+            _first(props.get("mpn")),
+            _first(props.get("sku"), props.get("productID")),
+            _first(props.get("url")),
+            [o for o in offers if isinstance(o, dict)],
+        ))
+
+    return products
+
+
+def find_product(products, model_number, aliases=()):
+    """Pick the structured product whose mpn, sku or name carries the model number.
+
+    `aliases` are other canonical forms of the model (see utils.model_numbers), which
+    only count as an exact mpn or sku match: a region-less base is a substring of
+    every regional variant's name.
+    """
+    if not model_number:
+        return None
+    wanted = model_number.upper().replace("-", "")
+    for product in products:
+        if product["price"] is None:
+            continue
+        for field in ("mpn", "sku", "name"):
+            value = (product[field] or "").upper().replace("-", "")
+            if value and wanted in value:
+                return product
+    for product in products:
+        if product["price"] is None:
+            continue
+        for field in ("mpn", "sku"):
+            if normalize_model(product[field]) in aliases:
+                return product
+    return None
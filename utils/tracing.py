@@ -0,0 +1,165 @@
+import contextvars
+import glob
+import json
+import math
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+
+DEFAULT_TRACE_PATH = "scrape_trace.json"
+
+# (retailer, product) the spans opened in the current task belong to
+_tags = contextvars.ContextVar("trace_tags", default=(None, None))
+
+
+class Tracer:
+    """Timed spans of one process's scrapes, exportable as Chrome trace events.
+
+    Each span is a phase (goto, wait_ready:search, extract:search, ...) tagged with
+    the retailer and product of the task that opened it. Open the JSON export in
+    chrome://tracing or Perfetto to see every scrape on its own row.
+    """
+
+    def __init__(self):
+        self.spans = []   # (phase, retailer, product, start µs since epoch, duration µs, args)
+
+    @contextmanager
+    def span(self, phase, **args):
+        retailer, product = _tags.get()
+        start = time.time_ns() // 1000
+        began = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = (time.perf_counter_ns() - began) // 1000
+            self.spans.append((phase, retailer, product, start, duration, args))
+
+    def trace_events(self):
+        """The spans as Chrome "complete" events, one thread row per (retailer, product)"""
+        pid = os.getpid()
+        rows = {}
+        events = []
+        for phase, retailer, product, start, duration, args in self.spans:
+            if (retailer, product) not in rows:
+                rows[(retailer, product)] = len(rows) + 1
+                name = f"{retailer}: {product}" if retailer else "run"
+                events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": rows[(retailer, product)],
+                               "args": {"name": name}})
+            events.append({
+                "name": phase,
+                "cat": retailer or "run",
+                "ph": "X",
+                "ts": start,
+                "dur": duration,
+                "pid": pid,
+                "tid": rows[(retailer, product)],
+                "args": {"retailer": retailer, "product": product, **args},
+            })
+        return events
+
+
+_tracer = None
+
+
+def configure_tracing(enabled):
+    """Start collecting spans in this process (dropping any collected so far), or stop"""
+    global _tracer
+    _tracer = Tracer() if enabled else None
+
+
+def get_tracer():
+    """The process-wide tracer, or None when tracing is off"""
+    return _tracer
+
+
+def span(phase, **args):
+    """Context manager timing `phase` when tracing is on; a no-op otherwise"""
+    tracer = _tracer
+    return tracer.span(phase, **args) if tracer is not None else nullcontext()
+
+
+def traced(phase):
+    """Decorator timing every call of an async function as `phase`"""
+    def decorate(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(phase):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def tagged(retailer, product):
+    """Attribute the spans opened inside the block to one retailer and product"""
+    token = _tags.set((retailer, product))
+    try:
+        yield
+    finally:
+        _tags.reset(token)
+
+
+def trace_part_path(path, index):
+    """Where worker `index` of a sharded run writes its spans before they are merged into `path`"""
+    return f"{path}.part{index}"
+
+
+def write_trace(path, events):
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def merge_trace_parts(path, events=()):
+    """Write `events` plus every worker part of `path` to `path`, delete the parts and return all events"""
+    events = list(events)
+    for part in sorted(glob.glob(glob.escape(path) + ".part*")):
+        try:
+            with open(part) as f:
+                events.extend(json.load(f)["traceEvents"])
+        except (OSError, ValueError, KeyError):
+            print(f"⚠️ Skipping unreadable trace part {part}")
+        os.remove(part)
+    write_trace(path, events)
+    return events
+
+
+def _percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(events):
+    """{retailer: {phase: (count, p50 ms, p95 ms, max ms)}} over Chrome complete events"""
+    durations = {}
+    for event in events:
+        if event.get("ph") != "X":
+            continue
+        durations.setdefault(event.get("cat", "run"), {}).setdefault(event["name"], []).append(event["dur"] / 1000)
+    summary = {}
+    for retailer, phases in durations.items():
+        summary[retailer] = {}
+        for phase, values in phases.items():
+            values.sort()
+            summary[retailer][phase] = (len(values), _percentile(values, 0.5), _percentile(values, 0.95), values[-1])
+    return summary
+
+
+def format_summary(summary):
+    """Printable per-retailer table of the summarize() output, slowest phases first"""
+    lines = [f"{'retailer':<12} {'phase':<24} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+    for retailer in sorted(summary):
+        phases = sorted(summary[retailer].items(), key=lambda item: -item[1][2])
+        for phase, (count, p50, p95, longest) in phases:
+            lines.append(f"{retailer:<12} {phase:<24} {count:>6} {p50:>9.1f} {p95:>9.1f} {longest:>9.1f}")
+    return lines
+
+
+if __name__ == "__main__":
+    import sys
+
+    trace_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TRACE_PATH
+    with open(trace_path) as f:
+        print("\n".join(format_summary(summarize(json.load(f)["traceEvents"]))))
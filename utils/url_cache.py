@@ -0,0 +1,107 @@
+import re
+import sqlite3
+import time
+
+from utils.result_cache import DEFAULT_CACHE_PATH, normalize_model
+
+
+# Retailer product IDs that can be read off a detail URL
+PRODUCT_ID_PATTERNS = {
+    "Amazon": r"/dp/([A-Z0-9]{10})",                 # ASIN
+    "Best_Buy": r"/(\d{7,9})(?:[/?#]|$)",            # SKU
+    "Costco": r"\.(\d{6,})\.html",                   # item number
+}
+
+
+def product_id_from_url(retailer, url):
+    """The retailer's own product ID (ASIN, SKU, ...) in a detail URL, or None"""
+    pattern = PRODUCT_ID_PATTERNS.get(retailer)
+    match = re.search(pattern, url or "") if pattern else None
+    return match.group(1) if match else None
+
+
+class UrlCache:
+    """Persistent (retailer, normalized model) -> verified detail page URL.
+
+    Detail URLs almost never change, so entries don't expire; a scraper forgets one
+    when the page is gone or no longer shows the model, and searches again.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS product_urls ("
+            " retailer TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " url TEXT NOT NULL,"
+            " product_id TEXT,"
+            " verified_at REAL NOT NULL,"
+            " PRIMARY KEY (retailer, model))"
+        )
+        self._db.commit()
+
+    def get(self, retailer, model):
+        """Return the cached detail URL, or None"""
+        row = self._db.execute(
+            "SELECT url FROM product_urls WHERE retailer = ? AND model = ?", (retailer, normalize_model(model))
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_product_id(self, retailer, model):
+        row = self._db.execute(
+            "SELECT product_id FROM product_urls WHERE retailer = ? AND model = ?", (retailer, normalize_model(model))
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, retailer, model, url):
+        """Record a detail URL whose page showed the model"""
+        self._db.execute(
+            "INSERT OR REPLACE INTO product_urls (retailer, model, url, product_id, verified_at) VALUES (?, ?, ?, ?, ?)",
+            (retailer, normalize_model(model), url, product_id_from_url(retailer, url), time.time()),
+        )
+        self._db.commit()
+
+    def put_new(self, retailer, model, url):
+        """Record a URL nothing has verified yet (e.g. crawled) unless the model already has one"""
+        self._db.execute(
+            "INSERT OR IGNORE INTO product_urls (retailer, model, url, product_id, verified_at) VALUES (?, ?, ?, ?, ?)",
+            (retailer, normalize_model(model), url, product_id_from_url(retailer, url), time.time()),
+        )
+        self._db.commit()
+
+    def forget(self, retailer, model):
+        self._db.execute(
+            "DELETE FROM product_urls WHERE retailer = ? AND model = ?", (retailer, normalize_model(model))
+        )
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+
+_url_cache = None
+_url_cache_path = DEFAULT_CACHE_PATH
+
+
+def configure_url_cache(path):
+    """Point the process-wide URL cache at another file; None turns it off"""
+    global _url_cache_path
+    close_url_cache()
+    _url_cache_path = path
+
+
+def get_url_cache():
+    """Return the process-wide URL cache, opening it on first use; None when turned off"""
+    global _url_cache
+    if _url_cache is None and _url_cache_path:
+        _url_cache = UrlCache(_url_cache_path)
+    return _url_cache
+
+
+def close_url_cache():
+    global _url_cache
+    if _url_cache is not None:
+        _url_cache.close()
+        _url_cache = None